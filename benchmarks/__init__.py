@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the sentiment pipeline.
+
+Run individual benchmarks from the repository root, e.g.
+`python -m benchmarks.bench_vader_scorer`.
+"""
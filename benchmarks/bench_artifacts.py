@@ -0,0 +1,59 @@
+"""
+Size and read/write time of the artifact formats.
+
+Replicates the transformed train CSV to `--rows` rows, writes it as CSV,
+Parquet and Feather, then times a full read and the two-column
+(`review_text`, `sentiment_label`) read that `model_trainer` does. Every
+format must round-trip to the same frame.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+import pandas as pd
+
+from benchmarks.common import TRAIN_CSV, time_call
+from src.components.artifact_store import EXTENSIONS, read_artifact, write_artifact
+
+PROJECTION = ["review_text", "sentiment_label"]
+
+
+def _size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    base = pd.read_csv(TRAIN_CSV)
+    df = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+    workdir = tempfile.mkdtemp(prefix="bench_artifacts_")
+    failures = 0
+    try:
+        print(f"{'format':<10} {'size MB':>9} {'write s':>9} {'read s':>9} {'2-col read s':>13}")
+        for fmt, extension in EXTENSIONS.items():
+            path = os.path.join(workdir, f"data{extension}")
+            write_s = time_call(lambda: write_artifact(df, path))
+            read_s = time_call(lambda: read_artifact(path), repeat=3)
+            projected_s = time_call(lambda: read_artifact(path, columns=PROJECTION), repeat=3)
+            roundtrip = read_artifact(path)
+            if not roundtrip[PROJECTION].equals(df[PROJECTION]) or len(roundtrip) != len(df):
+                print(f"{fmt}: round-trip mismatch")
+                failures += 1
+            print(f"{fmt:<10} {_size(path) / 1e6:>9.1f} {write_s:>9.3f} {read_s:>9.3f} {projected_s:>13.3f}")
+    finally:
+        shutil.rmtree(workdir)
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Per-job connect vs the shared connection pool (`src/components/db.py`).
+
+Each job runs one small transaction (`SELECT 1`), like a scraper flush or a
+stage reading its watermark. The baseline opens a fresh connection per job,
+which is what the stages did before the shared layer. The pooled run
+borrows connections from `db.get_engine()`. Both are timed serially and
+from `--threads` concurrent threads.
+
+Uses the configured database (`DATABASE_URL` / `POSTGRES_*`, see
+`config/config.yaml`). With `--sqlite` it runs against a scratch SQLite
+file instead, which also checks `upsert_rows` / `read_frames`.
+
+    python -m benchmarks.bench_db_pool [--jobs 200] [--threads 8] [--sqlite]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from benchmarks.common import report, time_call
+from src.components import db
+
+
+def _job(engine) -> None:
+    with db.transaction(engine) as conn:
+        conn.exec_driver_sql("SELECT 1").scalar()
+
+
+def _run(engine, jobs: int, threads: int) -> float:
+    if threads <= 1:
+        return time_call(lambda: [_job(engine) for _ in range(jobs)])
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return time_call(lambda: list(pool.map(lambda _: _job(engine), range(jobs))))
+
+
+def check_helpers(engine) -> bool:
+    """Upsert, update-on-conflict and chunked reads give the expected rows."""
+    with db.transaction(engine) as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS bench_db_pool")
+        conn.exec_driver_sql("CREATE TABLE bench_db_pool (k TEXT PRIMARY KEY, v INTEGER)")
+        db.upsert_rows("bench_db_pool", [{"k": str(i), "v": i} for i in range(2500)], key=["k"], conn=conn)
+        db.upsert_rows("bench_db_pool", [{"k": "7", "v": -7}], key=["k"], conn=conn)
+    sizes = [len(chunk) for chunk in db.read_frames("SELECT * FROM bench_db_pool ORDER BY v", chunk_rows=1000,
+                                                    engine=engine)]
+    first = db.read_frame("SELECT v FROM bench_db_pool WHERE k = :k", {"k": "7"}, engine=engine)
+    with db.transaction(engine) as conn:
+        conn.exec_driver_sql("DROP TABLE bench_db_pool")
+    ok = sizes == [1000, 1000, 500] and first["v"].tolist() == [-7]
+    print(f"helpers: chunks {sizes}, upserted value {first['v'].tolist()}  {'ok' if ok else 'MISMATCH'}")
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--sqlite", action="store_true", help="use a scratch SQLite file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}" if args.sqlite else None
+        config = db.DatabaseConfig(url=url) if url else db.DatabaseConfig.from_config()
+        pooled = db.get_engine(config)
+        unpooled = create_engine(config.sqlalchemy_url(), poolclass=NullPool)
+        print(f"database: {config.sqlalchemy_url().render_as_string(hide_password=True)}")
+
+        ok = check_helpers(pooled)
+        _job(pooled)  # open the first pooled connection outside the timings
+        for threads in (1, args.threads):
+            label = "serial" if threads == 1 else f"{threads} threads"
+            report(f"connect per job ({label})", args.jobs, _run(unpooled, args.jobs, threads))
+            report(f"shared pool ({label})", args.jobs, _run(pooled, args.jobs, threads))
+        db.dispose_engines()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Throughput of the two predict engines: VADER vs the trained TF-IDF model.
+
+Scores the same `--rows` reviews (the transformed test CSV replicated)
+through `predict_from_dataframe` with `engine="vader"` and `engine="model"`,
+and reports reviews/sec plus how often the two engines agree on the label.
+Trains a model first if `artifacts/models/` is empty.
+"""
+
+import argparse
+import os
+
+import pandas as pd
+
+from benchmarks.common import BASE_DIR, report, time_call
+from src.components.sentiment_model import LATEST_FILE, MODEL_DIR, get_sentiment_model
+from src.components.sentiment_scorer import warm_up_scorer
+from src.pipeline.predict_pipeline import predict_from_dataframe
+
+TEST_CSV = os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20_000)
+    args = parser.parse_args()
+
+    if not os.path.exists(os.path.join(MODEL_DIR, LATEST_FILE)):
+        from src.components.model_trainer import ModelTrainer
+        ModelTrainer().initiate_model_trainer()
+
+    base = pd.read_csv(TEST_CSV, usecols=['review_text'])
+    df = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+
+    # Load both engines up front so only scoring is timed
+    warm_up_scorer()
+    model = get_sentiment_model()
+    print(f"model: {model.model_name} v{model.version} (accuracy {model.metrics.get('accuracy', float('nan')):.4f})")
+
+    results = {}
+
+    def run(engine):
+        results[engine] = predict_from_dataframe(df, engine=engine)
+
+    report("engine=vader", len(df), time_call(lambda: run("vader")))
+    report("engine=model", len(df), time_call(lambda: run("model"), repeat=3))
+
+    agreement = (results["vader"]["sentiment_label"] == results["model"]["sentiment_label"]).mean()
+    print(f"label agreement with VADER: {agreement:.2%}")
+
+
+if __name__ == "__main__":
+    main()
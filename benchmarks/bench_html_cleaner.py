@@ -0,0 +1,102 @@
+"""
+Parity check and per-tier microbenchmark for `html_to_simple_text`.
+
+Parity: every fast-tier result must equal the BeautifulSoup result on the raw
+reviews in `src/components/artifacts/test_data.csv`, the cleaned training
+reviews, a list of known edge cases and a randomised fuzz corpus. The script
+exits non-zero on any mismatch.
+
+Benchmark: time per review for each tier against BeautifulSoup on the same
+inputs.
+"""
+
+import argparse
+import os
+import random
+import sys
+
+from benchmarks.common import BASE_DIR, load_reviews, report, time_call
+from src.components.data_transformation import (
+    _html_to_text_full,
+    _NeedsFullParser,
+    _strip_simple_html,
+    html_to_simple_text,
+)
+
+RAW_CSV = os.path.join(BASE_DIR, 'src', 'components', 'artifacts', 'test_data.csv')
+
+EDGE_CASES = [
+    "", "   ", "\n \n", "plain text", "a\r\nb", "\x00a", "a<br/>b", "a<br/><br/>b",
+    "<br/>a", "a<br/> <br/>b", "a<br/>\n<br/>b", "a<BR>b", "a</br>b", "<br />x",
+    "<br/ >", "a<b>c</b>d", "<ul><li>x</li></ul>", "<p>a</p><p>b</p>",
+    "x < y", "a<", "<a", "a>b", "<!-- c -->a", "<a href='x'>link</a>",
+    "<script>x</script>y", "<pre>  a  </pre>", "<textarea> </textarea>",
+    "a & b", "a &b", "a &1", "a&", "&#;", "&#x;", "a &amp; b", "a &amp b",
+    "&AMP;", "&ampx", "&foo;", "1 &lt 2", "&#39;&quot;", "&nbsp;", "a&amp;&amp;b",
+    "&#0;", "&#32;", "&#10;", "&#128;", "&#150;", "&#160;", "&#8217;",
+    "&#xD800;", "&#x1F600;", "&#1114112;", "﻿a",
+    "<br>a</br>b", "x<br>y</br>z", "a</img>b", "<hr>a</hr>", "a<wbr></wbr>b",
+]
+
+FUZZ_ATOMS = [
+    'a', 'b', '1', ' ', '  ', '\n', '\t', '\r', 'é', '\x00', '\x0c', '#', '<', '>', '&',
+    '<br/>', '<br>', '<BR />', '</br>', '<img>', '</img>', '<p>', '</p>', '<b>', '<li>', '</li>', '<pre>',
+    '<a href="x">', '<!-- c -->', '&amp;', '&amp', '&AMP;', '&lt;', '&nbsp;', '&foo;',
+    '&#39;', '&#x27;', '&#32;', '&#10;', '&#0;', '&#128;', '&#xD800;', '&#;', '&#x;',
+]
+
+
+def fuzz_corpus(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [''.join(rng.choice(FUZZ_ATOMS) for _ in range(rng.randint(0, 8))) for _ in range(n)]
+
+
+def check_parity(texts) -> int:
+    mismatches = 0
+    for text in texts:
+        if html_to_simple_text(text) != _html_to_text_full(text):
+            mismatches += 1
+            if mismatches <= 10:
+                print(f"MISMATCH: {text[:80]!r}")
+    return mismatches
+
+
+def _tier(text: str) -> int:
+    if '<' not in text and '&' not in text:
+        return 1
+    try:
+        _strip_simple_html(text)
+        return 2
+    except _NeedsFullParser:
+        return 3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=50000)
+    args = parser.parse_args()
+
+    raw = load_reviews(RAW_CSV)
+    cleaned = load_reviews()
+    corpus = raw + cleaned + EDGE_CASES + fuzz_corpus(args.fuzz)
+
+    mismatches = check_parity(corpus)
+    print(f"parity: {len(corpus) - mismatches}/{len(corpus)} inputs match BeautifulSoup")
+
+    by_tier = {1: [], 2: [], 3: []}
+    for text in raw + cleaned:
+        by_tier[_tier(text)].append(text)
+    for tier, texts in by_tier.items():
+        if not texts:
+            continue
+        report(f"tier {tier}: html_to_simple_text", len(texts),
+               time_call(lambda: [html_to_simple_text(t) for t in texts], repeat=3))
+        report(f"tier {tier}: BeautifulSoup", len(texts),
+               time_call(lambda: [_html_to_text_full(t) for t in texts], repeat=3))
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
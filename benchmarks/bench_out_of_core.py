@@ -0,0 +1,104 @@
+"""
+Peak memory of in-memory TF-IDF training vs out-of-core hashing + partial_fit.
+
+For each `--sizes` value, the transformed train CSV is replicated to that
+many rows (as Parquet, with fresh ids) and both trainers are run in a child
+process, which reports its peak RSS. Out-of-core memory should stay flat as
+the corpus grows. Finally the out-of-core model is updated with one more
+batch of rows to show that `--update` trains on only the new rows.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.common import BASE_DIR, TRAIN_CSV
+from src.components.artifact_store import ArtifactStore, ArtifactStoreConfig
+
+TEST_CSV = os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv')
+
+
+def _child(mode: str, workdir: str) -> None:
+    import src.components.artifact_store as artifact_store
+    from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+
+    artifact_store._default_store = ArtifactStore(ArtifactStoreConfig(format="parquet"))
+    config = ModelTrainerConfig(
+        train_path=os.path.join(workdir, 'train.csv'),
+        test_path=TEST_CSV,
+        model_dir=os.path.join(workdir, 'models'),
+        results_path=os.path.join(workdir, 'results.json'),
+        feature_cache_dir=None,
+        candidates=['sgd'],
+        n_jobs=1,
+    )
+    trainer = ModelTrainer(config)
+    start = time.perf_counter()
+    if mode == "in_memory":
+        trainer.initiate_model_trainer()
+    else:
+        trainer.initiate_out_of_core_training(update=(mode == "update"))
+    with open(config.results_path) as f:
+        results = json.load(f)
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "rows": results.get("rows_trained", results.get("train_rows")),
+    }))
+
+
+def _run_child(mode: str, workdir: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_out_of_core", "--child", mode, workdir],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def _replicate(base: pd.DataFrame, rows: int, first_id: int) -> pd.DataFrame:
+    df = pd.concat([base] * (rows // len(base) + 1), ignore_index=True).head(rows).copy()
+    df['id'] = range(first_id, first_id + rows)
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25_000, 100_000])
+    parser.add_argument("--update-rows", type=int, default=5_000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "WORKDIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child)
+        return
+
+    store = ArtifactStore(ArtifactStoreConfig(format="parquet"))
+    base = pd.read_csv(TRAIN_CSV, usecols=['id', 'review_text', 'sentiment_label'])
+    workdir = tempfile.mkdtemp(prefix="bench_ooc_")
+    try:
+        print(f"{'rows':>8} {'mode':<12} {'seconds':>8} {'peak RSS MB':>12}")
+        for size in args.sizes:
+            store.write(_replicate(base, size, 1), os.path.join(workdir, 'train.csv'))
+            for mode in ("in_memory", "out_of_core"):
+                result = _run_child(mode, workdir)
+                print(f"{size:>8} {mode:<12} {result['seconds']:>8.1f} {result['peak_rss_mb']:>12.0f}")
+
+        store.write(_replicate(base, args.update_rows, max(args.sizes) + 1),
+                    os.path.join(workdir, 'train.csv'), append=True)
+        result = _run_child("update", workdir)
+        print(f"update: trained on {result['rows']} new rows in {result['seconds']:.1f} s "
+              f"(peak RSS {result['peak_rss_mb']:.0f} MB)")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
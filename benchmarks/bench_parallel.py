@@ -0,0 +1,53 @@
+"""
+Scaling of `clean_and_score` from 1 to N worker processes.
+
+Uses the raw (HTML) reviews in `src/components/artifacts/test_data.csv`,
+replicated up to `--size` rows, and checks that every parallel run is
+bit-identical to the serial one.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+from benchmarks.common import BASE_DIR, load_reviews, report, time_call
+from src.components.data_transformation import clean_and_score
+
+RAW_CSV = os.path.join(BASE_DIR, 'src', 'components', 'artifacts', 'test_data.csv')
+
+
+def _same(a, b) -> bool:
+    cleaned_a, batch_a = a
+    cleaned_b, batch_b = b
+    return cleaned_a == cleaned_b and all(
+        np.array_equal(batch_a.as_columns()[k], batch_b.as_columns()[k]) for k in batch_a.as_columns()
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=20000)
+    parser.add_argument("--chunksize", type=int, default=1000)
+    parser.add_argument("--max-jobs", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    reviews = load_reviews(RAW_CSV)
+    reviews = (reviews * (args.size // len(reviews) + 1))[: args.size]
+
+    serial = clean_and_score(reviews, n_jobs=1)
+    n_jobs = 1
+    while n_jobs <= args.max_jobs:
+        result = {}
+
+        def run():
+            result['out'] = clean_and_score(reviews, n_jobs=n_jobs, chunksize=args.chunksize)
+
+        seconds = time_call(run)
+        assert _same(serial, result['out']), f"n_jobs={n_jobs} output differs from serial path"
+        report(f"clean_and_score n_jobs={n_jobs}", len(reviews), seconds)
+        n_jobs *= 2
+
+
+if __name__ == "__main__":
+    main()
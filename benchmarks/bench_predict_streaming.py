@@ -0,0 +1,89 @@
+"""
+Peak memory of `predict_from_csv` vs `predict_from_csv_streaming`.
+
+Builds a CSV of `--rows` reviews (the transformed train CSV replicated), then
+scores it once in memory and once in batches of `--batch-rows`, each in a
+fresh child process so its peak RSS can be measured. The two output files
+must be byte-identical and the summaries equal.
+"""
+
+import argparse
+import filecmp
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.common import TRAIN_CSV
+
+
+def _child(mode: str, input_path: str, output_path: str, batch_rows: int) -> None:
+    from src.pipeline.predict_pipeline import (
+        predict_from_csv,
+        predict_from_csv_streaming,
+        summarize_predictions,
+        write_table,
+    )
+
+    start = time.perf_counter()
+    if mode == "stream":
+        summary = predict_from_csv_streaming(input_path, output_path, batch_rows=batch_rows)
+    else:
+        predictions = predict_from_csv(input_path)
+        summary = summarize_predictions(predictions)
+        write_table(predictions, output_path)
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "summary": summary.as_dict,
+    }))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch-rows", type=int, default=20_000)
+    parser.add_argument("--child", nargs=3, metavar=("MODE", "INPUT", "OUTPUT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child, batch_rows=args.batch_rows)
+        return
+
+    workdir = tempfile.mkdtemp(prefix="bench_predict_")
+    try:
+        base = pd.read_csv(TRAIN_CSV, usecols=["id", "movie_name", "review_text"])
+        df = pd.concat([base] * (args.rows // len(base) + 1), ignore_index=True).head(args.rows)
+        input_path = os.path.join(workdir, "reviews.csv")
+        df.to_csv(input_path, index=False)
+        print(f"input: {args.rows} rows, {os.path.getsize(input_path) / 1e6:.1f} MB")
+
+        results = {}
+        for mode in ("memory", "stream"):
+            output_path = os.path.join(workdir, f"predictions_{mode}.csv")
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_predict_streaming", "--batch-rows", str(args.batch_rows),
+                 "--child", mode, input_path, output_path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            results[mode] = json.loads(out.strip().splitlines()[-1])
+            print(f"{mode:<8} {results[mode]['seconds']:>8.1f} s  peak RSS {results[mode]['peak_rss_mb']:>8.0f} MB")
+
+        same_file = filecmp.cmp(*(os.path.join(workdir, f"predictions_{m}.csv") for m in results), shallow=False)
+        same_summary = results["memory"]["summary"] == results["stream"]["summary"]
+        print(f"outputs identical: {same_file}, summaries equal: {same_summary} {results['stream']['summary']}")
+    finally:
+        shutil.rmtree(workdir)
+
+    if not (same_file and same_summary):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Latency of single-review scoring: the Streamlit path vs the scoring service.
+
+1. Baseline: one `predict_from_dataframe` call per review (what
+   `frontend/app.py` does for the quick single-text check).
+2. `/score` through the in-process `ScoringClient`, one request at a time.
+3. `/score` over HTTP from `--clients` concurrent threads, which the service
+   micro-batches.
+
+Results are checked against `predict_from_dataframe` first. The result cache
+is off, so every request is actually scored.
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import load_reviews
+from src.components.sentiment_scorer import warm_up_scorer
+from src.pipeline.predict_pipeline import SENTIMENT_COLUMNS, predict_from_dataframe
+from src.pipeline.scoring_service import (
+    ScoringClient,
+    ScoringService,
+    ScoringServiceConfig,
+    make_scoring_server,
+)
+
+
+def _timed(fn, items):
+    latencies = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def _report(name, n, seconds, latencies):
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"{name:<34} {n / seconds:>9.0f} req/s  p50 {p50:>7.2f} ms  p99 {p99:>7.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--engine", choices=("vader", "model"), default="vader")
+    args = parser.parse_args()
+
+    texts = load_reviews(limit=args.requests)
+    warm_up_scorer()
+
+    service = ScoringService(ScoringServiceConfig(
+        engine=args.engine, use_cache=False, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+    ))
+    client = ScoringClient(service)
+
+    expected = predict_from_dataframe(pd.DataFrame({"review_text": texts[:200]}), engine=args.engine)
+    got = pd.DataFrame(client.score_batch(texts[:200]))
+    columns = ["cleaned_text"] + (SENTIMENT_COLUMNS if args.engine == "vader" else ["sentiment_label"])
+    for column in columns:
+        want = expected[column].tolist()
+        have = got[column].astype(np.float32).tolist() if column.startswith("sentiment_") and column != "sentiment_label" \
+            else got[column].tolist()
+        if want != have:
+            raise AssertionError(f"/score_batch differs from predict_from_dataframe in {column}")
+    print("parity with predict_from_dataframe: ok")
+
+    def dataframe_call(text):
+        predict_from_dataframe(pd.DataFrame({"review_text": [text]}), engine=args.engine)
+
+    _report("predict_from_dataframe (1 row)", len(texts), *_timed(dataframe_call, texts))
+    _report("/score in-process, sequential", len(texts), *_timed(client.score, texts))
+
+    server = make_scoring_server(service, port=0)
+    with ThreadPoolExecutor(max_workers=1) as serve_thread:
+        serve_thread.submit(server.serve_forever)
+        url = f"http://127.0.0.1:{server.server_port}/score"
+
+        def http_call(text):
+            request = urllib.request.Request(
+                url, data=json.dumps({"text": text}).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+            )
+            with urllib.request.urlopen(request) as response:
+                response.read()
+
+        shards = [texts[i::args.clients] for i in range(args.clients)]
+        batches_before = service.batcher.batches
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.clients) as pool:
+            results = list(pool.map(lambda shard: _timed(http_call, shard)[1], shards))
+        seconds = time.perf_counter() - start
+        _report(f"/score HTTP, {args.clients} clients", len(texts), seconds, np.concatenate(results))
+        print(f"mean micro-batch size: {len(texts) / (service.batcher.batches - batches_before):.1f}")
+        server.shutdown()
+    server.server_close()
+
+    print(json.dumps(service.metrics()["endpoints"], indent=2))
+    service.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Sequential vs concurrent scraping against the local mock GraphQL server.
+
+"sequential" walks one movie at a time with blocking `requests.post` (the
+`DataCollector.scrape_and_store` loop without its 1s sleep); "async" uses
+`AsyncReviewScraper`. The server adds `--latency` per request and fails a
+fraction of requests with 429/503 to exercise the retry path. Both modes must
+collect every canned review.
+"""
+
+import argparse
+
+import requests
+
+from benchmarks.common import report, time_call
+from benchmarks.mock_graphql_server import MockGraphQLServer
+from src.components.async_collection import AsyncCollectionConfig, AsyncReviewScraper
+from src.components.data_collection import build_reviews_payload, headers, parse_reviews_page
+
+
+class CountingCrawl:
+    """Minimal crawl for `AsyncReviewScraper` that only counts reviews."""
+
+    def __init__(self, movie):
+        self.movie_id, self.movie_name = movie["id"], movie["name"]
+        self.start_cursor = None
+        self.collected = 0
+
+    def handle_page(self, edges, page_info):
+        self.collected += len(edges)
+        return page_info.get("hasNextPage", False)
+
+    def finish(self, completed):
+        pass
+
+
+def scrape_sequential(url, movies, page_size):
+    collected = 0
+    session = requests.Session()
+    for movie in movies:
+        after_cursor = None
+        while True:
+            r = session.post(url, json=build_reviews_payload(movie["id"], after_cursor, page_size), timeout=30)
+            if r.status_code in (429, 503):
+                continue
+            edges, page_info = parse_reviews_page(r.json())
+            collected += len(edges)
+            if not page_info.get("hasNextPage"):
+                break
+            after_cursor = page_info.get("endCursor")
+    return collected
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--movies", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--rate", type=float, default=200.0, help="Async token-bucket requests/second.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    with MockGraphQLServer(args.movies, args.pages, latency=args.latency, failure_rate=args.failure_rate) as server:
+        expected = server.total_reviews
+        result = {}
+
+        result["sequential"] = 0
+        seconds = time_call(lambda: result.__setitem__("sequential", scrape_sequential(server.url, server.movies, 25)))
+        report("sequential requests", result["sequential"], seconds)
+
+        config = AsyncCollectionConfig(
+            base_url=server.url,
+            max_concurrent_movies=args.concurrency,
+            per_host_limit=args.concurrency,
+            requests_per_second=args.rate,
+            burst=args.concurrency,
+            backoff_base=0.01,
+        )
+        crawls = [CountingCrawl(movie) for movie in server.movies]
+        scraper = AsyncReviewScraper(config, headers)
+        seconds = time_call(lambda: scraper.run(crawls))
+        collected = sum(crawl.collected for crawl in crawls)
+        report("async scraper", collected, seconds)
+        print("async stats:", scraper.stats)
+
+        assert result["sequential"] == expected and collected == expected, "missing reviews"
+
+
+if __name__ == "__main__":
+    main()
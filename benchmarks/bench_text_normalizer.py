@@ -0,0 +1,59 @@
+"""
+Equivalence check and benchmark for the fused `TextNormalizer`.
+
+Compares `normalize_text` with the original step-by-step sequence
+(`_normalize_unicode` -> `_remove_urls` -> `_remove_control_chars` ->
+`_reduce_repeated_chars` -> `_collapse_whitespace`) on the artifacts CSVs,
+and with the full `clean_text_pipeline` on the raw reviews. Exits non-zero on
+any mismatch.
+"""
+
+import os
+import sys
+
+from benchmarks.common import BASE_DIR, load_reviews, report, time_call
+from src.components.data_transformation import (
+    _collapse_whitespace,
+    _normalize_unicode,
+    _reduce_repeated_chars,
+    _remove_control_chars,
+    _remove_urls,
+    html_to_simple_text,
+    normalize_text,
+)
+
+CSV_PATHS = [
+    os.path.join(BASE_DIR, 'artifacts', 'transformed_train_data.csv'),
+    os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv'),
+    os.path.join(BASE_DIR, 'src', 'components', 'artifacts', 'test_data.csv'),
+]
+
+
+def normalize_sequential(text: str) -> str:
+    text = _normalize_unicode(text)
+    text = _remove_urls(text)
+    text = _remove_control_chars(text)
+    text = _reduce_repeated_chars(text)
+    return _collapse_whitespace(text)
+
+
+def main() -> None:
+    texts = []
+    for path in CSV_PATHS:
+        # Raw reviews go through the HTML stage first, as in clean_text_pipeline
+        texts.extend(html_to_simple_text(t) for t in load_reviews(path))
+
+    mismatches = sum(normalize_sequential(t) != normalize_text(t) for t in texts)
+    print(f"equivalence: {len(texts) - mismatches}/{len(texts)} texts match the sequential pipeline")
+
+    report("sequential (5 passes)", len(texts),
+           time_call(lambda: [normalize_sequential(t) for t in texts], repeat=3))
+    report("TextNormalizer (fused)", len(texts),
+           time_call(lambda: [normalize_text(t) for t in texts], repeat=3))
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
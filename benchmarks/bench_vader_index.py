@@ -0,0 +1,130 @@
+"""
+Compiled VADER lexicon index vs NLTK's `SentimentIntensityAnalyzer`.
+
+1. Parity: `polarity_scores` must return identical dicts on the fixture
+   reviews, hand-written edge cases and a seeded fuzz corpus built from
+   lexicon, booster and negation words with random casing and punctuation.
+2. Start-up: a fresh interpreter imports the scorer, loads the analyzer and
+   scores one review, with and without the index.
+3. Throughput on the fixture reviews.
+
+    python -m benchmarks.bench_vader_index [--fuzz 20000] [--runs 3]
+
+Builds the index first if it is missing. Exits 1 on any parity mismatch.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from benchmarks.common import BASE_DIR, load_reviews, report, time_call
+from src.components.sentiment_scorer import DEFAULT_INDEX_PATH, resolve_lexicon
+from src.components.vader_index import VaderIndex, build_index
+
+EDGE_CASES = [
+    "", " ", "!", "a", "but", "BUT good", "good but", "GOOD but BAD!!!",
+    "not bad at all", "at least it was ok", "very least good", "least good",
+    "kind of good", "sort of great", "never so good", "never this good",
+    "the shit was the bomb", "yeah right. bad ass", "kiss of death is awful",
+    "cut the mustard wow", "hand to mouth", ":) :( <3 </3 :D",
+    "I don't like it", "NOT GOOD AT ALL", "barely good", "aint great",
+    "good??", "good???? bad!!!!!", "It's \"great\", isn't it?!", "'good' 'bad'",
+    "...good... ...bad...", "!good!", "?!?!good", "good!?!?", "good.,",
+    "Ünïcödé gööd 😀 great",
+]
+
+_STARTUP = (
+    "import time; s = time.perf_counter(); "
+    "from src.components.sentiment_scorer import get_scorer; "
+    "get_scorer().polarity_scores('not bad at all'); "
+    "print(time.perf_counter() - s)"
+)
+
+
+def fuzz_corpus(analyzer: SentimentIntensityAnalyzer, n: int, seed: int = 0):
+    """Short texts that exercise boosters, negations, caps, idioms and punctuation stripping."""
+    constants = analyzer.constants
+    vocab = sorted(analyzer.lexicon) + sorted(constants.BOOSTER_DICT) + sorted(constants.NEGATE)
+    vocab += ["but", "least", "at", "very", "so", "this", "never", "kind", "of", "the", "!!!", "??"]
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(n):
+        words = []
+        for _ in range(rng.randint(0, 15)):
+            word, r = rng.choice(vocab), rng.random()
+            if r < 0.2:
+                word = word.upper()
+            elif r < 0.3:
+                word = rng.choice(constants.PUNC_LIST) + word
+            elif r < 0.4:
+                word = word + rng.choice(constants.PUNC_LIST)
+            words.append(word)
+        texts.append(" ".join(words))
+    return texts
+
+
+def startup_seconds(runs: int, **overrides: str) -> float:
+    """Median cold start (import + load + first score) in a fresh interpreter."""
+    env = {k: v for k, v in os.environ.items() if k not in ("VADER_INDEX_PATH", "VADER_LEXICON_PATH")}
+    env.update(overrides, PYTHONPATH=BASE_DIR)
+    times = []
+    with tempfile.TemporaryDirectory() as cwd:
+        for _ in range(runs):
+            out = subprocess.run([sys.executable, "-c", _STARTUP], cwd=cwd, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            times.append(float(out))
+    return statistics.median(times)
+
+
+def _lexicon_file() -> str:
+    """Copy of the lexicon NLTK resolves as a plain file (it usually lives in a zip)."""
+    import nltk.data
+
+    text = nltk.data.load(resolve_lexicon(), format="text")
+    path = os.path.join(tempfile.gettempdir(), "bench_vader_lexicon.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fuzz", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    if not os.path.isfile(DEFAULT_INDEX_PATH):
+        build_index(DEFAULT_INDEX_PATH)
+    analyzer = SentimentIntensityAnalyzer(lexicon_file=resolve_lexicon())
+    index = VaderIndex.open(DEFAULT_INDEX_PATH)
+
+    reviews = load_reviews()
+    corpora = {"fixture": reviews, "edge cases": EDGE_CASES, "fuzz": fuzz_corpus(analyzer, args.fuzz)}
+    mismatches = 0
+    for name, texts in corpora.items():
+        bad = [t for t in texts if analyzer.polarity_scores(t) != index.polarity_scores(t)]
+        mismatches += len(bad)
+        print(f"parity {name:<12} {len(texts):>8} texts  {len(bad):>5} mismatches")
+        for text in bad[:3]:
+            print(f"  {text[:80]!r}: {analyzer.polarity_scores(text)} != {index.polarity_scores(text)}")
+
+    # An explicit lexicon file makes the scorer skip the default index
+    nltk_startup = startup_seconds(args.runs, VADER_LEXICON_PATH=_lexicon_file())
+    index_startup = startup_seconds(args.runs, VADER_INDEX_PATH=DEFAULT_INDEX_PATH)
+    print(f"start-up, NLTK lexicon parse:  {nltk_startup * 1000:8.1f} ms")
+    print(f"start-up, memory-mapped index: {index_startup * 1000:8.1f} ms")
+
+    report("NLTK SentimentIntensityAnalyzer", len(reviews),
+           time_call(lambda: [analyzer.polarity_scores(t) for t in reviews]))
+    report("VaderIndex", len(reviews), time_call(lambda: [index.polarity_scores(t) for t in reviews]))
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
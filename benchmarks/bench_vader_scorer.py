@@ -0,0 +1,41 @@
+"""
+Reviews/sec of VADER scoring before and after the shared scorer.
+
+"before" rebuilds a `SentimentIntensityAnalyzer` per review (the old
+behaviour of `analyze_sentiment_vader`); "after" goes through the shared,
+pre-warmed scorer. The "before" run uses a smaller sample because it is
+dominated by lexicon parsing.
+"""
+
+import argparse
+
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from benchmarks.common import load_reviews, report, time_call
+from src.components.data_transformation import analyze_sentiment_vader
+from src.components.sentiment_scorer import warm_up_scorer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--before-sample", type=int, default=200)
+    args = parser.parse_args()
+
+    reviews = load_reviews()
+    before_sample = reviews[: args.before_sample]
+
+    def per_review_analyzer():
+        for text in before_sample:
+            SentimentIntensityAnalyzer().polarity_scores(text)
+
+    def shared_scorer():
+        for text in reviews:
+            analyze_sentiment_vader(text)
+
+    report("before: new analyzer per review", len(before_sample), time_call(per_review_analyzer))
+    warm_up_scorer()
+    report("after: shared scorer", len(reviews), time_call(shared_scorer))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Shared helpers for the benchmark scripts."""
+
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable, List, Optional
+
+import pandas as pd
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+TRAIN_CSV = os.path.join(BASE_DIR, 'artifacts', 'transformed_train_data.csv')
+
+
+def load_reviews(path: str = TRAIN_CSV, limit: Optional[int] = None) -> List[str]:
+    """Return the `review_text` column of a CSV as a list of strings."""
+    df = pd.read_csv(path, usecols=['review_text'])
+    texts = df['review_text'].dropna().astype(str).tolist()
+    return texts[:limit] if limit else texts
+
+
+def time_call(fn: Callable[[], object], repeat: int = 1) -> float:
+    """Return the best wall time (seconds) of `repeat` calls to `fn`."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, n_items: int, seconds: float) -> None:
+    rate = n_items / seconds if seconds else float('inf')
+    print(f"{name:<40} {n_items:>8} items  {seconds:>9.3f} s  {rate:>12.1f} items/s")
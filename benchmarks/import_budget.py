@@ -0,0 +1,105 @@
+"""
+Import-time budget for the scoring entry points.
+
+Each module is imported `--runs` times in a fresh interpreter with
+`python -X importtime`; the median cumulative import time must stay under
+its budget, and none of its `forbidden` heavy dependencies may be loaded
+(they belong to code paths that import them lazily). The predict CLI's
+`--help` start-up time is checked the same way. Imports run from a scratch
+working directory, which must not get a `logs/` file just from importing.
+
+    python -m benchmarks.import_budget [--runs 5] [--scale 1.5]
+
+Exits 1 if any check fails, so it can gate CI.
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import BASE_DIR
+
+HEAVY = ('sklearn', 'scipy', 'bs4', 'nltk', 'joblib')
+
+# module -> (budget in ms, modules that must not be imported)
+BUDGETS = {
+    'src.logger': (50, HEAVY + ('pandas',)),
+    'src.components.sentiment_scorer': (50, HEAVY + ('pandas',)),
+    'src.components.data_transformation': (800, HEAVY),
+    'src.pipeline.predict_pipeline': (900, HEAVY),
+    'src.pipeline.scoring_service': (900, HEAVY),
+}
+CLI_BUDGET_MS = 1200
+
+_IMPORTTIME_RE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def _run(args, cwd):
+    env = dict(os.environ, PYTHONPATH=BASE_DIR)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *args], cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr[-2000:]}")
+    return proc, elapsed
+
+
+def measure_import(module: str, cwd: str):
+    """(cumulative import ms, set of top-level packages imported) for one cold import."""
+    proc, _ = _run(['-X', 'importtime', '-c', f'import {module}'], cwd)
+    cumulative, loaded = None, set()
+    for match in _IMPORTTIME_RE.finditer(proc.stderr):
+        us, indent, name = match.groups()
+        loaded.add(name.split('.')[0])
+        if name == module and len(indent) == 1:
+            cumulative = int(us) / 1000
+    return cumulative, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI machines)")
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory(prefix="import_budget_") as cwd:
+        print(f"{'module':<40} {'median ms':>10} {'budget':>8}  result")
+        for module, (budget, forbidden) in BUDGETS.items():
+            times, loaded = [], set()
+            for _ in range(args.runs):
+                ms, modules = measure_import(module, cwd)
+                times.append(ms)
+                loaded |= modules
+            median = statistics.median(times)
+            problems = []
+            if median > budget * args.scale:
+                problems.append("over budget")
+            heavy = sorted(set(forbidden) & loaded)
+            if heavy:
+                problems.append(f"imports {', '.join(heavy)}")
+            failures += bool(problems)
+            print(f"{module:<40} {median:>10.1f} {budget * args.scale:>8.0f}  {'; '.join(problems) or 'ok'}")
+
+        cli_times = [_run(['-m', 'src.pipeline.predict_pipeline', '--help'], cwd)[1] * 1000
+                     for _ in range(args.runs)]
+        cli = statistics.median(cli_times)
+        over = cli > CLI_BUDGET_MS * args.scale
+        failures += over
+        print(f"{'predict CLI --help (wall)':<40} {cli:>10.1f} {CLI_BUDGET_MS * args.scale:>8.0f}  "
+              f"{'over budget' if over else 'ok'}")
+
+        if os.path.exists(os.path.join(cwd, 'logs')):
+            failures += 1
+            print("importing created a logs/ directory")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Local stand-in for the IMDB GraphQL endpoint.
+
+Replays canned `TitleReviewsRefine` pages for a set of synthetic movies so the
+scrapers can be exercised offline. Optional per-request latency and a
+failure rate (answered with 429 or 503) make retry and rate-limit behaviour
+observable. `bad_body_rate` answers a fraction of requests with a 200 whose
+body is not JSON, like a proxy's HTML error page.
+
+    with MockGraphQLServer(n_movies=5, pages_per_movie=4) as server:
+        scraper = AsyncReviewScraper(AsyncCollectionConfig(base_url=server.url), headers)
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+def canned_pages(movie_id: str, n_pages: int, page_size: int) -> Dict[Optional[str], dict]:
+    """Responses for one movie keyed by the `after` cursor that requests them."""
+    pages = {}
+    for page in range(n_pages):
+        edges = [
+            {
+                "node": {
+                    "id": f"rw{movie_id}{page:03d}{i:03d}",
+                    "text": {"originalText": {"plaidHtml": f"Review {i} of page {page} for {movie_id}.<br/>Great film!"}},
+                }
+            }
+            for i in range(page_size)
+        ]
+        has_next = page < n_pages - 1
+        pages[None if page == 0 else f"cursor-{page}"] = {
+            "data": {
+                "title": {
+                    "reviews": {
+                        "edges": edges,
+                        "pageInfo": {"endCursor": f"cursor-{page + 1}" if has_next else None, "hasNextPage": has_next},
+                    }
+                }
+            }
+        }
+    return pages
+
+
+class MockGraphQLServer:
+    def __init__(
+        self,
+        n_movies: int = 5,
+        pages_per_movie: int = 4,
+        page_size: int = 25,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        bad_body_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.movies: List[dict] = [{"id": f"tt{9000000 + i}", "name": f"Mock Movie {i}"} for i in range(n_movies)]
+        self.pages = {m["id"]: canned_pages(m["id"], pages_per_movie, page_size) for m in self.movies}
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.bad_body_rate = bad_body_rate
+        self.requests = 0
+        self.failures = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def total_reviews(self) -> int:
+        return sum(
+            len(page["data"]["title"]["reviews"]["edges"]) for pages in self.pages.values() for page in pages.values()
+        )
+
+    def __enter__(self) -> "MockGraphQLServer":
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                variables = body.get("variables", {})
+                with mock._lock:
+                    mock.requests += 1
+                    fail = mock._random.random() < mock.failure_rate
+                    bad_body = not fail and mock._random.random() < mock.bad_body_rate
+                    if fail or bad_body:
+                        mock.failures += 1
+                if mock.latency:
+                    time.sleep(mock.latency)
+                if fail:
+                    self._send(mock._random.choice([429, 503]), {"errors": ["try again"]})
+                    return
+                if bad_body:
+                    self._send(200, None, raw=b"<html><body>Bad gateway</body></html>")
+                    return
+                page = mock.pages.get(variables.get("const"), {}).get(variables.get("after"))
+                if page is None:
+                    page = {"data": {"title": {"reviews": {"edges": [], "pageInfo": {"hasNextPage": False}}}}}
+                self._send(200, page)
+
+            def _send(self, status, payload, raw=None):
+                data = raw if raw is not None else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                if status == 429:
+                    self.send_header("Retry-After", "0")
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,390 @@
+"""
+Reproducible benchmark suite over the pipeline hot paths.
+
+Every case runs on two corpora at each of `--sizes`:
+
+- `fixture`: the reviews of `artifacts/transformed_{train,test}_data.csv`,
+  replicated to the requested size (with their VADER labels);
+- `synthetic`: seeded random reviews mixing sentiment words, HTML tags,
+  entities, URLs and emoji, so cleaning has realistic work to do.
+
+Cases cover `clean_text_pipeline`, `analyze_sentiment_vader`, `score_batch`,
+`predict_from_dataframe`, `predict_from_csv`, the scraper's bulk upsert
+(`review_rows` + `INSERT ... ON CONFLICT`, against SQLite), TF-IDF and
+out-of-core training, trained-model inference and the per-movie sentiment
+aggregation. Each case is timed
+`--repeat` times after its setup; results (best/median/mean seconds and
+items/s) are written as JSON to `benchmarks/results/<commit>.json`.
+
+    python -m benchmarks.suite --sizes 1000 10000
+    python -m benchmarks.suite --only analyze_sentiment_vader predict_from_csv --repeat 5
+    python -m benchmarks.suite --compare benchmarks/results/abc1234.json benchmarks/results/def5678.json
+
+`--compare OLD NEW` prints the per-case speed ratio and exits non-zero if any
+case got slower than `--threshold` (default 10%).
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from benchmarks.common import BASE_DIR
+
+FIXTURE_CSVS = [
+    os.path.join(BASE_DIR, 'artifacts', 'transformed_train_data.csv'),
+    os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv'),
+]
+RESULTS_DIR = os.path.join(BASE_DIR, 'benchmarks', 'results')
+
+
+@dataclass
+class Corpus:
+    name: str
+    texts: List[str]
+    # VADER labels; only the fixture corpus has them (training cases need them)
+    labels: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def frame(self) -> pd.DataFrame:
+        df = pd.DataFrame({'id': range(1, len(self.texts) + 1), 'review_text': self.texts})
+        if self.labels is not None:
+            df['sentiment_label'] = self.labels
+        return df
+
+
+def fixture_corpus(size: int) -> Corpus:
+    df = pd.concat([pd.read_csv(path, usecols=['review_text', 'sentiment_label']) for path in FIXTURE_CSVS])
+    df = df.dropna(subset=['review_text'])
+    df = pd.concat([df] * (size // len(df) + 1), ignore_index=True).head(size)
+    return Corpus('fixture', df['review_text'].astype(str).tolist(), df['sentiment_label'].tolist())
+
+
+_WORDS = (
+    "the movie film plot acting story scene director cast ending character script pacing "
+    "soundtrack cinematography performance sequel it was is really very quite not never "
+    "and but so too a an of in with this that"
+).split()
+_SENTIMENT = (
+    "great good amazing wonderful brilliant superb loved enjoyable masterpiece fun "
+    "bad terrible awful boring dull hated disappointing worst mess weak"
+).split()
+_NOISE = ["<br/>", "<br><br>", "<i>", "</i>", "<b>", "</b>", "&amp;", "&quot;", "&#39;", "!!!", "...",
+          "http://example.com/review", "😂", "👍", "sooooo", " "]
+
+
+def synthetic_corpus(size: int, seed: int = 0) -> Corpus:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(size):
+        words = []
+        for _ in range(rng.randint(20, 250)):
+            roll = rng.random()
+            words.append(rng.choice(_SENTIMENT) if roll < 0.12 else rng.choice(_NOISE) if roll < 0.18
+                         else rng.choice(_WORDS))
+        texts.append(" ".join(words).capitalize() + ".")
+    return Corpus('synthetic', texts)
+
+
+CORPORA = {'fixture': fixture_corpus, 'synthetic': synthetic_corpus}
+
+
+@dataclass
+class Case:
+    name: str
+    # setup(corpus, workdir) -> the callable to time
+    setup: Callable[[Corpus, str], Callable[[], object]]
+    corpora: tuple = ('fixture', 'synthetic')
+    # Expensive cases run fewer times
+    max_repeat: Optional[int] = None
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, corpora: tuple = ('fixture', 'synthetic'), max_repeat: Optional[int] = None):
+    def register(setup):
+        CASES[name] = Case(name, setup, corpora, max_repeat)
+        return setup
+    return register
+
+
+@case('clean_text_pipeline')
+def _clean_text(corpus, workdir):
+    from src.components.data_transformation import clean_text_pipeline
+    texts = corpus.texts
+    return lambda: [clean_text_pipeline(text) for text in texts]
+
+
+@case('analyze_sentiment_vader')
+def _vader(corpus, workdir):
+    from src.components.data_transformation import analyze_sentiment_vader, clean_text_pipeline
+    from src.components.sentiment_scorer import warm_up_scorer
+    warm_up_scorer()
+    cleaned = [clean_text_pipeline(text) for text in corpus.texts]
+    return lambda: [analyze_sentiment_vader(text) for text in cleaned]
+
+
+@case('score_batch')
+def _score_batch(corpus, workdir):
+    from src.components.data_transformation import clean_text_pipeline, score_batch
+    from src.components.sentiment_scorer import warm_up_scorer
+    warm_up_scorer()
+    cleaned = [clean_text_pipeline(text) for text in corpus.texts]
+    return lambda: score_batch(cleaned)
+
+
+@case('predict_from_dataframe')
+def _predict_dataframe(corpus, workdir):
+    from src.components.sentiment_scorer import warm_up_scorer
+    from src.pipeline.predict_pipeline import predict_from_dataframe
+    warm_up_scorer()
+    df = corpus.frame()[['id', 'review_text']]
+    return lambda: predict_from_dataframe(df)
+
+
+@case('predict_from_csv')
+def _predict_csv(corpus, workdir):
+    from src.components.sentiment_scorer import warm_up_scorer
+    from src.pipeline.predict_pipeline import predict_from_csv
+    warm_up_scorer()
+    path = os.path.join(workdir, 'reviews.csv')
+    corpus.frame()[['id', 'review_text']].to_csv(path, index=False)
+    return lambda: predict_from_csv(path)
+
+
+# SQLite version of `data_collection.UPSERT_REVIEWS_SQL` (same conflict rule)
+_SQLITE_REVIEWS_SCHEMA = """
+CREATE TABLE reviews (
+    id INTEGER PRIMARY KEY,
+    movie_id TEXT,
+    movie_name TEXT,
+    review_text TEXT,
+    review_id TEXT UNIQUE
+)
+"""
+_SQLITE_UPSERT_SQL = """
+INSERT INTO reviews (review_id, movie_id, movie_name, review_text) VALUES (?, ?, ?, ?)
+ON CONFLICT (review_id) DO UPDATE
+SET movie_id = excluded.movie_id, movie_name = excluded.movie_name, review_text = excluded.review_text
+WHERE reviews.review_text IS NOT excluded.review_text
+"""
+
+
+@case('scraper_upsert_sqlite')
+def _scraper_upsert(corpus, workdir):
+    """Half the rows are re-scrapes of stored reviews (one in ten edited), half are new."""
+    from src.components.data_collection import review_rows
+    batch_size = 500
+    edges = [{"node": {"id": f"rw{i}", "text": {"originalText": {"plaidHtml": text}}}}
+             for i, text in enumerate(corpus.texts)]
+    stored = review_rows("tt0000001", "Benchmark Movie", edges[: len(edges) // 2])
+    page = [dict(edge) for edge in edges]
+    for i in range(0, len(page) // 2, 10):
+        page[i] = {"node": {**page[i]["node"], "text": {"originalText": {"plaidHtml": corpus.texts[i] + " (edited)"}}}}
+    seed, path = os.path.join(workdir, 'seed.sqlite'), os.path.join(workdir, 'reviews.sqlite')
+    conn = sqlite3.connect(seed)
+    conn.execute(_SQLITE_REVIEWS_SCHEMA)
+    conn.executemany(_SQLITE_UPSERT_SQL, stored)
+    conn.commit()
+    conn.close()
+
+    def run():
+        shutil.copyfile(seed, path)
+        conn = sqlite3.connect(path)
+        # What the collector does per flush: build rows, then one upsert + commit per batch
+        rows = review_rows("tt0000001", "Benchmark Movie", page)
+        for start in range(0, len(rows), batch_size):
+            conn.executemany(_SQLITE_UPSERT_SQL, rows[start:start + batch_size])
+            conn.commit()
+        conn.close()
+
+    return run
+
+
+def _trainer(corpus, workdir, **overrides):
+    from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+    train_path, test_path = os.path.join(workdir, 'train.csv'), os.path.join(workdir, 'test.csv')
+    df = corpus.frame()
+    split = int(len(df) * 0.8)
+    df.iloc[:split].to_csv(train_path, index=False)
+    df.iloc[split:].to_csv(test_path, index=False)
+    config = ModelTrainerConfig(
+        train_path=train_path,
+        test_path=test_path,
+        model_dir=os.path.join(workdir, 'models'),
+        results_path=os.path.join(workdir, 'results.json'),
+        feature_cache_dir=None,
+        candidates=['sgd', 'logreg'],
+        n_jobs=1,
+        **overrides,
+    )
+    return ModelTrainer(config)
+
+
+@case('train_tfidf', corpora=('fixture',), max_repeat=2)
+def _train_tfidf(corpus, workdir):
+    trainer = _trainer(corpus, workdir)
+    return lambda: _quietly(trainer.initiate_model_trainer)
+
+
+@case('train_out_of_core', corpora=('fixture',), max_repeat=2)
+def _train_out_of_core(corpus, workdir):
+    trainer = _trainer(corpus, workdir, chunk_rows=5000)
+    return lambda: _quietly(trainer.initiate_out_of_core_training)
+
+
+@case('model_inference', corpora=('fixture',))
+def _model_inference(corpus, workdir):
+    from src.components.data_transformation import clean_text_pipeline
+    from src.components.sentiment_model import SentimentModel
+    trainer = _trainer(corpus, workdir)
+    _quietly(trainer.initiate_model_trainer)
+    model = SentimentModel.load(trainer.trainer_config.model_dir)
+    cleaned = [clean_text_pipeline(text) for text in corpus.texts]
+    return lambda: model.predict_batch(cleaned)
+
+
+@case('aggregate_reviews', corpora=('fixture',))
+def _aggregate_reviews(corpus, workdir):
+    """Scored reviews spread over 500 movies, aggregated in one grouped pass."""
+    import numpy as np
+    from src.components.sentiment_aggregation import aggregate_reviews
+    rng = np.random.default_rng(0)
+    df = corpus.frame()
+    df['movie_id'] = [f"tt{i:07d}" for i in rng.integers(0, 500, len(df))]
+    df['movie_name'] = df['movie_id']
+    df['sentiment_compound'] = rng.uniform(-1, 1, len(df))
+    return lambda: aggregate_reviews(df)
+
+
+def _quietly(fn):
+    # The trainer prints full classification reports
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn()
+
+
+def _git(*args) -> Optional[str]:
+    try:
+        return subprocess.run(["git", *args], cwd=BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(sizes: List[int], names: List[str], repeat: int) -> dict:
+    results = {}
+    corpora = {}
+    for name in names:
+        bench = CASES[name]
+        for corpus_name in bench.corpora:
+            for size in sizes:
+                key = (corpus_name, size)
+                if key not in corpora:
+                    corpora[key] = CORPORA[corpus_name](size)
+                corpus = corpora[key]
+                workdir = tempfile.mkdtemp(prefix="bench_suite_")
+                try:
+                    fn = bench.setup(corpus, workdir)
+                    times = []
+                    for _ in range(min(repeat, bench.max_repeat or repeat)):
+                        start = time.perf_counter()
+                        fn()
+                        times.append(time.perf_counter() - start)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+                best = min(times)
+                result_key = f"{name}[{corpus_name}-{size}]"
+                results[result_key] = {
+                    "case": name,
+                    "corpus": corpus_name,
+                    "size": size,
+                    "repeat": len(times),
+                    "best_s": round(best, 6),
+                    "median_s": round(statistics.median(times), 6),
+                    "mean_s": round(statistics.fmean(times), 6),
+                    "items_per_s": round(len(corpus) / best, 1) if best else None,
+                }
+                print(f"{result_key:<48} {best:>9.3f} s  {len(corpus) / best:>11.1f} items/s", flush=True)
+
+    dirty = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "commit": _git("rev-parse", "HEAD"),
+        "dirty": bool(dirty),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": sizes,
+        "results": results,
+    }
+
+
+def compare(old_path: str, new_path: str, threshold: float) -> int:
+    """Print per-case speed ratios; return the number of regressions beyond `threshold`."""
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"old: {old.get('commit')}  new: {new.get('commit')}")
+    print(f"{'case':<48} {'old s':>9} {'new s':>9} {'ratio':>7}")
+    regressions = 0
+    for key, result in new["results"].items():
+        base = old["results"].get(key)
+        if base is None:
+            continue
+        ratio = result["best_s"] / base["best_s"] if base["best_s"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag, regressions = "  SLOWER", regressions + 1
+        elif ratio < 1 - threshold:
+            flag = "  faster"
+        print(f"{key:<48} {base['best_s']:>9.3f} {result['best_s']:>9.3f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=None, help="cases to run")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), default=None)
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, threshold=args.threshold) else 0)
+
+    report = run_suite(args.sizes, args.only or list(CASES), args.repeat)
+    output = args.output
+    if output is None:
+        label = (report["commit"] or "nogit")[:12] + ("-dirty" if report["dirty"] else "")
+        output = os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import io
 import sys
 from pathlib import Path
@@ -13,8 +14,55 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from src.pipeline.predict_pipeline import (
     predict_from_dataframe,
+    score_texts,
     summarize_predictions,
 )
+from src.components.data_transformation import get_result_cache
+from src.components.sentiment_aggregation import aggregate_reviews
+from src.components.sentiment_scorer import warm_up_scorer
+
+# Rows scored between progress-bar updates
+PROGRESS_CHUNK_ROWS = 2000
+PREVIEW_MAX_ROWS = 1000
+
+
+@st.cache_resource(show_spinner="Loading the VADER lexicon...")
+def _load_scorer():
+    """Warm up VADER and return the shared result cache, once per server process."""
+    warm_up_scorer()
+    return get_result_cache()
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _parse_upload(file_hash: str, _data: bytes) -> pd.DataFrame:
+    # Keyed on the content hash, so reruns and re-uploads of the same file skip parsing
+    return pd.read_csv(io.BytesIO(_data))
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _predict(file_hash: str, column: str, _df: pd.DataFrame) -> pd.DataFrame:
+    """Score `_df[column]` in chunks with a progress bar; cached per (file, column)."""
+    cache = _load_scorer()
+    progress = st.progress(0.0, text="Running the sentiment pipeline...")
+    parts = []
+    for start in range(0, len(_df), PROGRESS_CHUNK_ROWS):
+        chunk = _df.iloc[start:start + PROGRESS_CHUNK_ROWS]
+        parts.append(predict_from_dataframe(chunk, text_column=column, cache=cache))
+        done = start + len(chunk)
+        progress.progress(done / len(_df), text=f"Scored {done:,} / {len(_df):,} reviews")
+    progress.empty()
+    return pd.concat(parts)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _movie_table(file_hash: str, column: str, _predictions: pd.DataFrame) -> pd.DataFrame:
+    return aggregate_reviews(_predictions).drop(columns=["m2_compound"])
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _predictions_csv(file_hash: str, column: str, _predictions: pd.DataFrame) -> bytes:
+    return _predictions.to_csv(index=False).encode("utf-8")
+
 
 st.set_page_config(
     page_title="IMDB Review Sentiment",
@@ -22,6 +70,9 @@ st.set_page_config(
     layout="wide",
 )
 
+# Load the VADER lexicon once per server process, not on the first click.
+_load_scorer()
+
 st.title("🎬 IMDB Review Sentiment Explorer")
 st.write(
     "Upload a CSV containing a `review_text` column (or pick another column) "
@@ -48,17 +99,18 @@ with st.expander("Quick single-text check"):
         if not sample_text.strip():
             st.warning("Please provide some text before running the analysis.")
         else:
-            df_single = pd.DataFrame({"review_text": [sample_text]})
-            prediction = predict_from_dataframe(df_single)
-            st.write("Prediction:", prediction["sentiment_label"].iloc[0].upper())
-            st.json(prediction.iloc[0].to_dict())
+            prediction = score_texts([sample_text], cache=_load_scorer())[0]
+            st.write("Prediction:", prediction["sentiment_label"].upper())
+            st.json({"review_text": sample_text, **prediction})
 
 
 uploaded_file = st.file_uploader("Upload CSV file", type=["csv"])
 
 if uploaded_file:
+    data = uploaded_file.getvalue()
+    file_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
     try:
-        uploaded_df = pd.read_csv(uploaded_file)
+        uploaded_df = _parse_upload(file_hash, data)
     except Exception as exc:
         st.error(f"Could not read CSV: {exc}")
         st.stop()
@@ -75,23 +127,36 @@ if uploaded_file:
         index=candidate_columns.index("review_text") if "review_text" in candidate_columns else 0,
     )
 
+    # Keep showing results across reruns (preview changes, downloads) once generated
+    prediction_key = (file_hash, selected_column)
     if st.button("Generate predictions for dataset", type="primary"):
-        with st.spinner("Running the sentiment pipeline..."):
-            try:
-                predictions = predict_from_dataframe(uploaded_df, text_column=selected_column)
-            except Exception as exc:
-                st.error(f"Prediction failed: {exc}")
-                st.stop()
+        st.session_state["prediction_key"] = prediction_key
+
+    if st.session_state.get("prediction_key") == prediction_key:
+        try:
+            predictions = _predict(file_hash, selected_column, uploaded_df)
+        except Exception as exc:
+            st.error(f"Prediction failed: {exc}")
+            st.stop()
 
         _display_summary(predictions)
-        st.subheader("Preview (first 200 rows)")
-        st.dataframe(predictions.head(200), use_container_width=True)
+        if "movie_id" in predictions.columns:
+            st.subheader("Per-movie sentiment")
+            st.dataframe(_movie_table(file_hash, selected_column, predictions), use_container_width=True)
+        labels = st.multiselect(
+            "Show labels",
+            options=["positive", "neutral", "negative"],
+            default=["positive", "neutral", "negative"],
+        )
+        preview_rows = st.number_input("Preview rows", min_value=1, max_value=PREVIEW_MAX_ROWS, value=200, step=50)
+        preview = predictions[predictions["sentiment_label"].isin(labels)].head(preview_rows)
+        st.subheader(f"Preview (first {len(preview)} rows)")
+        st.dataframe(preview, use_container_width=True)
 
-        buffer = io.StringIO()
-        predictions.to_csv(buffer, index=False)
+        # The CSV is only built when the button is clicked, then cached
         st.download_button(
             label="Download predictions as CSV",
-            data=buffer.getvalue(),
+            data=lambda: _predictions_csv(file_hash, selected_column, predictions),
             file_name="sentiment_predictions.csv",
             mime="text/csv",
         )
@@ -99,4 +164,3 @@ if uploaded_file:
 
 else:
     st.info("Upload a CSV to unlock batch predictions.")
-
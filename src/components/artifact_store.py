@@ -0,0 +1,353 @@
+"""
+Pluggable on-disk format for the pipeline's tabular artifacts.
+
+Stages name their artifacts by a CSV path (e.g. `artifacts/raw_data.csv`);
+`ArtifactStore` swaps in the extension of the format selected under
+`artifacts:` in `config/config.yaml`:
+
+- `parquet`: compressed, columnar, row groups carry min/max statistics so an
+  `id > watermark` filter skips old row groups without decoding them.
+- `feather`: Arrow IPC files, memory-mapped on read (zero-copy when
+  uncompressed).
+- `csv`: plain text, kept for exports and for tools that only speak CSV.
+
+Parquet and Feather artifacts are directories of `part-NNNNN` files: a full
+write replaces the parts, an append adds a new one. Reads can project columns
+(`columns=[...]`) and, for Parquet, push down `filters`.
+
+    python -m src.components.artifact_store export artifacts/transformed_data.parquet
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from src.utils import load_config
+
+EXTENSIONS = {"parquet": ".parquet", "feather": ".feather", "csv": ".csv"}
+# Upper bound on rows per parquet row group / feather record batch. Streaming
+# readers decode one of these at a time, so it caps their memory use.
+MAX_CHUNK_ROWS = 32_768
+
+
+@dataclass
+class ArtifactStoreConfig:
+    # parquet | feather | csv
+    format: str = "parquet"
+    # Codec for parquet/feather (e.g. zstd, snappy, lz4, none)
+    compression: str = "zstd"
+    memory_map: bool = True
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "ArtifactStoreConfig":
+        """Build from the `artifacts:` section of `config/config.yaml`."""
+        section = (load_config() if config is None else config).get("artifacts") or {}
+        return cls(**{key: value for key, value in section.items() if key in cls.__dataclass_fields__})
+
+
+def artifact_format(path: str) -> str:
+    """Infer the storage format from a path's extension."""
+    extension = os.path.splitext(path.rstrip(os.sep))[1].lower()
+    for name, known in EXTENSIONS.items():
+        if extension == known:
+            return name
+    raise ValueError(f"Unsupported artifact extension '{extension}' for {path}")
+
+
+def _parts(path: str) -> List[str]:
+    if not os.path.isdir(path):
+        return []
+    return sorted(os.path.join(path, name) for name in os.listdir(path) if name.startswith("part-"))
+
+
+def read_artifact(
+    path: str,
+    columns: Optional[Sequence[str]] = None,
+    filters: Optional[list] = None,
+    memory_map: bool = True,
+) -> pd.DataFrame:
+    """Read an artifact, loading only `columns` and (parquet) only rows matching `filters`.
+
+    `filters` uses the pyarrow form, e.g. `[("id", ">", 100)]`. For CSV and
+    Feather the filter is applied after reading.
+    """
+    columns = list(columns) if columns is not None else None
+    fmt = artifact_format(path)
+    if fmt == "parquet":
+        return pq.read_table(path, columns=columns, filters=filters, memory_map=memory_map).to_pandas()
+
+    if fmt == "csv":
+        df = pd.read_csv(path, usecols=columns)
+    else:
+        read_columns = columns
+        if columns is not None and filters:
+            read_columns = list(dict.fromkeys(columns + [column for column, _, _ in filters]))
+        tables = [feather.read_table(part, columns=read_columns, memory_map=memory_map) for part in _parts(path)]
+        if not tables:
+            raise FileNotFoundError(f"No artifact parts found in {path}")
+        df = pa.concat_tables(tables).to_pandas()
+    if filters:
+        df = df[_filter_mask(df, filters)]
+        if columns is not None:
+            df = df[columns]
+    return df.reset_index(drop=True)
+
+
+def iter_artifact(
+    path: str,
+    batch_rows: int = 50_000,
+    columns: Optional[Sequence[str]] = None,
+    fmt: Optional[str] = None,
+    filters: Optional[list] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield an artifact as DataFrames of at most `batch_rows` rows, never loading it whole.
+
+    Batches come out in file order. Rows not matching `filters` are dropped
+    (parquet skips whole row groups using their statistics), and batches left
+    empty by a filter are not yielded.
+    """
+    columns = list(columns) if columns is not None else None
+    fmt = fmt or artifact_format(path)
+    read_columns = columns
+    if columns is not None and filters:
+        read_columns = list(dict.fromkeys(columns + [column for column, _, _ in filters]))
+
+    for frame in _iter_frames(path, fmt, batch_rows, read_columns, filters):
+        if filters and fmt != "parquet":
+            frame = frame[_filter_mask(frame, filters)]
+        if columns is not None and read_columns != columns:
+            frame = frame[columns]
+        if filters and frame.empty:
+            continue
+        yield frame
+
+
+def _iter_frames(path, fmt, batch_rows, columns, filters) -> Iterator[pd.DataFrame]:
+    if fmt == "csv":
+        yield from pd.read_csv(path, usecols=columns, chunksize=batch_rows)
+        return
+
+    # Streaming parquet reads use plain reads without pre-buffering: mapping or
+    # pre-buffering whole row groups would make resident memory track file size.
+    for part in (_parts(path) if os.path.isdir(path) else [path]):
+        if fmt == "parquet" and filters:
+            expression = pq.filters_to_expression(filters)
+            batches = ds.dataset(part, format="parquet").to_batches(
+                columns=columns, filter=expression, batch_size=batch_rows,
+                fragment_scan_options=ds.ParquetFragmentScanOptions(pre_buffer=False),
+            )
+        elif fmt == "parquet":
+            batches = pq.ParquetFile(part, pre_buffer=False).iter_batches(batch_size=batch_rows, columns=columns)
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(part))
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        for batch in batches:
+            if fmt == "feather" and columns is not None:
+                batch = batch.select(columns)
+            for start in range(0, batch.num_rows, batch_rows):
+                yield batch.slice(start, batch_rows).to_pandas()
+
+
+def _filter_mask(df: pd.DataFrame, filters: list) -> pd.Series:
+    operators = {
+        "=": pd.Series.eq, "==": pd.Series.eq, "!=": pd.Series.ne,
+        ">": pd.Series.gt, ">=": pd.Series.ge, "<": pd.Series.lt, "<=": pd.Series.le,
+        "in": pd.Series.isin,
+    }
+    mask = pd.Series(True, index=df.index)
+    for column, op, value in filters:
+        mask &= operators[op](df[column], value)
+    return mask
+
+
+class ArtifactWriter:
+    """Write a DataFrame to an artifact in one or more chunks.
+
+    Each chunk becomes a row group (parquet) or record batch (feather) of a
+    single new part file, or is appended to the CSV. With `append=False` any
+    existing artifact is replaced.
+    """
+
+    def __init__(self, path: str, append: bool = False, compression: str = "zstd", fmt: Optional[str] = None):
+        self.path = path
+        self.format = fmt or artifact_format(path)
+        self.compression = None if compression in (None, "none") else compression
+        self.rows = 0
+        self._writer = None
+        self._schema: Optional[pa.Schema] = None
+        self._empty: Optional[pd.DataFrame] = None
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        if not append and os.path.exists(path):
+            shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+        self._header = not os.path.exists(path)
+        if self.format != "csv":
+            os.makedirs(path, exist_ok=True)
+            existing = _parts(path)
+            # Later parts must match the existing schema (e.g. keep int64 ids
+            # even if a chunk happens to be all-null)
+            if existing:
+                self._schema = (
+                    pq.read_schema(existing[-1]) if self.format == "parquet"
+                    else pa.ipc.open_file(pa.memory_map(existing[-1])).schema
+                )
+            self._part_path = os.path.join(path, f"part-{len(existing):05d}{EXTENSIONS[self.format]}")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.format == "csv":
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+            self.rows += len(df)
+            return
+
+        if df.empty and self._schema is None:
+            # An empty frame carries no column types; wait for real rows
+            self._empty = df
+            return
+        table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+        if self._schema is None:
+            table = table.replace_schema_metadata(None)
+            self._schema = table.schema
+        if self._writer is None:
+            if self.format == "parquet":
+                self._writer = pq.ParquetWriter(self._part_path, self._schema, compression=self.compression or "none")
+            else:
+                options = pa.ipc.IpcWriteOptions(compression=self.compression)
+                self._writer = pa.ipc.new_file(self._part_path, self._schema, options=options)
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=MAX_CHUNK_ROWS)
+        else:
+            self._writer.write_table(table, max_chunksize=MAX_CHUNK_ROWS)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._writer is None and self._empty is not None:
+            # Nothing but empty chunks: still leave a (typeless) part behind
+            self._schema = pa.Table.from_pandas(self._empty, preserve_index=False).replace_schema_metadata(None).schema
+            self._empty = None
+            self.write(pd.DataFrame(columns=self._schema.names))
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ArtifactWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_artifact(df: pd.DataFrame, path: str, append: bool = False, compression: str = "zstd") -> None:
+    with ArtifactWriter(path, append=append, compression=compression) as writer:
+        writer.write(df)
+
+
+def snapshot(paths: Sequence[str]) -> Dict[str, object]:
+    """Record the committed extent of artifacts: a byte size for files, the part list for directories."""
+    state: Dict[str, object] = {}
+    for path in paths:
+        if os.path.isdir(path):
+            state[path] = [os.path.basename(part) for part in _parts(path)]
+        elif os.path.exists(path):
+            state[path] = os.path.getsize(path)
+    return state
+
+
+def rollback(state: Dict[str, object]) -> None:
+    """Undo appends made after `snapshot()`: truncate files, drop newer parts."""
+    for path, extent in state.items():
+        if isinstance(extent, list):
+            keep = set(extent)
+            for part in _parts(path):
+                if os.path.basename(part) not in keep:
+                    os.remove(part)
+        elif os.path.isfile(path) and os.path.getsize(path) > extent:
+            with open(path, "r+b") as f:
+                f.truncate(extent)
+
+
+class ArtifactStore:
+    """Reads and writes stage artifacts in the configured format."""
+
+    def __init__(self, config: Optional[ArtifactStoreConfig] = None):
+        self.config = config or ArtifactStoreConfig.from_config()
+        if self.config.format not in EXTENSIONS:
+            raise ValueError(f"Unknown artifact format '{self.config.format}'; expected one of {sorted(EXTENSIONS)}")
+
+    @property
+    def format(self) -> str:
+        return self.config.format
+
+    def resolve(self, path: str) -> str:
+        """Map a stage's artifact path onto the configured format's extension."""
+        return os.path.splitext(path)[0] + EXTENSIONS[self.config.format]
+
+    def exists(self, path: str) -> bool:
+        resolved = self.resolve(path)
+        return os.path.isfile(resolved) if self.format == "csv" else bool(_parts(resolved))
+
+    def read(self, path: str, columns: Optional[Sequence[str]] = None, filters: Optional[list] = None) -> pd.DataFrame:
+        resolved = self.resolve(path)
+        if not os.path.exists(resolved) and os.path.exists(path):
+            # Artifact written before the format was switched (e.g. an existing CSV)
+            resolved = path
+        return read_artifact(resolved, columns=columns, filters=filters, memory_map=self.config.memory_map)
+
+    def iter(
+        self,
+        path: str,
+        batch_rows: int = 50_000,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[list] = None,
+    ) -> Iterator[pd.DataFrame]:
+        """Stream an artifact in batches (see `iter_artifact`)."""
+        resolved = self.resolve(path)
+        if not os.path.exists(resolved) and os.path.exists(path):
+            resolved = path
+        return iter_artifact(resolved, batch_rows=batch_rows, columns=columns, filters=filters)
+
+    def writer(self, path: str, append: bool = False) -> ArtifactWriter:
+        return ArtifactWriter(self.resolve(path), append=append, compression=self.config.compression)
+
+    def write(self, df: pd.DataFrame, path: str, append: bool = False) -> str:
+        with self.writer(path, append=append) as writer:
+            writer.write(df)
+        return writer.path
+
+
+_default_store: Optional[ArtifactStore] = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the store configured by `config/config.yaml` (built once per process)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = ArtifactStore()
+    return _default_store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert pipeline artifacts between formats")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export", help="write an artifact out in another format (CSV by default)")
+    export.add_argument("path", help="artifact to read, e.g. artifacts/transformed_data.parquet")
+    export.add_argument("--to", default="csv", choices=sorted(EXTENSIONS), help="target format")
+    export.add_argument("--output", default=None, help="target path (defaults to the same name with the new extension)")
+    args = parser.parse_args()
+
+    df = read_artifact(args.path)
+    output = args.output or os.path.splitext(args.path.rstrip(os.sep))[0] + EXTENSIONS[args.to]
+    write_artifact(df, output)
+    print(f"Wrote {len(df)} rows to {output}")
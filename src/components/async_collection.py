@@ -0,0 +1,187 @@
+"""
+Concurrent IMDB review scraping with asyncio + aiohttp.
+
+`AsyncReviewScraper` paginates many movies at once over a single pooled
+`aiohttp` session. All requests share one token-bucket rate limiter, the
+connector caps connections per host, and 429/5xx responses, network errors
+and 200 responses whose body is not JSON are retried with exponential
+backoff and full jitter. A movie whose crawl raises is recorded in
+`ScrapeStats.failed_movies` without stopping the other movies.
+
+What to do with each page is left to the caller: `run(crawls)` drives
+crawl objects shaped like `data_collection.MovieCrawl` (`movie_id`,
+`movie_name`, `start_cursor`, `handle_page(edges, page_info) -> bool` and
+`finish(completed)`), always from the event-loop thread. Pointing `base_url` at a local server that replays canned
+`TitleReviewsRefine` pages (see `benchmarks/mock_graphql_server.py`) makes
+the scraper testable offline.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from src import metrics
+from src.components.data_collection import (
+    IMDB_GRAPHQL_URL,
+    build_reviews_payload,
+    parse_reviews_page,
+)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class AsyncCollectionConfig:
+    base_url: str = IMDB_GRAPHQL_URL
+    page_size: int = 25
+    # Movies paginated at the same time
+    max_concurrent_movies: int = 8
+    # Open connections per host in the shared connection pool
+    per_host_limit: int = 4
+    # Global token bucket: sustained requests/second and burst size
+    requests_per_second: float = 2.0
+    burst: int = 4
+    max_retries: int = 5
+    backoff_base: float = 1.0
+    backoff_max: float = 60.0
+    timeout: float = 30.0
+
+
+@dataclass
+class ScrapeStats:
+    requests: int = 0
+    retries: int = 0
+    pages: int = 0
+    failed_movies: List[str] = field(default_factory=list)
+
+
+class TokenBucket:
+    """Asyncio token-bucket rate limiter shared by all concurrent requests."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class AsyncReviewScraper:
+    def __init__(self, config: AsyncCollectionConfig, headers: Dict[str, str]):
+        self.config = config
+        self.headers = headers
+        self.stats = ScrapeStats()
+
+    def run(self, crawls: list) -> ScrapeStats:
+        """Page through every crawl concurrently."""
+        return asyncio.run(self.run_async(crawls))
+
+    async def run_async(self, crawls: list) -> ScrapeStats:
+        limiter = TokenBucket(self.config.requests_per_second, self.config.burst)
+        movie_slots = asyncio.Semaphore(self.config.max_concurrent_movies)
+        connector = aiohttp.TCPConnector(limit_per_host=self.config.per_host_limit)
+        timeout = aiohttp.ClientTimeout(total=self.config.timeout)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers=self.headers) as session:
+
+            async def scrape_one(crawl) -> None:
+                async with movie_slots:
+                    try:
+                        await self._scrape_movie(session, limiter, crawl)
+                    except Exception as e:
+                        self._movie_failed(crawl, e)
+
+            await asyncio.gather(*(scrape_one(crawl) for crawl in crawls))
+        return self.stats
+
+    def _movie_failed(self, crawl, error: Exception) -> None:
+        """Record a crawl that raised; its incomplete state is kept for the next run."""
+        print(f"Failed to scrape {crawl.movie_name}: {error!r}")
+        self.stats.failed_movies.append(crawl.movie_name)
+        try:
+            crawl.finish(False)
+        except Exception as e:
+            print(f"Could not save the crawl state of {crawl.movie_name}: {e!r}")
+
+    async def _scrape_movie(self, session, limiter, crawl) -> None:
+        after_cursor = crawl.start_cursor
+        while True:
+            payload = build_reviews_payload(crawl.movie_id, after_cursor, self.config.page_size)
+            data = await self._fetch_page(session, limiter, payload)
+            if data is None:
+                print(f"Failed to fetch data for {crawl.movie_name}")
+                self.stats.failed_movies.append(crawl.movie_name)
+                crawl.finish(False)
+                return
+
+            edges, page_info = parse_reviews_page(data)
+            if not edges:
+                print(f"No more reviews found for {crawl.movie_name}")
+                crawl.finish(True)
+                return
+
+            self.stats.pages += 1
+            if not crawl.handle_page(edges, page_info):
+                crawl.finish(True)
+                return
+            after_cursor = page_info.get("endCursor")
+
+    async def _fetch_page(self, session, limiter, payload) -> Optional[dict]:
+        for attempt in range(self.config.max_retries + 1):
+            await limiter.acquire()
+            self.stats.requests += 1
+            retry_after, status, start = None, "error", time.perf_counter()
+            try:
+                async with session.post(self.config.base_url, json=payload) as response:
+                    status = response.status
+                    if response.status not in RETRY_STATUSES:
+                        response.raise_for_status()
+                        return await response.json(content_type=None)
+                    retry_after = _retry_after_seconds(response.headers.get("Retry-After"))
+            except aiohttp.ClientResponseError as e:
+                # Non-retryable HTTP error (e.g. 400/403/404)
+                print(f"Request failed with status {e.status}: {e.message}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+            except ValueError:
+                # A 200 whose body is not JSON (truncated, or a proxy's HTML error page)
+                pass
+            finally:
+                metrics.inc("http_requests_total", client="async", status=status)
+                metrics.observe("http_request_seconds", time.perf_counter() - start, client="async")
+
+            if attempt == self.config.max_retries:
+                break
+            self.stats.retries += 1
+            delay = self._backoff(attempt) if retry_after is None else min(retry_after, self.config.backoff_max)
+            await asyncio.sleep(delay)
+        return None
+
+    def _backoff(self, attempt: int) -> float:
+        # Exponential backoff with "full jitter"
+        return random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
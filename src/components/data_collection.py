@@ -1,132 +1,433 @@
+import argparse
 import os
 import requests
-import psycopg2
+from psycopg2.extras import execute_values
 import json
 import time
 
+from src import metrics
+from src.components import db
+
+IMDB_GRAPHQL_URL = "https://caching.graphql.imdb.com/"
+REVIEWS_QUERY_HASH = "d389bc70c27f09c00b663705f0112254e8a7c75cde1cfd30e63a2d98c1080c87"
+URLS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "urls.json")
+
+# Legacy tables predate `review_id`; add it (and the unique index the upsert
+# relies on) in place. Rows without an IMDB id keep NULL and never conflict.
+# `updated_at` moves whenever the upsert rewrites a review, so ingestion can
+# tell an edited table from an unchanged one (existing rows get the time of
+# the ALTER).
+REVIEWS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reviews (
+    id SERIAL PRIMARY KEY,
+    movie_id TEXT,
+    movie_name TEXT,
+    review_text TEXT
+);
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS review_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS reviews_review_id_key ON reviews (review_id);
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+CREATE INDEX IF NOT EXISTS reviews_updated_at_idx ON reviews (updated_at);
+"""
+
+# `xmax = 0` is only true for freshly inserted rows, which lets one statement
+# report inserts vs. updates. Unchanged re-scraped reviews are left untouched.
+UPSERT_REVIEWS_SQL = """
+INSERT INTO reviews (review_id, movie_id, movie_name, review_text)
+VALUES %s
+ON CONFLICT (review_id) DO UPDATE
+SET movie_id = EXCLUDED.movie_id,
+    movie_name = EXCLUDED.movie_name,
+    review_text = EXCLUDED.review_text,
+    updated_at = now()
+WHERE reviews.review_text IS DISTINCT FROM EXCLUDED.review_text
+RETURNING (xmax = 0) AS inserted
+"""
+
+# Per-movie crawl state. While a full crawl is running `end_cursor` is the
+# cursor of the next page to fetch, so an interrupted crawl can resume there.
+SCRAPE_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scrape_state (
+    movie_id TEXT PRIMARY KEY,
+    end_cursor TEXT,
+    crawl_in_progress BOOLEAN NOT NULL DEFAULT FALSE,
+    newest_review_id TEXT,
+    last_full_crawl_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+UPSERT_STATE_SQL = """
+INSERT INTO scrape_state (movie_id, end_cursor, crawl_in_progress, newest_review_id, last_full_crawl_at, updated_at)
+VALUES (%(movie_id)s, %(end_cursor)s, %(crawl_in_progress)s, %(newest_review_id)s,
+        CASE WHEN %(full_crawl_done)s THEN now() END, now())
+ON CONFLICT (movie_id) DO UPDATE
+SET end_cursor = EXCLUDED.end_cursor,
+    crawl_in_progress = EXCLUDED.crawl_in_progress,
+    newest_review_id = COALESCE(EXCLUDED.newest_review_id, scrape_state.newest_review_id),
+    last_full_crawl_at = COALESCE(EXCLUDED.last_full_crawl_at, scrape_state.last_full_crawl_at),
+    updated_at = now()
+"""
+
+
+def build_reviews_payload(movie_id, after_cursor=None, first=25):
+    """GraphQL payload for one page of the persisted `TitleReviewsRefine` query.
+
+    Reviews are requested newest first, so a refresh crawl can stop as soon as
+    it reaches the newest review of the previous crawl.
+    """
+    variables = {
+        "after": after_cursor,
+        "const": movie_id,
+        "first": first,
+        "locale": "en-US",
+        "sort": {"by": "SUBMISSION_DATE", "order": "DESC"},
+        "filter": {}
+    }
+
+    extensions = {
+        "persistedQuery": {
+            "sha256Hash": REVIEWS_QUERY_HASH,
+            "version": 1
+        }
+    }
+
+    return {
+        "operationName": "TitleReviewsRefine",
+        "variables": variables,
+        "extensions": extensions
+    }
+
+
+def parse_reviews_page(data):
+    """Return (edges, page_info) from a `TitleReviewsRefine` response."""
+    reviews_section = data.get("data", {}).get("title", {}).get("reviews", {})
+    return reviews_section.get("edges", []), reviews_section.get("pageInfo", {})
+
+
+def review_rows(movie_id, movie_name, edges):
+    """Rows `(review_id, movie_id, movie_name, review_text)` for the non-empty reviews in `edges`."""
+    rows = []
+    for e in edges:
+        node = e.get("node", {})
+        review_text = node.get("text", {}).get("originalText", {}).get("plaidHtml", "")
+        if review_text.strip():
+            rows.append((node.get("id"), movie_id, movie_name, review_text))
+    return rows
+
+
+class MovieCrawl:
+    """One pass over a movie's review pages: where to start, what to keep, when to stop.
+
+    - "full": first crawl (or `full_recrawl`); every page is stored and the
+      next-page cursor is checkpointed with each flush.
+    - "resume": a full crawl that was interrupted; restarts at the saved cursor.
+    - "refresh": the movie was fully crawled before; pages are fetched from the
+      newest review and paging stops at the newest review of the last completed
+      crawl (`scrape_state.newest_review_id`). That marker only moves when a
+      refresh completes, so an interrupted refresh is redone from the top and
+      does not stop early at the newer reviews it already stored.
+
+    Both the sync and async scrapers drive a crawl through `start_cursor`,
+    `handle_page()` and `finish()`.
+    """
+
+    def __init__(self, collector, movie_id, movie_name, state=None, full_recrawl=False):
+        self.collector = collector
+        self.movie_id = movie_id
+        self.movie_name = movie_name
+        self.collected = 0
+        self.newest_review_id = None
+        self.stop_at_review_id = None
+        if state is None or full_recrawl:
+            self.mode, self.start_cursor = "full", None
+        elif state["crawl_in_progress"]:
+            self.mode, self.start_cursor = "resume", state["end_cursor"]
+        else:
+            self.mode, self.start_cursor = "refresh", None
+        if self.mode == "resume":
+            self.newest_review_id = state["newest_review_id"]
+        elif self.mode == "refresh":
+            self.stop_at_review_id = state["newest_review_id"]
+
+    def handle_page(self, edges, page_info):
+        """Buffer one page of reviews; returns True if the next page should be fetched."""
+        rows = review_rows(self.movie_id, self.movie_name, edges)
+        if self.newest_review_id is None and rows:
+            self.newest_review_id = rows[0][0]
+
+        reached_known = False
+        if self.mode == "refresh":
+            page_ids = [row[0] for row in rows]
+            if self.stop_at_review_id is not None:
+                reached_known = self.stop_at_review_id in page_ids
+                if reached_known:
+                    rows = rows[:page_ids.index(self.stop_at_review_id)]
+            known = self.collector.known_review_ids([row[0] for row in rows])
+            if self.stop_at_review_id is None:
+                # No marker from a completed crawl (legacy state): stop at any stored review
+                reached_known = bool(known)
+            rows = [row for row in rows if row[0] not in known]
+
+        has_next = page_info.get("hasNextPage", False) and not reached_known
+        if self.mode != "refresh":
+            self.collector.checkpoint(self.movie_id, page_info.get("endCursor"), True, self.newest_review_id)
+        self.collected += self.collector.buffer_rows(rows)
+        return has_next
+
+    def finish(self, completed):
+        """Record the outcome; an incomplete full crawl keeps its cursor for the next run."""
+        if completed:
+            self.collector.checkpoint(
+                self.movie_id, None, False, self.newest_review_id, full_crawl_done=self.mode != "refresh"
+            )
+        self.collector.flush()
+        print(f"Total reviews collected for {self.movie_name} ({self.mode} crawl): {self.collected}")
+
+
 class DataCollector:
-    def __init__(self, db_config):
+    def __init__(self, db_config: db.DatabaseConfig = None, batch_size=500):
         try:
-            self.conn = psycopg2.connect(**db_config)
+            # Borrowed from the shared pool and returned by close(), so later collectors
+            # in the same process (e.g. pipeline runs) reuse the open connection
+            self.conn = db.get_engine(db_config).raw_connection()
             self.cur = self.conn.cursor()
             print("Connected to Postgres successfully!")
         except Exception as e:
             print("Failed to connect to Postgres:", e)
             raise
+        self.batch_size = batch_size
+        self.rows_upserted = 0
+        self._buffer = []
+        self._pending_state = {}
+        self.ensure_schema()
+
+    def ensure_schema(self):
+        self.cur.execute(REVIEWS_SCHEMA)
+        self.cur.execute(SCRAPE_STATE_SCHEMA)
+        self.conn.commit()
+        metrics.inc("db_roundtrips_total", 3, op="schema")
+
+    def load_state(self, movie_id):
+        self.cur.execute(
+            "SELECT end_cursor, crawl_in_progress, newest_review_id, last_full_crawl_at "
+            "FROM scrape_state WHERE movie_id = %s",
+            (movie_id,)
+        )
+        metrics.inc("db_roundtrips_total", op="load_state")
+        row = self.cur.fetchone()
+        if row is None:
+            return None
+        return dict(zip(("end_cursor", "crawl_in_progress", "newest_review_id", "last_full_crawl_at"), row))
 
-    def scrape_and_store(self, movie_id, movie_name, headers, first=25):
-        base_url = "https://caching.graphql.imdb.com/"
-        after_cursor = None
-        total_inserted = 0
+    def start_crawl(self, movie_id, movie_name, full_recrawl=False):
+        return MovieCrawl(self, movie_id, movie_name, self.load_state(movie_id), full_recrawl=full_recrawl)
+
+    def known_review_ids(self, review_ids):
+        """Return the subset of `review_ids` already in the buffer or the reviews table."""
+        review_ids = [rid for rid in review_ids if rid is not None]
+        if not review_ids:
+            return set()
+        wanted = set(review_ids)
+        known = {row[0] for row in self._buffer if row[0] in wanted}
+        self.cur.execute("SELECT review_id FROM reviews WHERE review_id = ANY(%s)", (review_ids,))
+        metrics.inc("db_roundtrips_total", op="known_ids")
+        known.update(row[0] for row in self.cur.fetchall())
+        return known
+
+    def checkpoint(self, movie_id, end_cursor, crawl_in_progress, newest_review_id, full_crawl_done=False):
+        """Queue a scrape_state update; it is written in the same transaction as the next flush,
+        so a saved cursor never points past reviews that were not committed."""
+        self._pending_state[movie_id] = {
+            "movie_id": movie_id,
+            "end_cursor": end_cursor,
+            "crawl_in_progress": crawl_in_progress,
+            "newest_review_id": newest_review_id,
+            "full_crawl_done": full_crawl_done,
+        }
+
+    def scrape_and_store(self, movie_id, movie_name, headers, first=25, full_recrawl=False):
+        base_url = IMDB_GRAPHQL_URL
+        crawl = self.start_crawl(movie_id, movie_name, full_recrawl=full_recrawl)
+        after_cursor = crawl.start_cursor
+        completed = False
 
         while True:
-            variables = {
-                "after": after_cursor,
-                "const": movie_id,
-                "first": first,
-                "locale": "en-US",
-                "sort": {"by": "HELPFULNESS_SCORE", "order": "DESC"},
-                "filter": {}
-            }
-
-            extensions = {
-                "persistedQuery": {
-                    "sha256Hash": "d389bc70c27f09c00b663705f0112254e8a7c75cde1cfd30e63a2d98c1080c87",
-                    "version": 1
-                }
-            }
-
-            payload = {
-                "operationName": "TitleReviewsRefine",
-                "variables": variables,
-                "extensions": extensions
-            }
+            payload = build_reviews_payload(movie_id, after_cursor, first)
 
+            status = "error"
             try:
-                r = requests.post(base_url, headers=headers, json=payload, timeout=30)
+                with metrics.timed("http_request_seconds", client="sync"):
+                    r = requests.post(base_url, headers=headers, json=payload, timeout=30)
+                status = r.status_code
                 r.raise_for_status()
                 data = r.json()
             except Exception as e:
                 print(f"Failed to fetch data for {movie_name}: {e}")
                 break
+            finally:
+                metrics.inc("http_requests_total", client="sync", status=status)
 
             # Access reviews
-            reviews_section = data.get("data", {}).get("title", {}).get("reviews", {})
-            edges = reviews_section.get("edges", [])
-            page_info = reviews_section.get("pageInfo", {})
+            edges, page_info = parse_reviews_page(data)
 
             if not edges:
                 print(f"No more reviews found for {movie_name}")
+                completed = True
                 break
 
-            # Insert into Postgres
-            inserted_this_batch = 0
-            for e in edges:
-                node = e.get("node", {})
-                review_text = node.get("text", {}).get("originalText", {}).get("plaidHtml", "")
-                if review_text.strip():
-                    try:
-                        self.cur.execute(
-                            """
-                            INSERT INTO reviews (movie_id, movie_name, review_text)
-                            VALUES (%s, %s, %s)
-                            """,
-                            (movie_id, movie_name, review_text)
-                        )
-                        inserted_this_batch += 1
-                    except Exception as ex:
-                        print("Insert failed:", ex)
+            # Buffer for a bulk upsert into Postgres; the crawl decides whether to continue
+            if not crawl.handle_page(edges, page_info):
+                completed = True
+                break
+            after_cursor = page_info.get("endCursor")
+
+            time.sleep(1)  # polite delay
+
+        crawl.finish(completed)
+        return crawl.collected
+
+    def buffer_rows(self, rows):
+        """Queue `review_rows()` output for upsert, flushing every `batch_size` rows; returns the count queued."""
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+        return len(rows)
 
+    def flush(self):
+        """Upsert all buffered reviews and pending crawl state in one transaction; returns (inserted, updated).
+
+        If the transaction fails, the rows and checkpoints stay queued and the
+        next flush retries them. Concurrent crawls share the buffer, so
+        dropping it would let another movie's later checkpoint skip past
+        reviews that were never committed.
+        """
+        if not self._buffer and not self._pending_state:
+            return 0, 0
+        # One statement cannot upsert the same review twice; keep the last copy
+        rows = list({row[0] if row[0] is not None else ("no-id", i): row
+                     for i, row in enumerate(self._buffer)}.values())
+        try:
+            results = []
+            if rows:
+                results = execute_values(self.cur, UPSERT_REVIEWS_SQL, rows, page_size=self.batch_size, fetch=True)
+                metrics.inc("db_roundtrips_total", -(-len(rows) // self.batch_size), op="upsert")
+            if self._pending_state:
+                self.cur.executemany(UPSERT_STATE_SQL, list(self._pending_state.values()))
+                metrics.inc("db_roundtrips_total", len(self._pending_state), op="upsert_state")
             self.conn.commit()
-            total_inserted += inserted_this_batch
-            print(f"Inserted {inserted_this_batch} reviews for {movie_name} in this batch.")
+            metrics.inc("db_roundtrips_total", op="commit")
+        except Exception as ex:
+            self.conn.rollback()
+            print("Bulk upsert failed:", ex)
+            raise
+        self._buffer = []
+        self._pending_state = {}
+        if not rows:
+            return 0, 0
+        inserted = sum(1 for (was_inserted,) in results if was_inserted)
+        updated = len(results) - inserted
+        self.rows_upserted += len(rows)
+        print(f"Upserted {len(rows)} reviews: {inserted} new, {updated} updated.")
+        return inserted, updated
 
-            # Update cursor for next page
-            after_cursor = page_info.get("endCursor")
-            has_next = page_info.get("hasNextPage", False)
-            if not has_next:
-                break
+    def scrape_movies_async(self, movies, headers, first=25, config=None, full_recrawl=False):
+        """Scrape many movies concurrently (see `async_collection.AsyncReviewScraper`).
 
-            time.sleep(1)  # polite delay
+        Pages are fetched concurrently under a global rate limit; each page is
+        buffered (and bulk-upserted) from the event-loop thread, so the Postgres
+        cursor is never shared between threads.
+        """
+        from src.components.async_collection import AsyncCollectionConfig, AsyncReviewScraper
+
+        config = config or AsyncCollectionConfig(page_size=first)
+        crawls = []
+        for movie in movies:
+            movie_id, movie_name = movie.get("id"), movie.get("name")
+            if movie_id and movie_name:
+                crawls.append(self.start_crawl(movie_id, movie_name, full_recrawl=full_recrawl))
+            else:
+                print("Invalid movie entry in url.json:", movie)
 
-        print(f"Total reviews inserted for {movie_name}: {total_inserted}")
+        scraper = AsyncReviewScraper(config, headers)
+        scraper.run(crawls)
+        self.flush()
+        print("Async scrape stats:", scraper.stats)
+        return {crawl.movie_name: crawl.collected for crawl in crawls}
 
     def close(self):
+        self.flush()
         self.cur.close()
         self.conn.close()
-        print("Postgres connection closed.")
+        print("Postgres connection returned to the pool.")
 
 
 # ---------------- Main Script ----------------
 
-db_config = {
-    "host": os.getenv("POSTGRES_HOST", "localhost"),
-    "database": os.getenv("POSTGRES_DB", "Review_Data"),
-    "user": os.getenv("POSTGRES_USER", "postgres"),
-    "password": os.getenv("POSTGRES_PASSWORD", ""),
-}
-
 headers = {
     "User-Agent": "Mozilla/5.0",
     "accept": "application/json",
     "content-type": "application/json"
 }
 
-# Load movies from url.json
-with open("urls.json", "r") as f:
-    config = json.load(f)
 
-movies = config.get("movies", [])
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape IMDB reviews into Postgres.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="Fetch many movies concurrently with a global rate limit.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Movies scraped at once (async mode).")
+    parser.add_argument("--rate", type=float, default=2.0, help="Requests per second across all movies (async mode).")
+    parser.add_argument("--base-url", default=IMDB_GRAPHQL_URL, help="GraphQL endpoint (async mode), e.g. a local mock.")
+    parser.add_argument("--batch-size", type=int, default=500, help="Reviews per bulk upsert.")
+    parser.add_argument("--full-recrawl", action="store_true",
+                        help="Ignore saved crawl state and page through every review again.")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args(argv)
+    metrics.configure_from_args(args)
+
+    # Load movies from url.json
+    with open(URLS_PATH, "r") as f:
+        config = json.load(f)
+
+    movies = config.get("movies", [])
+
+    if not movies:
+        print("No movies found in url.json")
+        return
 
-if not movies:
-    print("No movies found in url.json")
-else:
-    collector = DataCollector(db_config)
+    with metrics.profiled("collect", args.profile), metrics.track_stage("collect") as stage:
+        collector = DataCollector(batch_size=args.batch_size)
+        try:
+            stage.rows_in = _collect(collector, movies, args)
+        finally:
+            collector.close()
+            stage.rows_out = collector.rows_upserted
+
+
+def _collect(collector, movies, args):
+    """Scrape every movie; returns the number of reviews collected."""
+    if args.use_async:
+        from src.components.async_collection import AsyncCollectionConfig
+
+        async_config = AsyncCollectionConfig(
+            base_url=args.base_url,
+            max_concurrent_movies=args.concurrency,
+            requests_per_second=args.rate,
+        )
+        collected = collector.scrape_movies_async(movies, headers, config=async_config,
+                                                  full_recrawl=args.full_recrawl)
+        return sum(collected.values())
+    total = 0
     for movie in movies:
         movie_id = movie.get("id")
         movie_name = movie.get("name")
         if movie_id and movie_name:
-            collector.scrape_and_store(movie_id, movie_name, headers, first=25)
+            total += collector.scrape_and_store(movie_id, movie_name, headers, first=25,
+                                                full_recrawl=args.full_recrawl)
         else:
             print("Invalid movie entry in url.json:", movie)
-    collector.close()
+    return total
+
+
+if __name__ == "__main__":
+    main()
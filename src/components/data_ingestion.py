@@ -1,79 +1,234 @@
 from src.exception import CustomException
 from src.logger import logging
+from src import metrics
+from src.utils import ARTIFACTS_DIR, hash_split_mask, load_json, save_json
+from src.components.artifact_store import get_artifact_store, rollback, snapshot
 import sys
 import os
-import pandas as pd
-from sklearn.model_selection import train_test_split
+import uuid
 from dataclasses import dataclass
-import psycopg2
+from sqlalchemy import inspect, text
+from src.components import db
+
+REVIEWS_QUERY = "SELECT id, movie_id, movie_name, review_text FROM reviews"
+
+
+def _has_column(conn, table_name: str, column_name: str) -> bool:
+    return any(column["name"] == column_name for column in inspect(conn).get_columns(table_name))
+
 
 @dataclass
 class DataIngestionConfig:
-    raw_data_path: str = os.path.join('artifacts', 'raw_data.csv')
-    train_data_path: str = os.path.join('artifacts', 'train_data.csv')
-    test_data_path: str = os.path.join('artifacts', 'test_data.csv')
+    raw_data_path: str = os.path.join(ARTIFACTS_DIR, 'raw_data.csv')
+    train_data_path: str = os.path.join(ARTIFACTS_DIR, 'train_data.csv')
+    test_data_path: str = os.path.join(ARTIFACTS_DIR, 'test_data.csv')
+    test_size: float = 0.2
+    # Stream rows through a server-side cursor and write the CSVs chunk by chunk,
+    # so memory stays flat regardless of table size. The split is then hash-based.
+    streaming: bool = True
+    chunk_size: int = 10000
+    # High-water marks (max reviews.id and max updated_at) of the last export;
+    # with incremental=True only rows above the id are fetched and appended to
+    # the existing CSVs. If a row below it was edited since, the export is full.
+    state_path: str = os.path.join(ARTIFACTS_DIR, 'ingestion_state.json')
+    incremental: bool = False
 
 class DataIngestion:
     def __init__(self):
         self.ingestion_config = DataIngestionConfig()
+        # Paths above name CSVs; the store writes them in the format set in config/config.yaml
+        self.store = get_artifact_store()
 
-    def initiate_data_ingestion(self):
+    def initiate_data_ingestion(self, incremental: bool = None):
         logging.info("Starting data ingestion...")
+        incremental = self.ingestion_config.incremental if incremental is None else incremental
+        with metrics.track_stage("ingest", incremental=incremental) as stage:
+            return self._ingest(incremental, stage)
 
+    def _ingest(self, incremental: bool, stage: metrics.StageMetrics):
+        # Connections come from the shared pool (src/components/db.py) and are
+        # returned to it by the helpers, on the error path too
         try:
-            # -------------------------------
-            # 1. CONNECT TO POSTGRES
-            # -------------------------------
-            conn = psycopg2.connect(
-                host=os.getenv("POSTGRES_HOST", "localhost"),
-                database=os.getenv("POSTGRES_DB", "Review_Data"),
-                user=os.getenv("POSTGRES_USER", "postgres"),
-                password=os.getenv("POSTGRES_PASSWORD", ""),
-            )
-            cursor = conn.cursor()
+            if self.ingestion_config.streaming or incremental:
+                return self._ingest_streaming(incremental, stage)
 
             # -------------------------------
-            # 2. READ ALL REVIEWS FROM TABLE
+            # 1. READ ALL REVIEWS FROM TABLE
             # -------------------------------
-            query = "SELECT id, movie_id, movie_name, review_text FROM reviews;"
-            cursor.execute(query)
-            rows = cursor.fetchall()
+            updated_at = self._updated_at_watermark()
+            df = db.read_frame(REVIEWS_QUERY)
 
-            if len(rows) == 0:
+            if len(df) == 0:
                 logging.warning("⚠ No data found in Postgres reviews table")
                 return
 
-            # -------------------------------
-            # 3. CONVERT TO DATAFRAME
-            # -------------------------------
-            df = pd.DataFrame(rows, columns=["id","movie_id", "movie_name", "review_text"])
+            stage.rows_in = stage.rows_out = len(df)
             logging.info(f"Fetched {len(df)} rows from Postgres")
 
             # -------------------------------
-            # 4. SAVE RAW CSV
+            # 2. SAVE RAW DATA
             # -------------------------------
-            os.makedirs(os.path.dirname(self.ingestion_config.raw_data_path), exist_ok=True)
-            df.to_csv(self.ingestion_config.raw_data_path, index=False)
-            logging.info("Saved raw data to CSV")
+            if os.path.exists(self.ingestion_config.state_path):
+                os.remove(self.ingestion_config.state_path)
+            self.store.write(df, self.ingestion_config.raw_data_path)
+            logging.info(f"Saved raw data as {self.store.format}")
 
             # -------------------------------
-            # 5. TRAIN-TEST SPLIT
+            # 3. TRAIN-TEST SPLIT
             # -------------------------------
-            train_set, test_set = train_test_split(df, test_size=0.2, random_state=42)
-
-            train_set.to_csv(self.ingestion_config.train_data_path, index=False)
-            test_set.to_csv(self.ingestion_config.test_data_path, index=False)
+            from sklearn.model_selection import train_test_split
+            train_set, test_set = train_test_split(df, test_size=self.ingestion_config.test_size, random_state=42)
 
-            logging.info("Saved train.csv and test.csv successfully")
+            self.store.write(train_set, self.ingestion_config.train_data_path)
+            self.store.write(test_set, self.ingestion_config.test_data_path)
 
-            cursor.close()
-            conn.close()
+            logging.info("Saved train and test data successfully")
+            self._save_state(int(df["id"].max()), len(df), uuid.uuid4().hex, updated_at)
 
             return self.ingestion_config.train_data_path, self.ingestion_config.test_data_path
 
         except Exception as e:
-         print("Error:", e)
+            logging.error("Error during data ingestion")
+            raise CustomException(e, sys)
+
+    def source_fingerprint(self) -> str:
+        """Cheap summary of the reviews table used to skip unchanged exports.
+
+        Row count and max id change when reviews are added; max(updated_at)
+        changes when the scraper rewrites a review in place. Tables created
+        before the scraper added `updated_at` fall back to count and max id.
+        """
+        with db.transaction() as conn:
+            if _has_column(conn, "reviews", "updated_at"):
+                count, max_id, updated_at = conn.exec_driver_sql(
+                    "SELECT count(*), max(id), max(updated_at) FROM reviews"
+                ).one()
+                return f"{count}:{max_id}:{updated_at}"
+            count, max_id = conn.exec_driver_sql("SELECT count(*), max(id) FROM reviews").one()
+        return f"{count}:{max_id}"
+
+    def _ingest_streaming(self, incremental: bool = False, stage: metrics.StageMetrics = None):
+        """Write raw/train/test artifacts chunk by chunk from a server-side cursor.
+
+        In incremental mode only rows above the saved high-water mark are read,
+        and they are appended to the artifacts written by earlier runs.
+        """
+        config = self.ingestion_config
+        paths = (config.raw_data_path, config.train_data_path, config.test_data_path)
+
+        state = self._load_state() if incremental else None
+        # Read before exporting: a review edited during the export shows up as changed next time
+        updated_at = self._updated_at_watermark()
+        if state is not None and self._rows_edited_since(state, updated_at):
+            state = None
+        if state is not None:
+            rollback(state["sizes"])
+            after_id, rows_before, generation = state["max_id"], state["rows"], state["generation"]
+            logging.info(f"Incremental ingestion: fetching reviews with id > {after_id}")
+        else:
+            after_id, rows_before, generation = None, 0, uuid.uuid4().hex
+
+        total = 0
+        max_id = after_id
+        writers = []
+        try:
+            if after_id is None:
+                chunks = db.read_frames(f"{REVIEWS_QUERY} ORDER BY id", chunk_rows=config.chunk_size)
+            else:
+                chunks = db.read_frames(f"{REVIEWS_QUERY} WHERE id > :after_id ORDER BY id",
+                                        {"after_id": after_id}, chunk_rows=config.chunk_size)
+            for chunk in chunks:
+                if not writers:
+                    if state is None and os.path.exists(config.state_path):
+                        # The old watermark no longer describes what is on disk
+                        os.remove(config.state_path)
+                    writers = [self.store.writer(path, append=state is not None) for path in paths]
+                is_test = hash_split_mask(chunk["id"], config.test_size)
+                for writer, part in zip(writers, (chunk, chunk[~is_test], chunk[is_test])):
+                    writer.write(part)
+                total += len(chunk)
+                max_id = int(chunk["id"].iloc[-1])
+                logging.info(f"Streamed {total} rows from Postgres")
+        finally:
+            for writer in writers:
+                writer.close()
+            if stage is not None:
+                stage.rows_in = stage.rows_out = total
+
+        if total == 0:
+            if state is not None:
+                logging.info(f"No new reviews since id {after_id}")
+                return config.train_data_path, config.test_data_path
+            logging.warning("⚠ No data found in Postgres reviews table")
+            return
+
+        self._save_state(max_id, rows_before + total, generation, updated_at)
+        logging.info(f"Saved raw, train and test data ({total} new rows, {rows_before + total} total)")
+        return config.train_data_path, config.test_data_path
+
+    def _load_state(self):
+        """Return the saved watermark, or None if a full export is needed."""
+        config = self.ingestion_config
+        state = load_json(config.state_path)
+        paths = (config.raw_data_path, config.train_data_path, config.test_data_path)
+        if state is None or state.get("format") != self.store.format or not all(self.store.exists(path) for path in paths):
+            logging.info("No previous ingestion state, running a full export")
+            return None
+        return state
+
+    def _updated_at_watermark(self):
+        """Latest `reviews.updated_at` as a string, or None if the table has no such column."""
+        with db.transaction() as conn:
+            if not _has_column(conn, "reviews", "updated_at"):
+                return None
+            value = conn.exec_driver_sql("SELECT max(updated_at) FROM reviews").scalar()
+        return None if value is None else str(value)
+
+    def _rows_edited_since(self, state: dict, updated_at) -> bool:
+        """True if reviews already exported were rewritten in place since `state` was saved.
+
+        The id watermark only finds new rows, so an edited review would keep
+        its old text in the artifacts; a full export picks the edit up.
+        """
+        if updated_at is None:
+            return False
+        since = state.get("updated_at")
+        if since is None:
+            logging.info("Ingestion state has no updated_at watermark, running a full export")
+            return True
+        with db.transaction() as conn:
+            edited = conn.execute(
+                text("SELECT count(*) FROM reviews WHERE id <= :after_id AND updated_at > :since"),
+                {"after_id": state["max_id"], "since": since},
+            ).scalar()
+        if edited:
+            logging.info(f"{edited} exported reviews were edited since the last run, running a full export")
+        return bool(edited)
+
+    def _save_state(self, max_id: int, rows: int, generation: str, updated_at=None):
+        # `generation` changes on every full export, so downstream stages can tell
+        # an appended raw_data.csv apart from a rewritten one.
+        config = self.ingestion_config
+        paths = (config.raw_data_path, config.train_data_path, config.test_data_path)
+        save_json(config.state_path, {
+            "max_id": max_id,
+            "rows": rows,
+            "generation": generation,
+            "updated_at": updated_at,
+            "format": self.store.format,
+            "sizes": snapshot([self.store.resolve(path) for path in paths]),
+        })
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export reviews from Postgres to raw/train/test CSVs")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch reviews added since the last run and append them")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+
     obj = DataIngestion()
-    obj.initiate_data_ingestion()
+    with metrics.profiled("ingest", args.profile):
+        obj.initiate_data_ingestion(incremental=args.incremental)
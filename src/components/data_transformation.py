@@ -1,32 +1,55 @@
-import src.logger
 from src.logger import logging
-logging.info("Logger test: data_transformation.py script started")
+from src import metrics
 import sys
 import os
 import re
+import hashlib
 import unicodedata
-from bs4 import BeautifulSoup
+import numpy as np
 import pandas as pd
-from sklearn.model_selection import train_test_split
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from nltk.sentiment import SentimentIntensityAnalyzer
+from typing import Dict, List, Optional, Sequence, Tuple
 from src.exception import CustomException
+from src.components.result_cache import ResultCache
+from src.components.sentiment_scorer import get_scorer, warm_up_scorer
+from src.components.artifact_store import get_artifact_store, rollback, snapshot
+from src.utils import hash_split_mask, load_json, save_json
+
+# BeautifulSoup and scikit-learn are imported where they are used: most text
+# never reaches the full HTML parser, and the scoring path never splits data.
+# The VADER lexicon is resolved (never downloaded) by `sentiment_scorer`.
 
 # Base directory: repository root (two levels up from this file)
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-# Ensure VADER lexicon is available
-import nltk
-try:
-    nltk.data.find('sentiment/vader_lexicon')
-except LookupError:
-    nltk.download('vader_lexicon')
 @dataclass
 class DataTransformationConfig:
     transformed_train_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_train_data.csv')
     transformed_test_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv')
     transformed_data_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_data.csv')
+    raw_data_path: str = os.path.join(BASE_DIR, 'artifacts', 'raw_data.csv')
     test_size: float = 0.2
+    # Worker processes for cleaning + scoring (1 = serial, -1 = all cores)
+    n_jobs: int = 1
+    chunksize: int = 1000
+    # On-disk tier of the clean + score result cache (None keeps it in memory only)
+    result_cache_path: Optional[str] = os.path.join(BASE_DIR, 'artifacts', 'result_cache.sqlite')
+    # Watermark (max raw id transformed) and 64-bit hashes of every transformed review
+    # text; with incremental=True only new raw rows are cleaned, scored and appended.
+    state_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformation_state.json')
+    seen_hashes_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_hashes.bin')
+    incremental: bool = False
+
+
+# Bump whenever clean_text_pipeline output changes, to invalidate cached results
+CLEANER_VERSION = "1"
+
+
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x1F\x7F]+")
+_REPEATED_CHARS_RE = re.compile(r"(.)\1{2,}")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_WHITESPACE_RE = re.compile(r"\s+")
 
 
 def _normalize_unicode(text: str) -> str:
@@ -38,20 +61,57 @@ def _normalize_unicode(text: str) -> str:
 def _remove_control_chars(text: str) -> str:
     if not isinstance(text, str):
         return text
-    return re.sub(r"[\x00-\x1F\x7F]+", "", text)
+    return _CONTROL_CHARS_RE.sub("", text)
 
 
 def _reduce_repeated_chars(text: str) -> str:
     # Reduce very long repeated characters (loooool -> loool or lol depending on rule)
     if not isinstance(text, str):
         return text
-    return re.sub(r"(.)\1{2,}", r"\1\1", text)
+    return _REPEATED_CHARS_RE.sub(r"\1\1", text)
 
 
 def _remove_urls(text: str) -> str:
     if not isinstance(text, str):
         return text
-    return re.sub(r"https?://\S+|www\.\S+", "", text)
+    return _URL_RE.sub("", text)
+
+
+def _collapse_whitespace(text: str) -> str:
+    if not isinstance(text, str):
+        return text
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class TextNormalizer:
+    """Fused form of the normalization steps in `clean_text_pipeline`.
+
+    Gives the same result as `_normalize_unicode` -> `_remove_urls` ->
+    `_remove_control_chars` -> `_reduce_repeated_chars` -> `_collapse_whitespace`
+    in three passes instead of five:
+    - NFKC is skipped for ASCII text, where it is a no-op;
+    - URLs and control characters are removed by a single regex (URLs are
+      matched first at every position, so control characters inside a URL
+      still go with it);
+    - repeated non-space characters are reduced, and whitespace is collapsed
+      with `str.split`/`join` (repeated whitespace collapses to one space anyway).
+    """
+
+    # The lookahead only lets the regex engine skip positions that cannot start a match
+    _url_or_control_re = re.compile(r"(?=[hw\x00-\x1F\x7F])(?:https?://\S+|www\.\S+|[\x00-\x1F\x7F]+)")
+    _repeated_re = re.compile(r"(\S)\1\1+")
+
+    def __call__(self, text: str) -> str:
+        if not isinstance(text, str):
+            return text
+        if not text.isascii():
+            text = unicodedata.normalize("NFKC", text)
+        text = self._url_or_control_re.sub("", text)
+        text = self._repeated_re.sub(r"\1\1", text)
+        return " ".join(text.split())
+
+
+normalize_text = TextNormalizer()
 
 
 def sanitize_keep_tags(html: str, allowed_tags=None) -> str:
@@ -64,6 +124,7 @@ def sanitize_keep_tags(html: str, allowed_tags=None) -> str:
         return html
     if allowed_tags is None:
         allowed_tags = ["p", "br", "b", "i", "strong", "em", "ul", "ol", "li", "a"]
+    from bs4 import BeautifulSoup
     soup = BeautifulSoup(html, "html.parser")
     for tag in soup.find_all(True):
         if tag.name not in allowed_tags:
@@ -75,15 +136,107 @@ def sanitize_keep_tags(html: str, allowed_tags=None) -> str:
     return str(soup).strip()
 
 
+# --- Tiered HTML stripping -------------------------------------------------
+# Most IMDB `plaidHtml` bodies only contain `<br/>` tags and a few entities, and
+# CSV uploads are often plain text, so a full BeautifulSoup tree is rarely needed.
+# Tier 1 returns markup-free text as-is, tier 2 strips attribute-less tags and
+# common entities with a regex, and tier 3 (BeautifulSoup) handles everything
+# else. Tiers 1 and 2 reproduce `BeautifulSoup(html, "html.parser").get_text(" ")`
+# exactly; anything they are not sure about is sent to tier 3.
+
+# BeautifulSoup collapses text nodes made only of these characters to " " / "\n"
+_ASCII_SPACES = ' \t\n\r\x0c'
+_SIMPLE_TAG_RE = re.compile(r"<(/?)([A-Za-z][A-Za-z0-9]*)\s*/?>")
+_AMPERSAND_RE = re.compile(r"&(?:(#[0-9]+|#[xX][0-9a-fA-F]+|[A-Za-z][A-Za-z0-9]*)(;?))?")
+# Tags whose content html.parser/BeautifulSoup treat specially (raw text, whitespace kept)
+_SPECIAL_CONTENT_TAGS = frozenset({
+    'script', 'style', 'template', 'pre', 'textarea', 'title', 'xmp',
+    'plaintext', 'noscript', 'iframe', 'noembed', 'noframes',
+})
+# Void elements (BeautifulSoup's empty-element tags). A closing tag for one of
+# them (`</br>`) is merged with a preceding open tag by html.parser, which
+# changes the text-node boundaries; leave those inputs to BeautifulSoup.
+_VOID_TAGS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed', 'frame', 'hr', 'image', 'img',
+    'input', 'isindex', 'keygen', 'link', 'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer',
+    'track', 'wbr',
+})
+_SIMPLE_ENTITIES = {'amp': '&', 'lt': '<', 'gt': '>', 'quot': '"', 'apos': "'", 'nbsp': '\xa0'}
+
+
+class _NeedsFullParser(Exception):
+    """Raised by the fast tiers when the input needs BeautifulSoup."""
+
+
+def _decode_entity(match) -> str:
+    name, semicolon = match.group(1), match.group(2)
+    if name is None:
+        following = match.string[match.end():match.end() + 1]
+        if following == '#' or following.isalnum():
+            raise _NeedsFullParser
+        return '&'
+    if not semicolon:
+        raise _NeedsFullParser
+    if name[0] != '#':
+        if name not in _SIMPLE_ENTITIES:
+            raise _NeedsFullParser
+        return _SIMPLE_ENTITIES[name]
+    code = int(name[2:], 16) if name[1] in 'xX' else int(name[1:])
+    # Control, C1 (windows-1252 remapped), surrogate and out-of-range code points
+    # are handled differently by html.parser; leave them to BeautifulSoup.
+    if not (32 <= code < 127 or 160 <= code < 0xD800 or 0xE000 <= code < 0xFFFE or 0x10000 <= code <= 0x10FFFF):
+        raise _NeedsFullParser
+    return chr(code)
+
+
+def _simple_text_node(data: str) -> str:
+    if '<' in data:
+        raise _NeedsFullParser
+    if '&' in data:
+        data = _AMPERSAND_RE.sub(_decode_entity, data)
+    if data and not data.strip(_ASCII_SPACES):
+        return '\n' if '\n' in data else ' '
+    return data
+
+
+def _strip_simple_html(html: str) -> str:
+    """Tier 2: strip attribute-less tags and plain entities without building a tree."""
+    nodes = []
+    pos = 0
+    for match in _SIMPLE_TAG_RE.finditer(html):
+        name = match.group(2).lower()
+        if name in _SPECIAL_CONTENT_TAGS or (match.group(1) and name in _VOID_TAGS):
+            raise _NeedsFullParser
+        nodes.append(_simple_text_node(html[pos:match.start()]))
+        pos = match.end()
+    nodes.append(_simple_text_node(html[pos:]))
+    return ' '.join(node for node in nodes if node)
+
+
+def _html_to_text_full(html: str) -> str:
+    """Tier 3: full BeautifulSoup parse."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    return soup.get_text(separator=" ")
+
+
 def html_to_simple_text(html: str) -> str:
     """Convert HTML to plain/simple text while preserving basic whitespace and simple newlines.
     This is useful when you want plain text (no tags).
+
+    Plain text and simple markup skip BeautifulSoup (see the tiers above); the
+    result is the same as `BeautifulSoup(html, "html.parser").get_text(separator=" ")`.
     """
     if not isinstance(html, str):
         return html
-    soup = BeautifulSoup(html, "html.parser")
-    text = soup.get_text(separator=" ")
-    return text
+    if '<' not in html and '&' not in html:
+        if html and not html.strip(_ASCII_SPACES):
+            return '\n' if '\n' in html else ' '
+        return html
+    try:
+        return _strip_simple_html(html)
+    except _NeedsFullParser:
+        return _html_to_text_full(html)
 
 
 def clean_text_pipeline(text: str, keep_simple_html: bool = False, allowed_tags=None) -> str:
@@ -101,12 +254,7 @@ def clean_text_pipeline(text: str, keep_simple_html: bool = False, allowed_tags=
         text = sanitize_keep_tags(text, allowed_tags=allowed_tags)
     else:
         text = html_to_simple_text(text)
-    text = _normalize_unicode(text)
-    text = _remove_urls(text)
-    text = _remove_control_chars(text)
-    text = _reduce_repeated_chars(text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return normalize_text(text)
 
 
 def analyze_sentiment_vader(text: str) -> dict:
@@ -122,10 +270,8 @@ def analyze_sentiment_vader(text: str) -> dict:
     """
     if not isinstance(text, str) or not text.strip():
         return {'compound': 0.0, 'pos': 0.0, 'neu': 0.0, 'neg': 0.0}
-    
-    sia = SentimentIntensityAnalyzer()
-    scores = sia.polarity_scores(text)
-    return scores
+
+    return get_scorer().polarity_scores(text)
 
 
 def get_sentiment_label(compound_score: float) -> str:
@@ -143,64 +289,347 @@ def get_sentiment_label(compound_score: float) -> str:
         return 'neutral'
 
 
+def get_sentiment_labels(compound_scores) -> np.ndarray:
+    """Vectorized `get_sentiment_label` over an array of compound scores."""
+    compound = np.asarray(compound_scores, dtype=np.float32)
+    labels = np.full(compound.shape, 'neutral', dtype=object)
+    labels[compound >= np.float32(0.05)] = 'positive'
+    labels[compound <= np.float32(-0.05)] = 'negative'
+    return labels
+
+
+@dataclass
+class SentimentBatch:
+    """Columnar VADER output for a batch of texts: one float32 array per score plus labels."""
+    compound: np.ndarray
+    pos: np.ndarray
+    neu: np.ndarray
+    neg: np.ndarray
+    label: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.compound)
+
+    def as_columns(self) -> Dict[str, np.ndarray]:
+        """Return the arrays keyed by the `sentiment_*` column names used in the artifacts."""
+        return {
+            'sentiment_compound': self.compound,
+            'sentiment_pos': self.pos,
+            'sentiment_neu': self.neu,
+            'sentiment_neg': self.neg,
+            'sentiment_label': self.label,
+        }
+
+    def to_frame(self, index=None) -> pd.DataFrame:
+        return pd.DataFrame(self.as_columns(), index=index)
+
+    @classmethod
+    def concat(cls, batches: Sequence['SentimentBatch']) -> 'SentimentBatch':
+        return cls(
+            compound=np.concatenate([b.compound for b in batches]),
+            pos=np.concatenate([b.pos for b in batches]),
+            neu=np.concatenate([b.neu for b in batches]),
+            neg=np.concatenate([b.neg for b in batches]),
+            label=np.concatenate([b.label for b in batches]),
+        )
+
+
+def score_batch(texts: Sequence[str]) -> SentimentBatch:
+    """Score a batch of (already cleaned) texts with VADER.
+
+    Scores are written straight into preallocated float32 arrays instead of
+    building one dict per row; empty or non-string entries score 0.0 like
+    `analyze_sentiment_vader`. Labels are derived with a vectorized threshold.
+    """
+    n = len(texts)
+    compound = np.zeros(n, dtype=np.float32)
+    pos = np.zeros(n, dtype=np.float32)
+    neu = np.zeros(n, dtype=np.float32)
+    neg = np.zeros(n, dtype=np.float32)
+
+    polarity_scores = get_scorer().polarity_scores
+    for i, text in enumerate(texts):
+        if not isinstance(text, str) or not text.strip():
+            continue
+        scores = polarity_scores(text)
+        compound[i] = scores['compound']
+        pos[i] = scores['pos']
+        neu[i] = scores['neu']
+        neg[i] = scores['neg']
+
+    return SentimentBatch(compound, pos, neu, neg, get_sentiment_labels(compound))
+
+
+def _clean_and_score_chunk(texts: List[str]) -> Tuple[List[str], SentimentBatch]:
+    cleaned = [clean_text_pipeline(text, keep_simple_html=False) for text in texts]
+    return cleaned, score_batch(cleaned)
+
+
+def clean_and_score(
+    texts: Sequence[str],
+    n_jobs: int = 1,
+    chunksize: int = 1000,
+    cache: Optional[ResultCache] = None,
+) -> Tuple[List[str], SentimentBatch]:
+    """Run `clean_text_pipeline` + `score_batch` over a column of raw review texts.
+
+    With `n_jobs > 1` (or -1 for all cores) the texts are sharded into chunks of
+    `chunksize` and processed in a process pool. Each worker warms up its own
+    scorer once, and chunks are reassembled in input order, so the result is
+    identical to the serial path.
+
+    With a `cache`, texts seen before (in this dataset or an earlier run) are
+    served from it and only the unique misses are cleaned and scored.
+    """
+    if chunksize <= 0:
+        raise ValueError(f"chunksize must be a positive number of texts, got {chunksize}")
+    texts = list(texts)
+    if cache is not None:
+        return _clean_and_score_cached(texts, n_jobs, chunksize, cache)
+    if n_jobs is None or n_jobs == 0:
+        n_jobs = 1
+    elif n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs == 1 or len(texts) <= chunksize:
+        return _clean_and_score_chunk(texts)
+
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    with ProcessPoolExecutor(max_workers=min(n_jobs, len(chunks)), initializer=warm_up_scorer) as pool:
+        results = list(pool.map(_clean_and_score_chunk, chunks))
+
+    cleaned = [text for chunk_cleaned, _ in results for text in chunk_cleaned]
+    return cleaned, SentimentBatch.concat([batch for _, batch in results])
+
+
+def _clean_and_score_cached(
+    texts: List[str], n_jobs: int, chunksize: int, cache: ResultCache
+) -> Tuple[List[str], SentimentBatch]:
+    keys = [cache.key(text) if isinstance(text, str) else None for text in texts]
+    entries = cache.get_many(key for key in keys if key is not None)
+
+    # Unique texts that still need work; non-strings (e.g. NaN) are computed but never cached
+    slots = [key if key is not None else position for position, key in enumerate(keys)]
+    pending = {}
+    for slot, text in zip(slots, texts):
+        if slot not in entries and slot not in pending:
+            pending[slot] = text
+    if pending:
+        computed_text, computed = clean_and_score(list(pending.values()), n_jobs=n_jobs, chunksize=chunksize)
+        new_entries = {
+            slot: (computed_text[i], float(computed.compound[i]), float(computed.pos[i]),
+                   float(computed.neu[i]), float(computed.neg[i]))
+            for i, slot in enumerate(pending)
+        }
+        entries.update(new_entries)
+        cache.put_many({slot: entry for slot, entry in new_entries.items() if isinstance(slot, str)})
+
+    rows = [entries[slot] for slot in slots]
+    scores = np.array([row[1:] for row in rows], dtype=np.float32).reshape(len(rows), 4)
+    compound, pos, neu, neg = (np.ascontiguousarray(scores[:, i]) for i in range(4))
+    cleaned = [row[0] for row in rows]
+    return cleaned, SentimentBatch(compound, pos, neu, neg, get_sentiment_labels(compound))
+
+
+_result_caches: Dict[Optional[str], ResultCache] = {}
+
+
+def get_result_cache(db_path: Optional[str] = None) -> ResultCache:
+    """Return the process-wide result cache for `db_path` (None = in-memory only)."""
+    cache = _result_caches.get(db_path)
+    if cache is None:
+        scorer = get_scorer()
+        version = f"{CLEANER_VERSION}:{scorer.lexicon_version}:{scorer.analyzer_version}"
+        cache = _result_caches.setdefault(db_path, ResultCache(version, db_path=db_path))
+    return cache
+
+
+def _text_hashes(texts) -> np.ndarray:
+    """64-bit content hashes of raw review texts (used to dedupe across runs)."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "big")
+         for text in texts),
+        dtype=np.uint64,
+        count=len(texts),
+    )
+
+
 class DataTransformation:
     def __init__(self):
         self.transformation_config = DataTransformationConfig()
+        # Paths in the config name CSVs; the store reads/writes the format set in config/config.yaml
+        self.store = get_artifact_store()
 
-    def initiate_data_transformation(self):
+    def initiate_data_transformation(self, n_jobs: int = None, chunksize: int = None, incremental: bool = None):
         logging.info("Starting data transformation...")
-
+        config = self.transformation_config
+        n_jobs = config.n_jobs if n_jobs is None else n_jobs
+        chunksize = config.chunksize if chunksize is None else chunksize
+        incremental = config.incremental if incremental is None else incremental
+        with metrics.track_stage("transform", incremental=incremental, n_jobs=n_jobs) as stage:
+            return self._transform(n_jobs, chunksize, incremental, stage)
+
+    def _transform(self, n_jobs: int, chunksize: int, incremental: bool, stage: metrics.StageMetrics) -> str:
+        config = self.transformation_config
         try:
             # -------------------------------
             # 1. READ RAW DATA
             # -------------------------------
-            raw_data_path = os.path.join(BASE_DIR, 'src', 'components', 'artifacts', 'raw_data.csv')
-            df = pd.read_csv(raw_data_path)
-            logging.info(f"Read raw data from {raw_data_path} with shape {df.shape}")
+            state = self._load_state() if incremental else None
+            if state is None:
+                if os.path.exists(config.state_path):
+                    # Outputs are about to be rewritten, so the old watermark is void
+                    os.remove(config.state_path)
+                df = self.store.read(config.raw_data_path)
+                raw_offset = self._raw_size()
+                seen = None
+                logging.info(f"Read raw data from {self.store.resolve(config.raw_data_path)} with shape {df.shape}")
+            else:
+                rollback(state["sizes"])
+                df, raw_offset = self._read_new_raw_rows(state)
+                seen = np.fromfile(config.seen_hashes_path, dtype=np.uint64)
+                logging.info(f"Incremental transformation: {len(df)} raw rows with id > {state['max_id']}")
+            max_id = int(df["id"].max()) if "id" in df and len(df) else (state or {}).get("max_id")
+            stage.rows_in = len(df)
+
             # -------------------------------
             # 2. DATA CLEANING
             # Example cleaning: Drop duplicates and handle missing values
             df.drop_duplicates(subset=['review_text'], inplace=True)
             df.dropna(subset=['review_text'], inplace=True)
-
-            # Apply text cleaning pipeline - convert HTML to simple text and apply normalization
-            # If you want to preserve a small set of HTML tags, set keep_simple_html=True
-            df['review_text'] = df['review_text'].apply(lambda x: clean_text_pipeline(x, keep_simple_html=False))
-
+            hashes = _text_hashes(df['review_text'].tolist())
+            if seen is not None:
+                # Reviews whose text is already in the transformed dataset are duplicates too
+                is_new = ~np.isin(hashes, seen)
+                df, hashes = df[is_new], hashes[is_new]
+
+            # Apply text cleaning pipeline - convert HTML to simple text and apply normalization,
+            # then run VADER on each cleaned review (sharded over n_jobs processes if requested)
+            logging.info(f"Cleaning text and performing VADER sentiment analysis on {len(df)} rows (n_jobs={n_jobs})...")
+            cache = get_result_cache(config.result_cache_path)
+            cleaned, sentiment = clean_and_score(
+                df['review_text'].tolist(), n_jobs=n_jobs, chunksize=chunksize, cache=cache
+            )
+            logging.info(f"Result cache: {cache.stats.as_dict}")
+            df = df.copy()
+            df['review_text'] = cleaned
+            for column, values in sentiment.as_columns().items():
+                df[column] = values
+            stage.rows_out = len(df)
             logging.info(f"Data after cleaning has shape {df.shape}")
-            # -------------------------------
-            # 2.5 SENTIMENT ANALYSIS WITH VADER
-            # Analyze sentiment for each cleaned review
-            logging.info("Performing VADER sentiment analysis...")
-            sentiment_scores = df['review_text'].apply(analyze_sentiment_vader)
-            df['sentiment_compound'] = sentiment_scores.apply(lambda x: x['compound'])
-            df['sentiment_pos'] = sentiment_scores.apply(lambda x: x['pos'])
-            df['sentiment_neu'] = sentiment_scores.apply(lambda x: x['neu'])
-            df['sentiment_neg'] = sentiment_scores.apply(lambda x: x['neg'])
-            df['sentiment_label'] = df['sentiment_compound'].apply(get_sentiment_label)
             logging.info(f"Sentiment analysis complete. Added columns: sentiment_compound, sentiment_pos, sentiment_neu, sentiment_neg, sentiment_label")
+
             # -------------------------------
-            # 3. SAVE TRANSFORMED DATA
-            os.makedirs(os.path.dirname(self.transformation_config.transformed_data_path), exist_ok=True)
-            df.to_csv(self.transformation_config.transformed_data_path, index=False)
-            logging.info(f"Saved transformed data to {self.transformation_config.transformed_data_path}")
+            # 3. SAVE TRANSFORMED DATA (appended to the previous output in incremental mode)
+            append = state is not None
+            self._write(df, config.transformed_data_path, append)
+            logging.info(f"Saved transformed data to {self.store.resolve(config.transformed_data_path)}")
 
             # -------------------------------
 
             # 4. SPLIT INTO TRAIN AND TEST SETS
-            train_df, test_df = train_test_split(
-                df, test_size=self.transformation_config.test_size, random_state=42
-            )
-            train_df.to_csv(self.transformation_config.transformed_train_path, index=False)
-            test_df.to_csv(self.transformation_config.transformed_test_path, index=False)
-            logging.info(f"Saved training data to {self.transformation_config.transformed_train_path} with shape {train_df.shape}")
-            logging.info(f"Saved testing data to {self.transformation_config.transformed_test_path} with shape {test_df.shape}")
+            # Membership is a hash of the review id, so a row keeps its side of the
+            # split when later rows are appended (and ingestion uses the same split).
+            if "id" in df:
+                is_test = hash_split_mask(df["id"], config.test_size)
+                train_df, test_df = df[~is_test], df[is_test]
+            else:
+                from sklearn.model_selection import train_test_split
+                train_df, test_df = train_test_split(df, test_size=config.test_size, random_state=42)
+            self._write(train_df, config.transformed_train_path, append)
+            self._write(test_df, config.transformed_test_path, append)
+            logging.info(f"Saved training data to {self.store.resolve(config.transformed_train_path)} with shape {train_df.shape}")
+            logging.info(f"Saved testing data to {self.store.resolve(config.transformed_test_path)} with shape {test_df.shape}")
+
+            with open(config.seen_hashes_path, "ab" if append else "wb") as f:
+                hashes.tofile(f)
+            if max_id is not None:
+                self._save_state(max_id, raw_offset)
         except Exception as e:
             logging.error("Error during data transformation")
             raise CustomException(e, sys)
-        return self.transformation_config.transformed_data_path
+        return config.transformed_data_path
+
+    def _write(self, df: pd.DataFrame, path: str, append: bool) -> None:
+        if append and df.empty:
+            return
+        self.store.write(df, path, append=append)
+
+    def _output_paths(self) -> List[str]:
+        config = self.transformation_config
+        return [config.transformed_data_path, config.transformed_train_path, config.transformed_test_path]
+
+    def _load_state(self) -> Optional[dict]:
+        """Return the saved watermark, or None if a full rebuild is needed."""
+        state = load_json(self.transformation_config.state_path)
+        if (
+            state is None
+            or state.get("format") != self.store.format
+            or not all(self.store.exists(path) for path in self._output_paths())
+            or not os.path.exists(self.transformation_config.seen_hashes_path)
+        ):
+            logging.info("No previous transformation state, transforming all raw data")
+            return None
+        generation = self._raw_generation()
+        if generation is not None and state.get("raw_generation") not in (None, generation):
+            # A full export may have rewritten rows below the id watermark (edited reviews)
+            logging.info("Raw data was re-exported since the last run, transforming all raw data")
+            return None
+        return state
+
+    def _save_state(self, max_id: int, raw_offset: Optional[int]) -> None:
+        paths = [self.store.resolve(path) for path in self._output_paths()]
+        save_json(self.transformation_config.state_path, {
+            "max_id": max_id,
+            "format": self.store.format,
+            "raw_generation": self._raw_generation(),
+            "raw_offset": raw_offset,
+            "sizes": snapshot(paths + [self.transformation_config.seen_hashes_path]),
+        })
+
+    def _raw_size(self) -> Optional[int]:
+        # Byte offsets only make sense for an append-only CSV
+        if self.store.format != "csv":
+            return None
+        return os.path.getsize(self.store.resolve(self.transformation_config.raw_data_path))
+
+    def _raw_generation(self) -> Optional[str]:
+        state_path = os.path.join(os.path.dirname(self.transformation_config.raw_data_path), 'ingestion_state.json')
+        return (load_json(state_path) or {}).get("generation")
+
+    def _read_new_raw_rows(self, state: dict) -> Tuple[pd.DataFrame, Optional[int]]:
+        """Read the raw rows above the watermark.
+
+        Parquet pushes the `id` filter down to row-group statistics. For CSV,
+        if ingestion only appended to raw_data.csv since the last run, reading
+        starts at the byte offset where the previous run stopped; otherwise the
+        whole file is scanned and filtered on id.
+        """
+        if self.store.format != "csv":
+            return self.store.read(self.transformation_config.raw_data_path, filters=[("id", ">", state["max_id"])]), None
+
+        raw_path = self.store.resolve(self.transformation_config.raw_data_path)
+        size = os.path.getsize(raw_path)
+        offset = state.get("raw_offset")
+        generation = self._raw_generation()
+        if generation is not None and generation == state.get("raw_generation") and offset is not None and offset <= size:
+            columns = pd.read_csv(raw_path, nrows=0).columns
+            with open(raw_path, "rb") as f:
+                f.seek(offset)
+                df = pd.read_csv(f, header=None, names=columns) if offset < size else pd.DataFrame(columns=columns)
+        else:
+            df = pd.read_csv(raw_path)
+        return df[df["id"] > state["max_id"]], size
+
 
 if __name__ == '__main__':
-    DataTransformation().initiate_data_transformation()
+    import argparse
 
+    parser = argparse.ArgumentParser(description="Clean and score raw reviews")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only transform raw rows added since the last run and append them")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
 
+    with metrics.profiled("transform", args.profile):
+        DataTransformation().initiate_data_transformation(incremental=args.incremental)
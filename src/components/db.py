@@ -1,18 +1,245 @@
-import psycopg2
+"""
+Shared database access for the collection, ingestion and aggregation stages.
 
-# Connect to your Postgres database
-conn = psycopg2.connect(
-    host="localhost",       # usually localhost if running locally
-    database="Review_Data", # your database name
-    user="postgres",        # your Postgres username
-    password="Hideonbush12!" # your password
-)
+One SQLAlchemy engine per database is created on first use and kept for the
+life of the process. Its connection pool is shared by every stage and
+thread, so a job borrows an open connection instead of reconnecting.
 
-cur = conn.cursor()  # create a cursor to execute SQL commands
+Settings come from the `database:` section of `config/config.yaml`, and
+environment variables override them: `DATABASE_URL`, or `POSTGRES_HOST`,
+`POSTGRES_PORT`, `POSTGRES_DB`, `POSTGRES_USER` and `POSTGRES_PASSWORD`.
+Keep the password in the environment, not in the config file.
+`DATABASE_URL=sqlite:///path/to/file.sqlite` points the shared helpers at
+SQLite, e.g. for tests. The scraper's own upsert SQL still needs Postgres.
 
-# Test the connection
-cur.execute("SELECT version();")
-print(cur.fetchone())  # prints PostgreSQL version
+- `transaction()` gives a connection inside BEGIN ... COMMIT. The
+  transaction is rolled back if the block raises.
+- `get_engine().raw_connection()` lends a pooled driver connection for
+  driver-specific bulk paths such as psycopg2's `execute_values`.
+  Closing it returns it to the pool.
+- `read_frames()` streams a query as DataFrames through a server-side
+  cursor. `read_frame()` reads a whole query.
+- `upsert_rows()` does a batched multi-row `INSERT ... ON CONFLICT`.
 
-cur.close()
-conn.close()
+Statements and commits are counted in `db_roundtrips_total` (see `src.metrics`).
+
+    python -m src.components.db     # check the connection
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional, Sequence
+
+import pandas as pd
+from sqlalchemy import column, create_engine, event, table, text
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+
+from src import metrics
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import load_config
+
+URL_ENV = "DATABASE_URL"
+# config field -> environment variable that overrides it
+ENV_OVERRIDES = {
+    "host": "POSTGRES_HOST",
+    "port": "POSTGRES_PORT",
+    "database": "POSTGRES_DB",
+    "user": "POSTGRES_USER",
+    "password": "POSTGRES_PASSWORD",
+}
+
+
+@dataclass
+class DatabaseConfig:
+    # A full SQLAlchemy URL (e.g. sqlite:///reviews.sqlite) replaces the fields below
+    url: Optional[str] = None
+    host: str = "localhost"
+    port: Optional[int] = None
+    database: str = "Review_Data"
+    user: str = "postgres"
+    password: str = ""
+    # Connections kept open, and extra ones opened under load and closed when returned
+    pool_size: int = 5
+    max_overflow: int = 10
+    # Test a connection before handing it out, and replace connections older than this
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800
+    connect_timeout: int = 10
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "DatabaseConfig":
+        """Build from the `database:` section of `config/config.yaml`, then apply env overrides."""
+        section = (load_config() if config is None else config).get("database") or {}
+        values = {key: value for key, value in section.items() if key in cls.__dataclass_fields__}
+        for field_name, env in ENV_OVERRIDES.items():
+            if os.getenv(env):
+                values[field_name] = os.getenv(env)
+        if os.getenv(URL_ENV):
+            values["url"] = os.getenv(URL_ENV)
+        if values.get("port") is not None:
+            values["port"] = int(values["port"])
+        return cls(**values)
+
+    def sqlalchemy_url(self) -> URL:
+        if self.url:
+            return make_url(self.url)
+        return URL.create(
+            "postgresql+psycopg2",
+            username=self.user,
+            password=self.password or None,
+            # A directory (e.g. /var/run/postgresql) connects over a Unix socket
+            host=self.host,
+            port=self.port,
+            database=self.database,
+        )
+
+
+_engines: Dict[str, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(config: Optional[DatabaseConfig] = None) -> Engine:
+    """The process-wide engine (and connection pool) for `config` (default: `DatabaseConfig.from_config()`)."""
+    config = config or DatabaseConfig.from_config()
+    url = config.sqlalchemy_url()
+    key = url.render_as_string(hide_password=False)
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = _engines[key] = _create_engine(url, config)
+            logging.info(f"Created database engine for {url.render_as_string(hide_password=True)}")
+    return engine
+
+
+def _create_engine(url: URL, config: DatabaseConfig) -> Engine:
+    if url.get_backend_name() == "sqlite":
+        # SQLite picks its own pool; connections are cheap and file-local
+        engine = create_engine(url)
+    else:
+        engine = create_engine(
+            url,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_pre_ping=config.pool_pre_ping,
+            pool_recycle=config.pool_recycle,
+            connect_args={"connect_timeout": config.connect_timeout},
+        )
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_statement(conn, cursor, statement, parameters, context, executemany):
+        metrics.inc("db_roundtrips_total", op="execute")
+
+    @event.listens_for(engine, "commit")
+    def _count_commit(conn):
+        metrics.inc("db_roundtrips_total", op="commit")
+
+    return engine
+
+
+def dispose_engines() -> None:
+    """Close every pooled connection (e.g. before the database restarts)."""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _after_fork() -> None:
+    # A forked worker must not reuse the parent's sockets; it opens its own connections
+    for engine in _engines.values():
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+@contextmanager
+def transaction(engine: Optional[Engine] = None) -> Iterator[Connection]:
+    """A pooled connection inside a transaction: committed on success, rolled back on error."""
+    with (engine or get_engine()).begin() as conn:
+        yield conn
+
+
+def read_frames(sql: str, params: Optional[dict] = None, chunk_rows: int = 10000,
+                engine: Optional[Engine] = None) -> Iterator[pd.DataFrame]:
+    """Yield the result of `sql` (`:name` parameters) in DataFrames of up to `chunk_rows` rows.
+
+    On Postgres the rows come from a server-side cursor, so memory is
+    bounded by one chunk whatever the size of the result.
+    """
+    with (engine or get_engine()).connect() as conn:
+        result = conn.execution_options(yield_per=chunk_rows).execute(text(sql), params or {})
+        columns = list(result.keys())
+        for rows in result.partitions(chunk_rows):
+            metrics.inc("db_roundtrips_total", op="fetch")
+            yield pd.DataFrame(rows, columns=columns)
+
+
+def read_frame(sql: str, params: Optional[dict] = None, engine: Optional[Engine] = None) -> pd.DataFrame:
+    """The whole result of `sql` as one DataFrame."""
+    with (engine or get_engine()).connect() as conn:
+        result = conn.execute(text(sql), params or {})
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+
+def upsert_rows(
+    table_name: str,
+    rows: Sequence[dict],
+    key: Sequence[str],
+    update: Optional[Sequence[str]] = None,
+    conn: Optional[Connection] = None,
+) -> int:
+    """Insert `rows` (dicts with the same keys), updating `update` columns on a `key` conflict.
+
+    `update` defaults to every non-key column; an empty list skips conflicting
+    rows instead. SQLAlchemy sends the rows as multi-row INSERTs in batches
+    (1000 rows each on psycopg2). Runs in `conn`'s transaction, or in a new one.
+    Returns the number of rows sent.
+    """
+    if not rows:
+        return 0
+    if conn is None:
+        with transaction() as conn:
+            return upsert_rows(table_name, rows, key, update, conn)
+
+    columns = list(rows[0])
+    target = table(table_name, *(column(name) for name in columns))
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"upsert_rows supports postgresql and sqlite, not {dialect}")
+
+    statement = insert(target)
+    update = [name for name in columns if name not in key] if update is None else list(update)
+    if update:
+        statement = statement.on_conflict_do_update(
+            index_elements=list(key), set_={name: statement.excluded[name] for name in update}
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=list(key))
+    conn.execute(statement, list(rows))
+    return len(rows)
+
+
+if __name__ == "__main__":
+    config = DatabaseConfig.from_config()
+    try:
+        with transaction() as conn:
+            if conn.dialect.name == "sqlite":
+                version = "SQLite " + conn.exec_driver_sql("SELECT sqlite_version()").scalar()
+            else:
+                version = conn.exec_driver_sql("SELECT version()").scalar()
+    except Exception as e:
+        raise CustomException(e, sys)
+    print(f"Connected to {config.sqlalchemy_url().render_as_string(hide_password=True)}")
+    print(version)
@@ -1,55 +1,434 @@
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
-from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
+"""
+Train and compare sentiment classifiers on the transformed reviews.
+
+The TF-IDF matrices are cached under `artifacts/feature_cache/`, keyed by a
+hash of the train/test data and the vectorizer parameters, so re-running with
+other candidates skips vectorization. Candidates are fitted concurrently with
+joblib (large arrays are memory-mapped into the workers, not copied). Each
+one's accuracy, fit time, predict latency and memory are written to
+`artifacts/models/training_results.json`. The most accurate model is saved
+with its vectorizer (see `sentiment_model.py`).
+
+`--out-of-core` instead streams the data in chunks through a stateless
+`HashingVectorizer` into a `partial_fit` learner, so memory does not grow with
+the corpus; `--update` continues training the saved out-of-core model on only
+the reviews added since it was trained.
+
+    python -m src.components.model_trainer --models logreg sgd linear_svc --n-jobs 4
+    python -m src.components.model_trainer --out-of-core [--update]
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import List, Optional
+
+import joblib
 import numpy as np
+import sklearn
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.naive_bayes import ComplementNB, MultinomialNB
+from sklearn.svm import SVC, LinearSVC
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix, f1_score
+
+from src.exception import CustomException
+from src.logger import logging
+from src import metrics
+from src.components.artifact_store import get_artifact_store
+from src.components.data_transformation import CLEANER_VERSION
+from src.components.sentiment_model import MODEL_DIR, SentimentModel
+from src.utils import save_json
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# name -> (display name, factory). The linear/SGD/NB models are linear in the
+# number of reviews; the RBF SVC is quadratic and is skipped on large data.
+CANDIDATES = {
+    'logreg': ('Logistic Regression', lambda: LogisticRegression(max_iter=1600)),
+    'random_forest': ('Random Forest', lambda: RandomForestClassifier(n_estimators=120)),
+    'rbf_svc': ('Support Vector Machine', lambda: SVC()),
+    'linear_svc': ('Linear SVM', lambda: LinearSVC()),
+    'sgd': ('SGD (log loss)', lambda: SGDClassifier(loss='log_loss', alpha=1e-5, max_iter=50, tol=1e-4, random_state=42)),
+    'complement_nb': ('Complement Naive Bayes', lambda: ComplementNB()),
+}
+DEFAULT_CANDIDATES = ['logreg', 'random_forest', 'rbf_svc', 'linear_svc', 'sgd', 'complement_nb']
+
+# Incremental learners for --out-of-core (both support partial_fit)
+OUT_OF_CORE_LEARNERS = {
+    'sgd': ('SGD (log loss, out-of-core)', lambda: SGDClassifier(loss='log_loss', alpha=1e-6, random_state=42)),
+    'nb': ('Multinomial Naive Bayes (out-of-core)', lambda: MultinomialNB(alpha=0.01)),
+}
+# partial_fit must be told every class up front
+SENTIMENT_LABELS = ['negative', 'neutral', 'positive']
+
+
+@dataclass
+class ModelTrainerConfig:
+    train_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_train_data.csv')
+    test_path: str = os.path.join(BASE_DIR, 'artifacts', 'transformed_test_data.csv')
+    model_dir: str = MODEL_DIR
+    results_path: str = os.path.join(MODEL_DIR, 'training_results.json')
+    # Vectorized train/test matrices, keyed by data hash + vectorizer params (None disables)
+    feature_cache_dir: Optional[str] = os.path.join(BASE_DIR, 'artifacts', 'feature_cache')
+    # Features and labels (explicitly select feature column to avoid label leakage)
+    feature_col: str = 'review_text'
+    label_col: str = 'sentiment_label'
+    max_features: int = 5000
+    candidates: List[str] = field(default_factory=lambda: list(DEFAULT_CANDIDATES))
+    # Candidates fitted at the same time (-1 = all cores)
+    n_jobs: int = -1
+    # The RBF SVC is O(n^2) in training rows; skip it above this size
+    svc_max_rows: int = 20000
+    # Refit each candidate under tracemalloc to record its fit peak memory
+    # (doubles the fit work; the timed fit always runs without tracing)
+    measure_fit_memory: bool = True
+    # Out-of-core mode: rows per streamed chunk, hashing space and learner
+    chunk_rows: int = 20000
+    hashing_features: int = 2 ** 20
+    learner: str = 'sgd'
+    epochs: int = 1
+
+
+def _fit_candidate(key, X_train, y_train, X_test, y_test, measure_memory=True):
+    """Fit one candidate and measure it (runs in a joblib worker)."""
+    name, factory = CANDIDATES[key]
+    model = factory()
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    # tracemalloc hooks every allocation and slows the fit down, so the peak
+    # comes from a second fit of a fresh model rather than the timed one
+    fit_peak = None
+    if measure_memory:
+        tracemalloc.start()
+        factory().fit(X_train, y_train)
+        _, fit_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    preds = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    result = {
+        'key': key,
+        'name': name,
+        'accuracy': float(accuracy_score(y_test, preds)),
+        'macro_f1': float(f1_score(y_test, preds, average='macro', zero_division=0)),
+        'fit_seconds': round(fit_seconds, 4),
+        'predict_ms_per_1k': round(1000 * 1000 * predict_seconds / max(X_test.shape[0], 1), 4),
+        'fit_peak_mb': round(fit_peak / 2 ** 20, 2) if fit_peak is not None else None,
+        'model_size_mb': round(len(pickle.dumps(model)) / 2 ** 20, 3),
+    }
+    return result, model, preds
+
+
+def _is_out_of_core(model: SentimentModel) -> bool:
+    return isinstance(model.vectorizer, HashingVectorizer) and hasattr(model.model, 'partial_fit')
+
+
+class ModelTrainer:
+    def __init__(self, config: ModelTrainerConfig = None):
+        self.trainer_config = config or ModelTrainerConfig()
+        self.store = get_artifact_store()
+
+    def initiate_model_trainer(self) -> str:
+        """Train every candidate, print their metrics and save the most accurate one.
+
+        Returns the path of the saved model artifact.
+        """
+        logging.info("Starting model training...")
+        with metrics.track_stage("train", mode="in_memory") as stage:
+            return self._train_in_memory(stage)
+
+    def _train_in_memory(self, stage: metrics.StageMetrics) -> str:
+        config = self.trainer_config
+        try:
+            # Load train and test data (only the two columns used, in the configured artifact format)
+            columns = [config.feature_col, config.label_col]
+            train_df = self.store.read(config.train_path, columns=columns)
+            test_df = self.store.read(config.test_path, columns=columns)
+            stage.rows_in = len(train_df)
+
+            X_train = train_df[config.feature_col].astype(str)
+            y_train = train_df[config.label_col].astype(str)
+            X_test = test_df[config.feature_col].astype(str)
+            y_test = test_df[config.label_col].astype(str)
+
+            print(f"Using feature column: {config.feature_col}. Label column: {config.label_col} (will not be used as a feature)")
+
+            # Vectorize text
+            start = time.perf_counter()
+            vectorizer, X_train_vec, X_test_vec, cache_hit = self._vectorize(X_train, y_train, X_test, y_test)
+            vectorize_seconds = time.perf_counter() - start
+            logging.info(f"TF-IDF features ready in {vectorize_seconds:.2f}s (cache hit: {cache_hit})")
+
+            keys = self._select_candidates(len(train_df))
+            outcomes = joblib.Parallel(n_jobs=min(config.n_jobs, len(keys)) if config.n_jobs > 0 else config.n_jobs)(
+                joblib.delayed(_fit_candidate)(key, X_train_vec, y_train.to_numpy(), X_test_vec, y_test.to_numpy(),
+                                               config.measure_fit_memory)
+                for key in keys
+            )
+
+            best = None
+            for result, model, preds in outcomes:
+                self._print_report(result, y_test, preds)
+                logging.info(f"{result['name']} accuracy: {result['accuracy']:.4f}")
+                if best is None or result['accuracy'] > best[0]['accuracy']:
+                    best = (result, model)
+
+            result, model = best
+            sentiment_model = SentimentModel(
+                vectorizer=vectorizer,
+                model=model,
+                model_name=result['name'],
+                version=datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S'),
+                cleaner_version=CLEANER_VERSION,
+                metrics={"accuracy": result['accuracy'], "macro_f1": result['macro_f1'],
+                         "train_rows": len(train_df), "test_rows": len(test_df)},
+            )
+            model_path = sentiment_model.save(config.model_dir)
+            save_json(config.results_path, {
+                "version": sentiment_model.version,
+                "best": result['key'],
+                "model_path": model_path,
+                "train_rows": len(train_df),
+                "test_rows": len(test_df),
+                "max_features": config.max_features,
+                "vectorize_seconds": round(vectorize_seconds, 4),
+                "feature_cache_hit": cache_hit,
+                "candidates": [outcome[0] for outcome in outcomes],
+            })
+            print(f"\nSaved best model ({result['name']}, accuracy {result['accuracy']:.4f}) to {model_path}")
+            print(f"Wrote per-model results to {config.results_path}")
+            logging.info(f"Saved best model ({result['name']}) to {model_path}")
+            return model_path
+        except Exception as e:
+            logging.error("Error during model training")
+            raise CustomException(e, sys)
+
+    def initiate_out_of_core_training(self, update: bool = False) -> str:
+        """Train (or with `update=True`, continue training) a hashing + partial_fit model.
+
+        Only one chunk of `chunk_rows` reviews is in memory at a time. In update
+        mode the latest saved model must itself be out-of-core; it is trained
+        one more pass on training rows with `id` above its `max_id`.
+        Returns the path of the saved model artifact.
+        """
+        logging.info(f"Starting out-of-core model training (update={update})...")
+        with metrics.track_stage("train", mode="out_of_core_update" if update else "out_of_core") as stage:
+            return self._train_out_of_core(update, stage)
+
+    def has_out_of_core_model(self) -> bool:
+        """True if the latest saved model can be continued with `update=True`."""
+        try:
+            return _is_out_of_core(SentimentModel.load(self.trainer_config.model_dir))
+        except (FileNotFoundError, ValueError):
+            # No model yet, or one saved in an older format
+            return False
+
+    def _train_out_of_core(self, update: bool, stage: metrics.StageMetrics) -> str:
+        config = self.trainer_config
+        try:
+            filters = None
+            if update:
+                previous = SentimentModel.load(config.model_dir)
+                if not _is_out_of_core(previous):
+                    raise ValueError(
+                        f"The latest model ({previous.model_name}) was not trained out-of-core; "
+                        "run --out-of-core without --update first"
+                    )
+                vectorizer, model, name = previous.vectorizer, previous.model, previous.model_name
+                max_id = previous.max_id
+                if max_id is not None:
+                    filters = [('id', '>', max_id)]
+                epochs = 1
+            else:
+                if config.learner not in OUT_OF_CORE_LEARNERS:
+                    raise ValueError(f"Unknown learner '{config.learner}'; choose from {sorted(OUT_OF_CORE_LEARNERS)}")
+                name, factory = OUT_OF_CORE_LEARNERS[config.learner]
+                vectorizer = HashingVectorizer(
+                    n_features=config.hashing_features, ngram_range=(1, 2), alternate_sign=False
+                )
+                model = factory()
+                max_id = None
+                epochs = config.epochs
+
+            columns = ['id', config.feature_col, config.label_col]
+            rows = 0
+            start = time.perf_counter()
+            for epoch in range(epochs):
+                for chunk in self.store.iter(config.train_path, config.chunk_rows, columns=columns, filters=filters):
+                    texts = chunk[config.feature_col].astype(str)
+                    labels = chunk[config.label_col].astype(str).to_numpy()
+                    model.partial_fit(vectorizer.transform(texts), labels, classes=SENTIMENT_LABELS)
+                    if epoch == 0:
+                        rows += len(chunk)
+                        chunk_max = int(chunk['id'].max())
+                        max_id = chunk_max if max_id is None else max(max_id, chunk_max)
+                    logging.info(f"Epoch {epoch + 1}: trained on {len(chunk)} more rows")
+            fit_seconds = time.perf_counter() - start
+            stage.rows_in = rows
+
+            if rows == 0:
+                if update:
+                    print(f"No training rows with id > {max_id}; the model is up to date")
+                    return SentimentModel.latest_path(config.model_dir)
+                raise ValueError("No training rows found")
+
+            accuracy, macro_f1, matrix = self._evaluate_streaming(vectorizer, model)
+            print(f'\n{"="*60}')
+            print(f'{name} Accuracy: {accuracy:.4f} (macro F1 {macro_f1:.4f})')
+            print(f'{"update on" if update else "trained on"} {rows} rows in {fit_seconds:.2f}s')
+            print(f'{"="*60}')
+            print(f'Confusion Matrix ({", ".join(SENTIMENT_LABELS)}):\n{matrix}')
+
+            sentiment_model = SentimentModel(
+                vectorizer=vectorizer,
+                model=model,
+                model_name=name,
+                version=datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S'),
+                cleaner_version=CLEANER_VERSION,
+                metrics={"accuracy": accuracy, "macro_f1": macro_f1, "train_rows": rows},
+                max_id=max_id,
+            )
+            model_path = sentiment_model.save(config.model_dir)
+            save_json(config.results_path, {
+                "version": sentiment_model.version,
+                "mode": "out_of_core_update" if update else "out_of_core",
+                "model_path": model_path,
+                "learner": name,
+                "rows_trained": rows,
+                "max_id": max_id,
+                "chunk_rows": config.chunk_rows,
+                "fit_seconds": round(fit_seconds, 4),
+                "accuracy": accuracy,
+                "macro_f1": macro_f1,
+            })
+            print(f"\nSaved model to {model_path}")
+            logging.info(f"Saved out-of-core model ({name}) to {model_path}")
+            return model_path
+        except Exception as e:
+            logging.error("Error during out-of-core model training")
+            raise CustomException(e, sys)
+
+    def _evaluate_streaming(self, vectorizer, model):
+        """Accuracy, macro F1 and confusion matrix over the test set, one chunk at a time."""
+        config = self.trainer_config
+        matrix = np.zeros((len(SENTIMENT_LABELS), len(SENTIMENT_LABELS)), dtype=np.int64)
+        columns = [config.feature_col, config.label_col]
+        for chunk in self.store.iter(config.test_path, config.chunk_rows, columns=columns):
+            preds = model.predict(vectorizer.transform(chunk[config.feature_col].astype(str)))
+            matrix += confusion_matrix(chunk[config.label_col].astype(str), preds, labels=SENTIMENT_LABELS)
+        total = matrix.sum()
+        accuracy = float(np.trace(matrix) / total) if total else 0.0
+        predicted, actual = matrix.sum(axis=0), matrix.sum(axis=1)
+        f1 = [
+            2 * matrix[i, i] / (predicted[i] + actual[i]) if predicted[i] + actual[i] else 0.0
+            for i in range(len(SENTIMENT_LABELS))
+        ]
+        return accuracy, float(np.mean(f1)), matrix
+
+    def _select_candidates(self, train_rows: int) -> List[str]:
+        config = self.trainer_config
+        unknown = [key for key in config.candidates if key not in CANDIDATES]
+        if unknown:
+            raise ValueError(f"Unknown candidate model(s) {unknown}; choose from {sorted(CANDIDATES)}")
+        keys = list(config.candidates)
+        if 'rbf_svc' in keys and train_rows > config.svc_max_rows:
+            logging.info(f"Skipping rbf_svc: {train_rows} training rows > svc_max_rows={config.svc_max_rows}")
+            print(f"Skipping the RBF SVM ({train_rows} rows > {config.svc_max_rows}); use linear_svc or sgd instead")
+            keys.remove('rbf_svc')
+        return keys
+
+    def _vectorize(self, X_train, y_train, X_test, y_test):
+        """Fit TF-IDF on the training text, reusing a cached result for identical data + params."""
+        config = self.trainer_config
+        vectorizer = TfidfVectorizer(max_features=config.max_features)
+        cache_path = None
+        if config.feature_cache_dir:
+            digest = hashlib.blake2b(digest_size=16)
+            params = json.dumps(vectorizer.get_params(), sort_keys=True, default=str)
+            digest.update(f"{sklearn.__version__}\0{params}\0".encode("utf-8"))
+            for column in (X_train, y_train, X_test, y_test):
+                digest.update(b"\1")
+                for value in column:
+                    digest.update(value.encode("utf-8", "surrogatepass"))
+                    digest.update(b"\0")
+            cache_path = os.path.join(config.feature_cache_dir, f"tfidf_{digest.hexdigest()}.joblib")
+            if os.path.exists(cache_path):
+                cached = joblib.load(cache_path)
+                return cached["vectorizer"], cached["X_train"], cached["X_test"], True
+
+        X_train_vec = vectorizer.fit_transform(X_train)
+        X_test_vec = vectorizer.transform(X_test)
+        if cache_path is not None:
+            os.makedirs(config.feature_cache_dir, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            joblib.dump({"vectorizer": vectorizer, "X_train": X_train_vec, "X_test": X_test_vec}, tmp_path)
+            os.replace(tmp_path, cache_path)
+        return vectorizer, X_train_vec, X_test_vec, False
+
+    @staticmethod
+    def _print_report(result, y_test, preds) -> None:
+        print(f'\n{"="*60}')
+        print(f'{result["name"]} Accuracy: {result["accuracy"]:.4f}')
+        peak = f'{result["fit_peak_mb"]:.1f} MB' if result["fit_peak_mb"] is not None else 'not measured'
+        print(f'fit {result["fit_seconds"]:.2f}s, predict {result["predict_ms_per_1k"]:.2f} ms/1k reviews, '
+              f'fit peak {peak}, model {result["model_size_mb"]:.2f} MB')
+        print(f'{"="*60}')
+        print(classification_report(y_test, preds, zero_division=0))
+        print(f'Confusion Matrix:\n{confusion_matrix(y_test, preds)}')
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train sentiment classifiers and save the best one")
+    parser.add_argument("--models", nargs="+", choices=sorted(CANDIDATES), default=None,
+                        help=f"candidates to train (default: {' '.join(DEFAULT_CANDIDATES)})")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="candidates fitted concurrently (-1 = all cores)")
+    parser.add_argument("--max-features", type=int, default=5000, help="TF-IDF vocabulary size")
+    parser.add_argument("--no-feature-cache", action="store_true", help="always re-vectorize")
+    parser.add_argument("--results", default=None, help="where to write the JSON results")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the traced second fit that records each candidate's fit peak memory")
+    parser.add_argument("--out-of-core", action="store_true",
+                        help="stream the data through HashingVectorizer + partial_fit (constant memory)")
+    parser.add_argument("--update", action="store_true",
+                        help="with --out-of-core: continue the saved model on reviews added since it was trained")
+    parser.add_argument("--learner", choices=sorted(OUT_OF_CORE_LEARNERS), default="sgd",
+                        help="incremental learner for --out-of-core")
+    parser.add_argument("--chunk-rows", type=int, default=20000, help="rows per chunk for --out-of-core")
+    parser.add_argument("--epochs", type=int, default=1, help="passes over the data for --out-of-core")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
 
-# Load train and test data
-train_path = '../../artifacts/transformed_train_data.csv'
-test_path = '../../artifacts/transformed_test_data.csv'
-train_df = pd.read_csv(train_path)
-test_df = pd.read_csv(test_path)
-
-# Features and labels (explicitly select feature column to avoid label leakage)
-feature_col = 'review_text'
-label_col = 'sentiment_label'
-
-# Ensure we only use the text column as features (no leakage)
-if feature_col not in train_df.columns or feature_col not in test_df.columns:
-    raise ValueError(f"Feature column '{feature_col}' not found in train/test data")
-if label_col not in train_df.columns or label_col not in test_df.columns:
-    raise ValueError(f"Label column '{label_col}' not found in train/test data")
-
-X_train = train_df[feature_col].astype(str).copy()
-y_train = train_df[label_col].astype(str).copy()
-X_test = test_df[feature_col].astype(str).copy()
-y_test = test_df[label_col].astype(str).copy()
-
-print(f"Using feature column: {feature_col}. Label column: {label_col} (will not be used as a feature)")
-
-# Vectorize text
-vectorizer = TfidfVectorizer(max_features=5000)
-X_train_vec = vectorizer.fit_transform(X_train)
-X_test_vec = vectorizer.transform(X_test)
-
-# Models to train
-def train_and_evaluate(model, name):
-    model.fit(X_train_vec, y_train)
-    preds = model.predict(X_test_vec)
-    acc = accuracy_score(y_test, preds)
-    print(f'\n{"="*60}')
-    print(f'{name} Accuracy: {acc:.4f}')
-    print(f'{"="*60}')
-    print(classification_report(y_test, preds, zero_division=0))
-    print(f'Confusion Matrix:\n{confusion_matrix(y_test, preds)}')
-
-models = [
-    (LogisticRegression(max_iter=1600), 'Logistic Regression'),
-    (RandomForestClassifier(n_estimators=120), 'Random Forest'),
-    (SVC(), 'Support Vector Machine'),
-]
-
-for model, name in models:
-    train_and_evaluate(model, name)
+    config = ModelTrainerConfig(n_jobs=args.n_jobs, max_features=args.max_features, learner=args.learner,
+                                chunk_rows=args.chunk_rows, epochs=args.epochs)
+    if args.models:
+        config.candidates = args.models
+    if args.no_feature_cache:
+        config.feature_cache_dir = None
+    if args.no_memory:
+        config.measure_fit_memory = False
+    if args.results:
+        config.results_path = args.results
+    if args.update and not args.out_of_core:
+        parser.error("--update requires --out-of-core")
+    trainer = ModelTrainer(config)
+    with metrics.profiled("train", args.profile):
+        if args.out_of_core:
+            trainer.initiate_out_of_core_training(update=args.update)
+        else:
+            trainer.initiate_model_trainer()
@@ -0,0 +1,158 @@
+"""
+Content-hash cache for cleaned review text and VADER scores.
+
+Entries are keyed by a hash of the raw review text plus the cleaner,
+lexicon and scorer implementation versions (see `get_result_cache`), so a
+change to any of them invalidates old results. Lookups go
+through an in-memory LRU tier first and then, if a `db_path` is given, an
+on-disk SQLite tier that survives across runs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (cleaned_text, compound, pos, neu, neg)
+CacheEntry = Tuple[str, float, float, float, float]
+
+_SQLITE_BATCH = 500
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def as_dict(self) -> dict:
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 4),
+        }
+
+
+class ResultCache:
+    """Two-tier (LRU memory + optional SQLite) cache of clean + score results."""
+
+    def __init__(self, version: str, max_entries: int = 100_000, db_path: Optional[str] = None):
+        self.version = version
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self.stats = CacheStats()
+        self._memory: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    cleaned_text TEXT,
+                    compound REAL,
+                    pos REAL,
+                    neu REAL,
+                    neg REAL
+                )
+                """
+            )
+            self._conn.commit()
+
+    def key(self, text: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(self.version.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(text.encode("utf-8", "surrogatepass"))
+        return digest.hexdigest()
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheEntry]:
+        """Return the cached entries for `keys`; missing keys are simply absent.
+
+        Hits and misses are counted once per distinct key.
+        """
+        found: Dict[str, CacheEntry] = {}
+        pending: List[str] = []
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                entry = self._memory.get(key)
+                if entry is None:
+                    pending.append(key)
+                else:
+                    self._memory.move_to_end(key)
+                    found[key] = entry
+            self.stats.memory_hits += len(found)
+
+            if pending and self._conn is not None:
+                from_disk = self._read_disk(pending)
+                self.stats.disk_hits += len(from_disk)
+                self._remember(from_disk)
+                found.update(from_disk)
+            self.stats.misses += sum(1 for key in pending if key not in found)
+        return found
+
+    def put_many(self, entries: Dict[str, CacheEntry]) -> None:
+        if not entries:
+            return
+        with self._lock:
+            self._remember(entries)
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)",
+                    [(key, *entry) for key, entry in entries.items()],
+                )
+                self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self.stats = CacheStats()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM results")
+                self._conn.commit()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _remember(self, entries: Dict[str, CacheEntry]) -> None:
+        for key, entry in entries.items():
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, keys: List[str]) -> Dict[str, CacheEntry]:
+        found: Dict[str, CacheEntry] = {}
+        for start in range(0, len(keys), _SQLITE_BATCH):
+            batch = keys[start:start + _SQLITE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, cleaned_text, compound, pos, neu, neg FROM results WHERE key IN ({placeholders})",
+                batch,
+            )
+            for key, *entry in rows:
+                found[key] = tuple(entry)
+        return found
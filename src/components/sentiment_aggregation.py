@@ -0,0 +1,316 @@
+"""
+Per-movie sentiment aggregates.
+
+One grouped, vectorized pass over scored reviews gives, for every
+`movie_id`, the review count, label counts and shares, and the mean and
+standard deviation of the compound score. Each row also keeps its
+sufficient statistics (count, mean and `m2_compound`, the sum of squared
+deviations). That lets two tables be merged exactly with Chan's parallel
+update. So the transformed data is folded in batch by batch, and an
+incremental run only aggregates the reviews added since the previous run.
+
+The table is written to `artifacts/movie_sentiment.*` (in the configured
+artifact format). With `materialize=True` it is also upserted into the
+`movie_sentiment` table in Postgres, so dashboards can read it without
+rescanning `reviews`.
+
+    python -m src.components.sentiment_aggregation [--incremental] [--materialize]
+"""
+
+import hashlib
+import os
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.components.artifact_store import get_artifact_store, snapshot
+from src.exception import CustomException
+from src import metrics
+from src.logger import logging
+from src.utils import ARTIFACTS_DIR, load_config, load_json, save_json
+
+LABELS = ("positive", "neutral", "negative")
+INPUT_COLUMNS = ["id", "movie_id", "movie_name", "sentiment_compound", "sentiment_label"]
+AGGREGATE_COLUMNS = [
+    "movie_id", "movie_name", "n_reviews",
+    "n_positive", "n_neutral", "n_negative",
+    "share_positive", "share_neutral", "share_negative",
+    "mean_compound", "std_compound", "m2_compound", "max_review_id",
+]
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS movie_sentiment (
+    movie_id TEXT PRIMARY KEY,
+    movie_name TEXT,
+    n_reviews BIGINT NOT NULL,
+    n_positive BIGINT NOT NULL,
+    n_neutral BIGINT NOT NULL,
+    n_negative BIGINT NOT NULL,
+    share_positive DOUBLE PRECISION,
+    share_neutral DOUBLE PRECISION,
+    share_negative DOUBLE PRECISION,
+    mean_compound DOUBLE PRECISION,
+    std_compound DOUBLE PRECISION,
+    m2_compound DOUBLE PRECISION,
+    max_review_id BIGINT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+
+@dataclass
+class SentimentAggregationConfig:
+    transformed_data_path: str = os.path.join(ARTIFACTS_DIR, 'transformed_data.csv')
+    aggregates_path: str = os.path.join(ARTIFACTS_DIR, 'movie_sentiment.csv')
+    # Watermark (max review id aggregated) and the extent of the transformed data it covers
+    state_path: str = os.path.join(ARTIFACTS_DIR, 'aggregation_state.json')
+    batch_rows: int = 100_000
+    incremental: bool = False
+    # Also upsert the table into Postgres (`movie_sentiment`)
+    materialize: bool = False
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "SentimentAggregationConfig":
+        """Build from the `aggregation:` section of `config/config.yaml`."""
+        section = (load_config() if config is None else config).get("aggregation") or {}
+        return cls(**{key: value for key, value in section.items() if key in cls.__dataclass_fields__})
+
+
+def aggregate_reviews(df: pd.DataFrame, by: Optional[str] = "movie_id") -> pd.DataFrame:
+    """Aggregate scored reviews per `by` (or over the whole frame when `by` is None).
+
+    Needs `sentiment_compound` and `sentiment_label`; `movie_name` and `id`
+    are carried along when present.
+    """
+    compound = df["sentiment_compound"].to_numpy(dtype=np.float64)
+    label = df["sentiment_label"].to_numpy(dtype=object)
+    columns = {"compound": compound}
+    for name in LABELS:
+        columns[f"n_{name}"] = (label == name).astype(np.int64)
+    if "id" in df:
+        columns["max_review_id"] = df["id"].to_numpy()
+    if by and "movie_name" in df:
+        columns["movie_name"] = df["movie_name"].to_numpy(dtype=object)
+    keys = df[by].to_numpy(dtype=object) if by else np.zeros(len(df), dtype=np.int8)
+    frame = pd.DataFrame(columns, index=pd.Index(keys, name=by or "group"))
+
+    aggs = {
+        "n_reviews": ("compound", "size"),
+        "mean_compound": ("compound", "mean"),
+        "var_compound": ("compound", "var"),
+        **{f"n_{name}": (f"n_{name}", "sum") for name in LABELS},
+    }
+    if "max_review_id" in frame:
+        aggs["max_review_id"] = ("max_review_id", "max")
+    if "movie_name" in frame:
+        aggs["movie_name"] = ("movie_name", "last")
+    grouped = frame.groupby(level=0, sort=True).agg(**aggs)
+    grouped["m2_compound"] = grouped.pop("var_compound").fillna(0.0) * (grouped["n_reviews"] - 1)
+    return _finalize(grouped)
+
+
+def merge_aggregates(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Combine two aggregate tables as if their reviews had been aggregated together."""
+    if old.empty:
+        return new
+    if new.empty:
+        return old
+    key = old.index.name
+    old, new = old.align(new, join="outer")
+    n_a, n_b = old["n_reviews"].fillna(0), new["n_reviews"].fillna(0)
+    mean_a, mean_b = old["mean_compound"].fillna(0.0), new["mean_compound"].fillna(0.0)
+    n = n_a + n_b
+    delta = mean_b - mean_a
+
+    merged = pd.DataFrame(index=old.index)
+    merged["n_reviews"] = n.astype(np.int64)
+    merged["mean_compound"] = mean_a + delta * (n_b / n)
+    merged["m2_compound"] = (old["m2_compound"].fillna(0.0) + new["m2_compound"].fillna(0.0)
+                             + delta * delta * (n_a * n_b / n))
+    for name in LABELS:
+        merged[f"n_{name}"] = (old[f"n_{name}"].fillna(0) + new[f"n_{name}"].fillna(0)).astype(np.int64)
+    if "max_review_id" in old:
+        merged["max_review_id"] = np.fmax(old["max_review_id"], new["max_review_id"]).astype(np.int64)
+    if "movie_name" in old:
+        merged["movie_name"] = new["movie_name"].where(new["movie_name"].notna(), old["movie_name"])
+    merged.index.name = key
+    return _finalize(merged)
+
+
+def _finalize(table: pd.DataFrame) -> pd.DataFrame:
+    """Derive shares and std from the sufficient statistics and order the columns."""
+    n = table["n_reviews"]
+    for name in LABELS:
+        table[f"share_{name}"] = table[f"n_{name}"] / n
+    # Sample std (ddof=1) like pandas' `.std()`; undefined for a single review
+    table["std_compound"] = np.sqrt(table["m2_compound"] / (n - 1).where(n > 1))
+    columns = [column for column in AGGREGATE_COLUMNS[1:] if column in table]
+    return table[columns]
+
+
+class SentimentAggregation:
+    def __init__(self, config: Optional[SentimentAggregationConfig] = None):
+        self.aggregation_config = config or SentimentAggregationConfig.from_config()
+        self.store = get_artifact_store()
+
+    def initiate_sentiment_aggregation(self, incremental: bool = None, materialize: bool = None) -> pd.DataFrame:
+        """Update (or rebuild) the per-movie table and return it, indexed by `movie_id`."""
+        logging.info("Starting sentiment aggregation...")
+        config = self.aggregation_config
+        incremental = config.incremental if incremental is None else incremental
+        materialize = config.materialize if materialize is None else materialize
+        with metrics.track_stage("aggregate", incremental=incremental) as stage:
+            return self._run(incremental, materialize, stage)
+
+    def _run(self, incremental: bool, materialize: bool, stage: metrics.StageMetrics) -> pd.DataFrame:
+        config = self.aggregation_config
+        try:
+            state = self._load_state() if incremental else None
+            if state is None:
+                table = self._aggregate(filters=None)
+                changed = table
+                stage.rows_in = int(table['n_reviews'].sum())
+                logging.info(f"Aggregated {int(table['n_reviews'].sum())} reviews into {len(table)} movies")
+            else:
+                previous = self._read_table()
+                new = self._aggregate(filters=[("id", ">", state["max_id"])])
+                table = merge_aggregates(previous, new)
+                changed = table.loc[new.index]
+                stage.rows_in = int(new['n_reviews'].sum())
+                logging.info(f"Incremental aggregation: {int(new['n_reviews'].sum())} new reviews "
+                             f"for {len(new)} movies (id > {state['max_id']})")
+
+            stage.rows_out = len(table)
+            self.store.write(table.reset_index(), config.aggregates_path)
+            logging.info(f"Saved movie aggregates to {self.store.resolve(config.aggregates_path)}")
+            if materialize:
+                self.materialize(changed, replace=state is None)
+            max_id = table["max_review_id"].max() if "max_review_id" in table and len(table) else None
+            self._save_state(None if pd.isna(max_id) else int(max_id))
+        except Exception as e:
+            logging.error("Error during sentiment aggregation")
+            raise CustomException(e, sys)
+        return table
+
+    def _aggregate(self, filters: Optional[list]) -> pd.DataFrame:
+        """Fold the transformed data into one table, one artifact batch at a time."""
+        config = self.aggregation_config
+        batches = self.store.iter(config.transformed_data_path, batch_rows=config.batch_rows,
+                                  columns=INPUT_COLUMNS, filters=filters)
+        table = aggregate_reviews(pd.DataFrame(columns=INPUT_COLUMNS))
+        for batch in batches:
+            table = merge_aggregates(table, aggregate_reviews(batch))
+        return table
+
+    def _read_table(self) -> pd.DataFrame:
+        table = self.store.read(self.aggregation_config.aggregates_path)
+        return table.set_index("movie_id")
+
+    def materialize(self, table: pd.DataFrame, replace: bool = False) -> None:
+        """Upsert `table` into the database's `movie_sentiment`; `replace` first drops rows from earlier runs."""
+        from src.components import db
+
+        updated_at = datetime.now(timezone.utc)
+        rows = [
+            {
+                **{column: None if pd.isna(value) else value.item() if hasattr(value, "item") else value
+                   for column, value in zip(AGGREGATE_COLUMNS, row)},
+                "updated_at": updated_at,
+            }
+            for row in table.reset_index()[AGGREGATE_COLUMNS].itertuples(index=False, name=None)
+        ]
+        with db.transaction() as conn:
+            conn.exec_driver_sql(CREATE_TABLE_SQL)
+            if replace:
+                conn.exec_driver_sql("DELETE FROM movie_sentiment")
+            db.upsert_rows("movie_sentiment", rows, key=["movie_id"], conn=conn)
+        logging.info(f"Materialized {len(rows)} movie aggregates into the database")
+
+    # -- incremental state ------------------------------------------------------
+
+    def _load_state(self) -> Optional[dict]:
+        """Return the saved watermark if the transformed data has only been appended to since."""
+        config = self.aggregation_config
+        state = load_json(config.state_path)
+        if (
+            state is None
+            or state.get("max_id") is None
+            or state.get("format") != self.store.format
+            or not self.store.exists(config.aggregates_path)
+            or not self._only_appended(state.get("extent") or {})
+        ):
+            logging.info("No usable aggregation state, aggregating all transformed data")
+            return None
+        return state
+
+    def _save_state(self, max_id: Optional[int]) -> None:
+        path = self.store.resolve(self.aggregation_config.transformed_data_path)
+        extent = snapshot([path]).get(path)
+        if isinstance(extent, list):
+            extent = {part: _file_digest(os.path.join(path, part)) for part in extent}
+        elif extent is not None:
+            extent = {"size": extent, "digest": _file_digest(path, end=extent)}
+        save_json(self.aggregation_config.state_path, {
+            "max_id": max_id,
+            "format": self.store.format,
+            "extent": extent,
+        })
+
+    def _only_appended(self, extent: Dict[str, str]) -> bool:
+        """True if the transformed data is the recorded extent plus appended rows.
+
+        Parts written before must be unchanged; a CSV must still hold the same
+        bytes up to the recorded size. A rewritten artifact forces a rebuild.
+        """
+        path = self.store.resolve(self.aggregation_config.transformed_data_path)
+        if not extent:
+            return False
+        if "size" in extent:
+            return (
+                os.path.isfile(path)
+                and os.path.getsize(path) >= extent["size"]
+                and _file_digest(path, end=extent["size"]) == extent["digest"]
+            )
+        return all(
+            os.path.isfile(os.path.join(path, part)) and _file_digest(os.path.join(path, part)) == digest
+            for part, digest in extent.items()
+        )
+
+
+def _file_digest(path: str, end: Optional[int] = None, window: int = 65536) -> str:
+    """Hash of the length and the last `window` bytes before `end`; changes when a file is rewritten."""
+    end = os.path.getsize(path) if end is None else end
+    with open(path, "rb") as f:
+        f.seek(max(0, end - window))
+        data = f.read(min(end, window))
+    return hashlib.blake2b(data + str(end).encode(), digest_size=12).hexdigest()
+
+
+def read_movie_aggregates(path: Optional[str] = None, movie_ids: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Load the persisted per-movie table (optionally only `movie_ids`) for dashboards."""
+    path = path or SentimentAggregationConfig().aggregates_path
+    filters = [("movie_id", "in", list(movie_ids))] if movie_ids is not None else None
+    return get_artifact_store().read(path, filters=filters)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Aggregate scored reviews per movie")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fold in reviews transformed since the last run")
+    parser.add_argument("--materialize", action="store_true",
+                        help="also upsert the table into Postgres (movie_sentiment)")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+
+    with metrics.profiled("aggregate", args.profile):
+        table = SentimentAggregation().initiate_sentiment_aggregation(
+            incremental=args.incremental, materialize=args.materialize or None
+        )
+    print(table.to_string(max_rows=20))
@@ -0,0 +1,120 @@
+"""
+Persisted TF-IDF + classifier sentiment model.
+
+`ModelTrainer` fits a vectorizer and picks the best classifier, then saves
+both as one versioned joblib artifact under `artifacts/models/`
+(`sentiment_model_v<version>.joblib`), with `LATEST` naming the newest one.
+`get_sentiment_model()` loads it once per process; `predict_batch` scores a
+whole batch of cleaned texts with a single sparse `transform` and
+`predict_proba`.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.logger import logging
+
+# Bump when the layout of the saved dict changes
+MODEL_FORMAT_VERSION = 1
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+MODEL_DIR = os.path.join(BASE_DIR, 'artifacts', 'models')
+LATEST_FILE = 'LATEST'
+
+
+@dataclass
+class SentimentModel:
+    vectorizer: object
+    model: object
+    model_name: str
+    version: str
+    cleaner_version: str
+    metrics: Dict[str, float] = field(default_factory=dict)
+    # Highest transformed review id trained on; `--update` continues from here
+    max_id: Optional[int] = None
+
+    @property
+    def classes(self) -> List[str]:
+        return [str(label) for label in self.model.classes_]
+
+    def predict_batch(self, cleaned_texts: Sequence[str]):
+        """Return (labels, probabilities) for already-cleaned texts.
+
+        `probabilities` has one column per entry of `classes`, or is None if
+        the classifier has no `predict_proba` (e.g. a plain `SVC`).
+        """
+        features = self.vectorizer.transform(cleaned_texts)
+        if hasattr(self.model, "predict_proba"):
+            proba = self.model.predict_proba(features)
+            labels = np.asarray(self.model.classes_)[proba.argmax(axis=1)]
+            return labels, proba
+        return self.model.predict(features), None
+
+    def save(self, model_dir: str = MODEL_DIR) -> str:
+        """Write `sentiment_model_v<version>.joblib` and point `LATEST` at it."""
+        import joblib
+
+        os.makedirs(model_dir, exist_ok=True)
+        filename = f"sentiment_model_v{self.version}.joblib"
+        path = os.path.join(model_dir, filename)
+        joblib.dump({"format_version": MODEL_FORMAT_VERSION, **self.__dict__}, path)
+        latest_tmp = os.path.join(model_dir, f"{LATEST_FILE}.tmp")
+        with open(latest_tmp, "w", encoding="utf-8") as f:
+            f.write(filename)
+        os.replace(latest_tmp, os.path.join(model_dir, LATEST_FILE))
+        return path
+
+    @staticmethod
+    def latest_path(model_dir: str = MODEL_DIR) -> str:
+        """Path of the model `LATEST` points at in `model_dir`."""
+        latest = os.path.join(model_dir, LATEST_FILE)
+        if not os.path.exists(latest):
+            raise FileNotFoundError(
+                f"No trained model in {model_dir}; run `python -m src.components.model_trainer` first"
+            )
+        with open(latest, "r", encoding="utf-8") as f:
+            return os.path.join(model_dir, f.read().strip())
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "SentimentModel":
+        """Load a saved model; `path` may be a `.joblib` file or a model directory (uses `LATEST`)."""
+        path = path or MODEL_DIR
+        if os.path.isdir(path):
+            path = cls.latest_path(path)
+        import joblib
+
+        payload = joblib.load(path)
+        if payload.pop("format_version", None) != MODEL_FORMAT_VERSION:
+            raise ValueError(f"{path} was saved in an unsupported model format")
+        model = cls(**payload)
+
+        from src.components.data_transformation import CLEANER_VERSION
+
+        if model.cleaner_version != CLEANER_VERSION:
+            # Scored text is cleaned by the current cleaner, not the one the model was trained on
+            logging.warning(
+                f"{path} was trained on text from cleaner version {model.cleaner_version}, but the current "
+                f"cleaner is version {CLEANER_VERSION}; predictions may be off until the model is retrained"
+            )
+        return model
+
+
+_models: Dict[Optional[str], SentimentModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_sentiment_model(path: Optional[str] = None) -> SentimentModel:
+    """Return the model at `path` (default: latest), loading it once per process."""
+    model = _models.get(path)
+    if model is None:
+        with _models_lock:
+            model = _models.get(path)
+            if model is None:
+                model = _models[path] = SentimentModel.load(path)
+    return model
@@ -0,0 +1,153 @@
+"""
+Process-wide VADER scorer.
+
+Building a `SentimentIntensityAnalyzer` reads and parses the whole VADER
+lexicon, so it must happen once per process rather than once per review.
+Every sentiment code path (data transformation, predict pipeline, frontend)
+goes through `get_scorer()` to share a single, lazily-initialised analyzer.
+
+If a compiled lexicon index exists (see `resolve_index` and
+`src/components/vader_index.py`), the scorer memory-maps it and NLTK is not
+imported at all. Otherwise NLTK is only imported when the analyzer is built,
+and the lexicon is looked up locally (see `resolve_lexicon`); it is never
+downloaded at run time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    from src.components.vader_index import VaderIndex
+
+LEXICON_RESOURCE = "sentiment/vader_lexicon.zip/vader_lexicon/vader_lexicon.txt"
+# Explicit lexicon file (vader_lexicon.txt), e.g. one bundled with a deployment
+LEXICON_ENV = "VADER_LEXICON_PATH"
+# Repo-local NLTK data dir, searched before the user/system ones
+# (`python -m nltk.downloader -d nltk_data vader_lexicon`)
+LOCAL_NLTK_DATA = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'nltk_data'))
+# Compiled index (`python -m src.components.vader_index build`)
+INDEX_ENV = "VADER_INDEX_PATH"
+DEFAULT_INDEX_PATH = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', 'artifacts', 'vader_lexicon.idx')
+)
+
+
+def resolve_index() -> Optional[str]:
+    """Path of the compiled lexicon index to use, or None to parse the lexicon with NLTK.
+
+    `$VADER_INDEX_PATH` must name an existing index. The default
+    `artifacts/vader_lexicon.idx` is used when it exists, unless
+    `$VADER_LEXICON_PATH` asks for a specific lexicon file.
+    """
+    override = os.getenv(INDEX_ENV)
+    if override:
+        if not os.path.isfile(override):
+            raise LookupError(f"{INDEX_ENV}={override} does not exist")
+        return os.path.abspath(override)
+    if not os.getenv(LEXICON_ENV) and os.path.isfile(DEFAULT_INDEX_PATH):
+        return DEFAULT_INDEX_PATH
+    return None
+
+
+def resolve_lexicon() -> str:
+    """Return the `nltk.data` URL of the VADER lexicon, searching local paths only.
+
+    Order: `$VADER_LEXICON_PATH`, then `nltk_data/` in the repo, then NLTK's
+    usual search path (`$NLTK_DATA`, `~/nltk_data`, ...). Raises `LookupError`
+    with setup instructions instead of trying the network.
+    """
+    import nltk.data
+
+    override = os.getenv(LEXICON_ENV)
+    if override:
+        path = os.path.abspath(override)
+        if not os.path.isfile(path):
+            raise LookupError(f"{LEXICON_ENV}={override} does not exist")
+        # NLTK only opens files under its data roots
+        if os.path.dirname(path) not in nltk.data.path:
+            nltk.data.path.insert(0, os.path.dirname(path))
+        return "file:" + path
+
+    if LOCAL_NLTK_DATA not in nltk.data.path:
+        nltk.data.path.insert(0, LOCAL_NLTK_DATA)
+    try:
+        nltk.data.find(LEXICON_RESOURCE)
+    except LookupError:
+        raise LookupError(
+            "VADER lexicon not found. Run `python -m nltk.downloader vader_lexicon` once "
+            f"(add `-d nltk_data` to keep it in the repo), or set {LEXICON_ENV} to a vader_lexicon.txt file."
+        ) from None
+    return LEXICON_RESOURCE
+
+
+class SentimentScorer:
+    """Thread-safe wrapper that loads its analyzer (index or NLTK) on first use."""
+
+    def __init__(self) -> None:
+        self._analyzer: Optional[Union[VaderIndex, SentimentIntensityAnalyzer]] = None
+        self._lexicon_version: Optional[str] = None
+        self._analyzer_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self._analyzer is not None
+
+    def warm_up(self) -> "SentimentScorer":
+        """Load the lexicon now instead of on the first scored review."""
+        if self._analyzer is None:
+            with self._lock:
+                if self._analyzer is None:
+                    index_path = resolve_index()
+                    if index_path:
+                        from src.components.vader_index import VaderIndex
+
+                        analyzer = VaderIndex.open(index_path)
+                        self._lexicon_version = analyzer.lexicon_version
+                        self._analyzer_version = analyzer.analyzer_version
+                    else:
+                        import nltk
+                        from nltk.sentiment import SentimentIntensityAnalyzer
+
+                        analyzer = SentimentIntensityAnalyzer(lexicon_file=resolve_lexicon())
+                        self._lexicon_version = hashlib.sha1(
+                            analyzer.lexicon_file.encode("utf-8")
+                        ).hexdigest()[:12]
+                        self._analyzer_version = f"nltk-{nltk.__version__}"
+                    self._analyzer = analyzer
+        return self
+
+    @property
+    def lexicon_version(self) -> str:
+        """Short hash of the loaded lexicon, used to invalidate cached scores."""
+        return self.warm_up()._lexicon_version
+
+    @property
+    def analyzer_version(self) -> str:
+        """Which implementation scores (`nltk-<version>` or `index-<format>.<impl>`), also part of cache keys."""
+        return self.warm_up()._analyzer_version
+
+    def polarity_scores(self, text: str) -> dict:
+        analyzer = self._analyzer
+        if analyzer is None:
+            analyzer = self.warm_up()._analyzer
+        return analyzer.polarity_scores(text)
+
+
+_default_scorer = SentimentScorer()
+
+
+def get_scorer() -> SentimentScorer:
+    """Return the scorer shared by the whole process."""
+    return _default_scorer
+
+
+def warm_up_scorer() -> SentimentScorer:
+    """Eagerly initialise the shared scorer (e.g. at app or worker start-up)."""
+    return _default_scorer.warm_up()
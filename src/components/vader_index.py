@@ -0,0 +1,457 @@
+"""
+Compiled VADER lexicon index, loaded with `mmap`.
+
+`SentimentIntensityAnalyzer` parses `vader_lexicon.txt` into a dict in every
+process that scores text (each pool worker, each service replica). The build
+step here compiles the lexicon and VADER's booster, negation, idiom and
+punctuation tables into one binary file. `VaderIndex.open` memory-maps it
+read-only, so start-up costs a file open and the pages are shared by every
+process on the machine.
+
+`VaderIndex.polarity_scores` is a port of NLTK's
+`SentimentIntensityAnalyzer.polarity_scores` (nltk 3.10) that reads the
+tables from the index. It gives exactly the same results;
+`python -m benchmarks.bench_vader_index` checks this.
+
+    python -m src.components.vader_index build [--output PATH]
+    python -m src.components.vader_index check [--index PATH]
+
+File layout (little-endian): a header with the magic, format version,
+source lexicon SHA-1 and the VADER scalars, then one directory entry per
+table (entry count, hash slot count, byte offset). Each table holds its
+float64 values, uint32 string offsets, uint32 open-addressing hash slots
+(CRC-32 of the UTF-8 key, lexicon only) and the UTF-8 string blob.
+"""
+
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import string
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Optional, Tuple
+from zlib import crc32
+
+from src.components.sentiment_scorer import DEFAULT_INDEX_PATH, INDEX_ENV, resolve_lexicon
+
+MAGIC = b"VADERIX1"
+FORMAT_VERSION = 1
+# Bump when a change to `polarity_scores` can change a score; cached results
+# are keyed on it (see `SentimentScorer.analyzer_version`)
+IMPLEMENTATION_VERSION = 1
+
+# magic, version, table count, lexicon sha1, B_DECR, C_INCR, N_SCALAR
+_HEADER = struct.Struct("<8sII40sddd")
+# entries, hash slots, offset
+_TABLE = struct.Struct("<IIQ")
+_TABLES = ("lexicon", "booster", "negate", "idioms", "punctuation")
+_EMPTY_SLOT = 0xFFFFFFFF
+
+_PUNCTUATION = string.punctuation
+
+
+def _align(n: int, to: int = 8) -> int:
+    return (n + to - 1) // to * to
+
+
+def _pack_table(items: Iterable[Tuple[str, float]], hashed: bool) -> Tuple[bytes, int, int]:
+    """Serialise one table; returns (bytes, entry count, hash slot count)."""
+    items = list(items)
+    keys = [k.encode("utf-8") for k, _ in items]
+    values = array("d", [float(v) for _, v in items])
+    offsets = array("I", [0])
+    for key in keys:
+        offsets.append(offsets[-1] + len(key))
+
+    slots = array("I")
+    if hashed:
+        n_slots = 1
+        while n_slots < 2 * max(len(keys), 1):
+            n_slots *= 2
+        slots = array("I", [_EMPTY_SLOT]) * n_slots
+        for i, key in enumerate(keys):
+            slot = crc32(key) & (n_slots - 1)
+            while slots[slot] != _EMPTY_SLOT:
+                slot = (slot + 1) & (n_slots - 1)
+            slots[slot] = i
+
+    body = values.tobytes() + offsets.tobytes() + slots.tobytes() + b"".join(keys)
+    return body, len(keys), len(slots)
+
+
+def build_index(output: str = DEFAULT_INDEX_PATH, lexicon_file: Optional[str] = None) -> str:
+    """Compile the VADER lexicon NLTK would load (see `resolve_lexicon`) into `output`.
+
+    The file is written next to `output` and renamed into place, so processes
+    that have the old index mapped keep reading a consistent copy.
+    """
+    import hashlib
+
+    from nltk.sentiment import SentimentIntensityAnalyzer
+    from nltk.sentiment.vader import VaderConstants
+
+    analyzer = SentimentIntensityAnalyzer(lexicon_file=lexicon_file or resolve_lexicon())
+    constants = VaderConstants()
+    lexicon_sha1 = hashlib.sha1(analyzer.lexicon_file.encode("utf-8")).hexdigest()
+
+    tables = {
+        "lexicon": (analyzer.lexicon.items(), True),
+        "booster": (constants.BOOSTER_DICT.items(), False),
+        "negate": (((word, 0.0) for word in sorted(constants.NEGATE)), False),
+        "idioms": (constants.SPECIAL_CASE_IDIOMS.items(), False),
+        "punctuation": (((p, 0.0) for p in constants.PUNC_LIST), False),
+    }
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, len(_TABLES), lexicon_sha1.encode("ascii"),
+        constants.B_DECR, constants.C_INCR, constants.N_SCALAR,
+    )
+    offset = _align(_HEADER.size + _TABLE.size * len(_TABLES))
+    directory, bodies = [], []
+    for name in _TABLES:
+        body, count, n_slots = _pack_table(*tables[name])
+        directory.append(_TABLE.pack(count, n_slots, offset))
+        padded = body + b"\0" * (_align(len(body)) - len(body))
+        bodies.append(padded)
+        offset += len(padded)
+
+    head = header + b"".join(directory)
+    head += b"\0" * (_align(len(head)) - len(head))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    tmp_path = f"{output}.tmp.{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(head)
+        for body in bodies:
+            f.write(body)
+    os.replace(tmp_path, output)
+    return output
+
+
+class VaderIndex:
+    """Read-only view of a compiled index with NLTK's `polarity_scores` on top."""
+
+    def __init__(self, buffer, path: str = "<buffer>") -> None:
+        if sys.byteorder != "little":
+            raise ValueError("the VADER index format is little-endian only")
+        self.path = path
+        self._buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError(f"{path} is not a VADER index (file too short)")
+        magic, version, n_tables, sha1, b_decr, c_incr, n_scalar = _HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a VADER index")
+        if version != FORMAT_VERSION or n_tables != len(_TABLES):
+            raise ValueError(f"{path} has index format {version}; rebuild it with this version")
+        self.lexicon_sha1 = sha1.decode("ascii")
+        self.B_DECR, self.C_INCR, self.N_SCALAR = b_decr, c_incr, n_scalar
+
+        tables = {}
+        for i, name in enumerate(_TABLES):
+            count, n_slots, offset = _TABLE.unpack_from(view, _HEADER.size + i * _TABLE.size)
+            values = view[offset:offset + 8 * count].cast("d")
+            offset += 8 * count
+            offsets = view[offset:offset + 4 * (count + 1)].cast("I")
+            offset += 4 * (count + 1)
+            slots = view[offset:offset + 4 * n_slots].cast("I")
+            offset += 4 * n_slots
+            tables[name] = (values, offsets, slots, offset)
+
+        # The lexicon stays in the mapping; the small tables are cheap to copy
+        self._values, self._offsets, self._slots, self._blob_start = tables["lexicon"]
+        self._mask = len(self._slots) - 1
+        self.BOOSTER_DICT: Dict[str, float] = dict(self._items(tables["booster"]))
+        self.NEGATE = frozenset(word for word, _ in self._items(tables["negate"]))
+        self.SPECIAL_CASE_IDIOMS: Dict[str, float] = dict(self._items(tables["idioms"]))
+        self.PUNC_LIST = frozenset(p for p, _ in self._items(tables["punctuation"]))
+
+    @classmethod
+    def open(cls, path: str = DEFAULT_INDEX_PATH) -> "VaderIndex":
+        """Memory-map the index at `path` (read-only, shared between processes)."""
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, path)
+
+    @property
+    def lexicon_version(self) -> str:
+        """Same short hash `SentimentScorer` derives from the lexicon text."""
+        return self.lexicon_sha1[:12]
+
+    @property
+    def analyzer_version(self) -> str:
+        """Index format and scoring implementation, e.g. `index-1.1`."""
+        return f"index-{FORMAT_VERSION}.{IMPLEMENTATION_VERSION}"
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def _items(self, table):
+        values, offsets, _, blob_start = table
+        buffer = self._buffer
+        for i in range(len(values)):
+            key = buffer[blob_start + offsets[i]:blob_start + offsets[i + 1]]
+            yield bytes(key).decode("utf-8"), values[i]
+
+    def get(self, word: str) -> Optional[float]:
+        """Lexicon valence of `word` (already lower-cased), or None."""
+        key = word.encode("utf-8", "surrogatepass")
+        slots, offsets, buffer, start = self._slots, self._offsets, self._buffer, self._blob_start
+        slot = crc32(key) & self._mask
+        while True:
+            i = slots[slot]
+            if i == _EMPTY_SLOT:
+                return None
+            if buffer[start + offsets[i]:start + offsets[i + 1]] == key:
+                return self._values[i]
+            slot = (slot + 1) & self._mask
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    # -- NLTK's VADER, reading from the index ---------------------------------
+
+    def _words_and_emoticons(self, text: str) -> list:
+        """`SentiText._words_and_emoticons` without building the word x punctuation product.
+
+        NLTK maps a token to `word` when it is `p + word` or `word + p` for a
+        `p` in PUNC_LIST and a `word` of the punctuation-free text. Words hold
+        no punctuation, so `p` can only be the token's whole leading (or
+        trailing) punctuation run, which is checked directly.
+        """
+        wes = [we for we in text.split() if len(we) > 1]
+        words_only = None
+        punc_list = self.PUNC_LIST
+        for i, we in enumerate(wes):
+            if we[0] not in _PUNCTUATION and we[-1] not in _PUNCTUATION:
+                continue
+            if words_only is None:
+                no_punc_text = text.translate(_REMOVE_PUNCTUATION)
+                words_only = {w for w in no_punc_text.split() if len(w) > 1}
+            rest = we.lstrip(_PUNCTUATION)
+            if we[:len(we) - len(rest)] in punc_list and rest in words_only:
+                wes[i] = rest
+                continue
+            rest = we.rstrip(_PUNCTUATION)
+            if we[len(rest):] in punc_list and rest in words_only:
+                wes[i] = rest
+        return wes
+
+    def _negated(self, word: str) -> bool:
+        word = word.lower()
+        return word in self.NEGATE or "n't" in word
+
+    def _scalar_inc_dec(self, word: str, valence: float, is_cap_diff: bool) -> float:
+        scalar = 0.0
+        word_lower = word.lower()
+        if word_lower in self.BOOSTER_DICT:
+            scalar = self.BOOSTER_DICT[word_lower]
+            if valence < 0:
+                scalar *= -1
+            if word.isupper() and is_cap_diff:
+                if valence > 0:
+                    scalar += self.C_INCR
+                else:
+                    scalar -= self.C_INCR
+        return scalar
+
+    def polarity_scores(self, text) -> dict:
+        """Same contract and output as `SentimentIntensityAnalyzer.polarity_scores`."""
+        raw_text = text
+        if not isinstance(text, str):
+            text = str(text.encode("utf-8"))
+        words = self._words_and_emoticons(text)
+        allcap_words = sum(1 for word in words if word.isupper())
+        is_cap_diff = 0 < len(words) - allcap_words < len(words)
+        lower = [word.lower() for word in words]
+        # Lexicon lookups, one per distinct lower-cased token
+        valences = {word: self.get(word) for word in set(lower)}
+
+        first_index = {}
+        for idx, token in enumerate(words):
+            if token not in first_index:
+                first_index[token] = idx
+
+        sentiments = []
+        for item in words:
+            i = first_index[item]
+            if (i < len(words) - 1 and lower[i] == "kind" and lower[i + 1] == "of") \
+                    or lower[i] in self.BOOSTER_DICT:
+                sentiments.append(0)
+                continue
+            sentiments.append(self._sentiment_valence(words, lower, valences, is_cap_diff, item, i))
+
+        if "but" in valences:
+            bi = lower.index("but")
+            for sidx, sentiment in enumerate(sentiments):
+                if sidx < bi:
+                    sentiments[sidx] = sentiment * 0.5
+                elif sidx > bi:
+                    sentiments[sidx] = sentiment * 1.5
+
+        return self._score_valence(sentiments, raw_text)
+
+    def _sentiment_valence(self, words, lower, valences, is_cap_diff, item, i):
+        valence = valences[lower[i]]
+        if valence is None:
+            return 0
+
+        if item.isupper() and is_cap_diff:
+            if valence > 0:
+                valence += self.C_INCR
+            else:
+                valence -= self.C_INCR
+
+        for start_i in range(0, 3):
+            if i > start_i and valences[lower[i - (start_i + 1)]] is None:
+                s = self._scalar_inc_dec(words[i - (start_i + 1)], valence, is_cap_diff)
+                if start_i == 1 and s != 0:
+                    s = s * 0.95
+                if start_i == 2 and s != 0:
+                    s = s * 0.9
+                valence = valence + s
+                valence = self._never_check(valence, words, start_i, i)
+                if start_i == 2:
+                    valence = self._idioms_check(valence, words, i)
+
+        # negation case using "least"
+        if i > 1 and valences[lower[i - 1]] is None and lower[i - 1] == "least":
+            if lower[i - 2] != "at" and lower[i - 2] != "very":
+                valence = valence * self.N_SCALAR
+        elif i > 0 and valences[lower[i - 1]] is None and lower[i - 1] == "least":
+            valence = valence * self.N_SCALAR
+        return valence
+
+    def _never_check(self, valence, words, start_i, i):
+        if start_i == 0:
+            if self._negated(words[i - 1]):
+                valence = valence * self.N_SCALAR
+        if start_i == 1:
+            if words[i - 2] == "never" and (words[i - 1] == "so" or words[i - 1] == "this"):
+                valence = valence * 1.5
+            elif self._negated(words[i - (start_i + 1)]):
+                valence = valence * self.N_SCALAR
+        if start_i == 2:
+            if (
+                words[i - 3] == "never" and (words[i - 2] == "so" or words[i - 2] == "this")
+                or (words[i - 1] == "so" or words[i - 1] == "this")
+            ):
+                valence = valence * 1.25
+            elif self._negated(words[i - (start_i + 1)]):
+                valence = valence * self.N_SCALAR
+        return valence
+
+    def _idioms_check(self, valence, words, i):
+        # Negative indices wrap around exactly as they do in NLTK
+        idioms = self.SPECIAL_CASE_IDIOMS
+        onezero = f"{words[i - 1]} {words[i]}"
+        twoonezero = f"{words[i - 2]} {words[i - 1]} {words[i]}"
+        twoone = f"{words[i - 2]} {words[i - 1]}"
+        threetwoone = f"{words[i - 3]} {words[i - 2]} {words[i - 1]}"
+        threetwo = f"{words[i - 3]} {words[i - 2]}"
+
+        for seq in (onezero, twoonezero, twoone, threetwoone, threetwo):
+            if seq in idioms:
+                valence = idioms[seq]
+                break
+
+        if len(words) - 1 > i:
+            zeroone = f"{words[i]} {words[i + 1]}"
+            if zeroone in idioms:
+                valence = idioms[zeroone]
+        if len(words) - 1 > i + 1:
+            zeroonetwo = f"{words[i]} {words[i + 1]} {words[i + 2]}"
+            if zeroonetwo in idioms:
+                valence = idioms[zeroonetwo]
+
+        # booster/dampener bi-grams such as 'sort of' or 'kind of'
+        if threetwo in self.BOOSTER_DICT or twoone in self.BOOSTER_DICT:
+            valence = valence + self.B_DECR
+        return valence
+
+    @staticmethod
+    def _score_valence(sentiments, text) -> dict:
+        if sentiments:
+            sum_s = float(sum(sentiments))
+            # emphasis from exclamation points (up to 4) and question marks (2 or 3+)
+            ep_amplifier = min(text.count("!"), 4) * 0.292
+            qm_count = text.count("?")
+            qm_amplifier = 0
+            if qm_count > 1:
+                qm_amplifier = qm_count * 0.18 if qm_count <= 3 else 0.96
+            punct_emph_amplifier = ep_amplifier + qm_amplifier
+            if sum_s > 0:
+                sum_s += punct_emph_amplifier
+            elif sum_s < 0:
+                sum_s -= punct_emph_amplifier
+
+            compound = sum_s / math.sqrt((sum_s * sum_s) + 15)
+
+            pos_sum = 0.0
+            neg_sum = 0.0
+            neu_count = 0
+            for sentiment_score in sentiments:
+                if sentiment_score > 0:
+                    pos_sum += float(sentiment_score) + 1
+                if sentiment_score < 0:
+                    neg_sum += float(sentiment_score) - 1
+                if sentiment_score == 0:
+                    neu_count += 1
+
+            if pos_sum > math.fabs(neg_sum):
+                pos_sum += punct_emph_amplifier
+            elif pos_sum < math.fabs(neg_sum):
+                neg_sum -= punct_emph_amplifier
+
+            total = pos_sum + math.fabs(neg_sum) + neu_count
+            pos = math.fabs(pos_sum / total)
+            neg = math.fabs(neg_sum / total)
+            neu = math.fabs(neu_count / total)
+        else:
+            compound = 0.0
+            pos = 0.0
+            neg = 0.0
+            neu = 0.0
+
+        return {
+            "neg": round(neg, 3),
+            "neu": round(neu, 3),
+            "pos": round(pos, 3),
+            "compound": round(compound, 4),
+        }
+
+
+_REMOVE_PUNCTUATION = str.maketrans("", "", _PUNCTUATION)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or check the compiled VADER lexicon index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="compile the lexicon NLTK would load into an index file")
+    build.add_argument("--output", default=os.getenv(INDEX_ENV) or DEFAULT_INDEX_PATH)
+    build.add_argument("--lexicon", default=None, help="nltk.data URL of the lexicon (default: resolve_lexicon())")
+    check = subparsers.add_parser("check", help="verify an index against the lexicon NLTK would load")
+    check.add_argument("--index", default=os.getenv(INDEX_ENV) or DEFAULT_INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        path = build_index(args.output, args.lexicon)
+        index = VaderIndex.open(path)
+        print(f"Wrote {len(index)} lexicon entries ({os.path.getsize(path):,} bytes, "
+              f"lexicon {index.lexicon_version}) to {path}")
+    else:
+        import hashlib
+
+        from nltk.sentiment import SentimentIntensityAnalyzer
+
+        index = VaderIndex.open(args.index)
+        analyzer = SentimentIntensityAnalyzer(lexicon_file=resolve_lexicon())
+        current = hashlib.sha1(analyzer.lexicon_file.encode("utf-8")).hexdigest()
+        if index.lexicon_sha1 != current:
+            print(f"{args.index} is stale: built from lexicon {index.lexicon_version}, "
+                  f"current lexicon is {current[:12]}; rerun `build`")
+            raise SystemExit(1)
+        print(f"{args.index} is up to date (lexicon {index.lexicon_version}, {len(index)} entries)")
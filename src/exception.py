@@ -6,6 +6,7 @@ def error_message_Details(error, error_detail:sys):
     error_message = "Error occurred in script: [{0}] at line number: [{1}] error message: [{2}]".format(
         file_name , exc_tb.tb_lineno, str(error)
     ) 
+    return error_message
 
 class CustomException(Exception):
     def __init__(self, error_message, error_detail:sys):
@@ -5,13 +5,21 @@ from datetime import datetime
 
 LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
 logs_dir = os.path.join(os.getcwd(), "logs")
-os.makedirs(logs_dir, exist_ok=True)
 LOG_FILE_PATH = os.path.join(logs_dir, LOG_FILE)
 
+
+class _DelayedFileHandler(logging.FileHandler):
+    """Creates `logs/` and the log file on the first record, so importing is free."""
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+
 logging.basicConfig(
-    filename=LOG_FILE_PATH,
+    handlers=[_DelayedFileHandler(LOG_FILE_PATH, delay=True)],
     format="[ %(asctime)s ] %(lineno)d %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO,
 
 
-)
\ No newline at end of file
+)
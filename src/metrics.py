@@ -0,0 +1,357 @@
+"""
+Structured instrumentation for the pipeline stages.
+
+- `track_stage("transform")` wraps one stage run. It yields a `StageMetrics`
+  on which the stage sets `rows_in` / `rows_out`. On exit the record is
+  filled in: wall and CPU seconds, rows/s, peak RSS, and the HTTP requests
+  and DB round-trips made during the stage. The record is logged and
+  written to the metrics sink.
+- `inc()` / `observe()` update process-wide counters and latency
+  histograms (HTTP requests, DB round-trips, service requests).
+- The sink is `$METRICS_PATH`, or the `--metrics PATH` flag of the CLIs.
+  A `.jsonl` file gets one JSON line per stage, plus a counters snapshot
+  at exit. A `.prom` file gets the Prometheus text format, which suits
+  node_exporter's textfile collector. `render_prometheus()` serves the
+  same text from the scoring service.
+- `--profile [cprofile|pyinstrument]` on the CLIs runs the command under a
+  profiler (see `profiled`). The report lists the hot text functions first
+  and is written to `artifacts/profiles/`.
+
+Only the standard library is imported, so every module can afford this.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+from src.logger import logging
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+METRICS_ENV = "METRICS_PATH"
+PROFILE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'artifacts', 'profiles'))
+PROFILERS = ("cprofile", "pyinstrument")
+# Reported first in --profile output
+HOT_FUNCTIONS = ("clean_text_pipeline", "analyze_sentiment_vader", "score_batch", "polarity_scores")
+
+# Latency histogram bucket bounds (seconds)
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe counters and latency histograms, keyed by name and labels."""
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        # name -> labels -> [count per bucket..., +Inf count, sum]
+        self._histograms: Dict[str, Dict[_LabelKey, list]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            values = series.setdefault(key, [0] * (len(BUCKETS) + 1) + [0.0])
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+                    break
+            else:
+                values[len(BUCKETS)] += 1
+            values[-1] += seconds
+
+    def total(self, name: str) -> float:
+        """Sum of a counter (or a histogram's observation count) over all labels."""
+        with self._lock:
+            if name in self._counters:
+                return sum(self._counters[name].values())
+            return sum(sum(values[:-1]) for values in self._histograms.get(name, {}).values())
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                        for name, series in self._counters.items()}
+            histograms = {
+                name: [{"labels": dict(key), "count": sum(values[:-1]), "sum": round(values[-1], 6)}
+                       for key, values in series.items()]
+                for name, series in self._histograms.items()
+            }
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self, prefix: str = "sentiment_") -> str:
+        """The registry in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {prefix}{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{prefix}{name}{_labels(key)} {_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {prefix}{name} histogram")
+                for key, values in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS + (float("inf"),), values[:-1]):
+                        cumulative += count
+                        le = "+Inf" if bound == float("inf") else _number(bound)
+                        lines.append(f"{prefix}{name}_bucket{_labels(key + (('le', le),))} {cumulative}")
+                    lines.append(f"{prefix}{name}_sum{_labels(key)} {_number(values[-1])}")
+                    lines.append(f"{prefix}{name}_count{_labels(key)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _labels(key: _LabelKey) -> str:
+    if not key:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in key)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + "}"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+registry = MetricsRegistry()
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """Add to a process-wide counter, e.g. `inc("db_roundtrips_total", op="upsert")`."""
+    registry.inc(name, value, **labels)
+
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Record one latency in a process-wide histogram."""
+    registry.observe(name, seconds, **labels)
+
+
+@contextmanager
+def timed(name: str, **labels) -> Iterator[None]:
+    """`observe(name, <duration of the block>, **labels)`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, **labels)
+
+
+def render_prometheus() -> str:
+    return registry.render_prometheus()
+
+
+# -- per-stage records ------------------------------------------------------------
+
+@dataclass
+class StageMetrics:
+    stage: str
+    rows_in: int = 0
+    rows_out: int = 0
+    labels: Dict[str, object] = field(default_factory=dict)
+    status: str = "ok"
+    wall_seconds: float = 0.0
+    # CPU of this process (all threads) plus worker processes reaped during the stage
+    cpu_seconds: float = 0.0
+    rows_per_sec: float = 0.0
+    # High-water mark of the process (and of its largest worker) at the end of the stage
+    peak_rss_mb: Optional[float] = None
+    child_peak_rss_mb: Optional[float] = None
+    http_requests: int = 0
+    db_roundtrips: int = 0
+
+    @property
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _cpu_seconds() -> float:
+    cpu = time.process_time()
+    if resource is not None:
+        usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu += usage.ru_utime + usage.ru_stime
+    return cpu
+
+
+def _peak_rss_mb(who) -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+@contextmanager
+def track_stage(stage: str, **labels) -> Iterator[StageMetrics]:
+    """Measure one stage run; set `rows_in` / `rows_out` on the yielded record.
+
+    Counters are process-wide, so HTTP/DB counts and CPU time include any
+    stage running concurrently in another thread.
+    """
+    metrics = StageMetrics(stage, labels=labels)
+    http_before, db_before = registry.total("http_requests_total"), registry.total("db_roundtrips_total")
+    cpu_before, start = _cpu_seconds(), time.perf_counter()
+    try:
+        yield metrics
+    except BaseException:
+        metrics.status = "error"
+        raise
+    finally:
+        metrics.wall_seconds = round(time.perf_counter() - start, 6)
+        metrics.cpu_seconds = round(_cpu_seconds() - cpu_before, 6)
+        rows = metrics.rows_in or metrics.rows_out
+        metrics.rows_per_sec = round(rows / metrics.wall_seconds, 3) if metrics.wall_seconds > 0 else 0.0
+        if resource is not None:
+            metrics.peak_rss_mb = _peak_rss_mb(resource.RUSAGE_SELF)
+            metrics.child_peak_rss_mb = _peak_rss_mb(resource.RUSAGE_CHILDREN) or None
+        metrics.http_requests = int(registry.total("http_requests_total") - http_before)
+        metrics.db_roundtrips = int(registry.total("db_roundtrips_total") - db_before)
+
+        registry.inc("stage_runs_total", stage=stage, status=metrics.status)
+        registry.inc("stage_rows_total", metrics.rows_in, stage=stage, direction="in")
+        registry.inc("stage_rows_total", metrics.rows_out, stage=stage, direction="out")
+        registry.inc("stage_cpu_seconds_total", metrics.cpu_seconds, stage=stage)
+        registry.observe("stage_seconds", metrics.wall_seconds, stage=stage)
+        emit("stage", metrics.as_dict)
+
+
+# -- sink -------------------------------------------------------------------------
+
+_sink_path: Optional[str] = None
+_sink_lock = threading.Lock()
+
+
+def configure(path: Optional[str]) -> None:
+    """Send metrics to `path`: `.prom` for Prometheus text, anything else for JSON lines."""
+    global _sink_path
+    first = _sink_path is None
+    _sink_path = os.path.abspath(path) if path else None
+    if _sink_path and first:
+        atexit.register(flush)
+
+
+def _sink() -> Optional[str]:
+    if _sink_path is None and os.getenv(METRICS_ENV):
+        configure(os.getenv(METRICS_ENV))
+    return _sink_path
+
+
+def emit(kind: str, record: dict) -> None:
+    """Log a record and append it to the JSON-lines sink (if one is configured)."""
+    record = {"type": kind, "ts": datetime.now(timezone.utc).isoformat(), "host": socket.gethostname(),
+              "pid": os.getpid(), **record}
+    line = json.dumps(record, default=str)
+    logging.info(f"metrics {line}")
+    path = _sink()
+    if path and not path.endswith(".prom"):
+        with _sink_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def flush() -> None:
+    """Write the counters: a snapshot line (JSON lines) or the whole exposition (`.prom`)."""
+    path = _sink()
+    if not path:
+        return
+    if path.endswith(".prom"):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render_prometheus())
+        os.replace(tmp_path, path)
+    else:
+        emit("counters", registry.snapshot())
+
+
+# -- CLI helpers --------------------------------------------------------------------
+
+def add_cli_arguments(parser) -> None:
+    """Add `--metrics PATH` and `--profile [cprofile|pyinstrument]` to an argparse parser."""
+    parser.add_argument("--metrics", default=None, metavar="PATH",
+                        help=f"write stage metrics as JSON lines (or Prometheus text for *.prom); default ${METRICS_ENV}")
+    parser.add_argument("--profile", nargs="?", const="cprofile", choices=PROFILERS, default=None,
+                        help="profile the run and write a report to artifacts/profiles/")
+
+
+def configure_from_args(args) -> None:
+    if getattr(args, "metrics", None):
+        configure(args.metrics)
+
+
+@contextmanager
+def profiled(name: str, profiler: Optional[str] = None, out_dir: str = PROFILE_DIR) -> Iterator[None]:
+    """Run the block under cProfile or pyinstrument (no-op when `profiler` is None).
+
+    Profilers only see the calling thread; work in worker processes is not
+    included, so profile with `--n-jobs 1`.
+    """
+    if profiler is None:
+        yield
+        return
+    if profiler not in PROFILERS:
+        raise ValueError(f"Unknown profiler '{profiler}'; choose one of {PROFILERS}")
+    os.makedirs(out_dir, exist_ok=True)
+    stem = os.path.join(out_dir, f"{name}-{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+    if profiler == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("--profile pyinstrument needs `pip install pyinstrument`") from None
+        profile = Profiler()
+        profile.start()
+        try:
+            yield
+        finally:
+            profile.stop()
+            with open(stem + ".html", "w", encoding="utf-8") as f:
+                f.write(profile.output_html())
+            with open(stem + ".txt", "w", encoding="utf-8") as f:
+                f.write(profile.output_text(unicode=False, color=False))
+            print(f"Profile written to {stem}.html / .txt")
+        return
+
+    import cProfile
+    import io
+    import pstats
+
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        profile.dump_stats(stem + ".prof")
+        out = io.StringIO()
+        stats = pstats.Stats(profile, stream=out).sort_stats("cumulative")
+        out.write("Hot functions\n")
+        stats.print_stats("|".join(HOT_FUNCTIONS))
+        out.write("Top 30 by cumulative time\n")
+        stats.print_stats(30)
+        with open(stem + ".txt", "w", encoding="utf-8") as f:
+            f.write(out.getvalue())
+        print(f"Profile written to {stem}.prof (open with snakeviz or pstats) and {stem}.txt")
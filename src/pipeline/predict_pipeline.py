@@ -2,15 +2,38 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Iterable, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
-from src.components.data_transformation import (
-    analyze_sentiment_vader,
-    clean_text_pipeline,
-    get_sentiment_label,
+from src import metrics
+from src.components.artifact_store import (
+    EXTENSIONS,
+    ArtifactWriter,
+    artifact_format,
+    iter_artifact,
+    read_artifact,
+    write_artifact,
 )
+from src.components.data_transformation import clean_and_score, clean_text_pipeline, get_result_cache
+from src.components.result_cache import ResultCache
+from src.components.sentiment_model import get_sentiment_model
+
+ENGINES = ("vader", "model")
+
+# Column order of the sentiment block appended to every prediction frame.
+SENTIMENT_COLUMNS = [
+    "sentiment_neg",
+    "sentiment_neu",
+    "sentiment_pos",
+    "sentiment_compound",
+    "sentiment_label",
+]
+
+# Decimal places VADER rounds its scores to. Scores are stored as float32, so
+# `score_texts` rounds them back rather than returning 0.12300000339746475.
+SCORE_DECIMALS = {"sentiment_neg": 3, "sentiment_neu": 3, "sentiment_pos": 3, "sentiment_compound": 4}
 
 
 @dataclass
@@ -29,6 +52,14 @@ class PredictionSummary:
             "negative": self.negative,
         }
 
+    def __add__(self, other: "PredictionSummary") -> "PredictionSummary":
+        return PredictionSummary(
+            total=self.total + other.total,
+            positive=self.positive + other.positive,
+            neutral=self.neutral + other.neutral,
+            negative=self.negative + other.negative,
+        )
+
 
 def _ensure_text_column(df: pd.DataFrame, text_column: str) -> None:
     if text_column not in df.columns:
@@ -38,53 +69,193 @@ def _ensure_text_column(df: pd.DataFrame, text_column: str) -> None:
         )
 
 
-def _clean_reviews(df: pd.DataFrame, text_column: str) -> pd.Series:
-    return (
-        df[text_column]
-        .astype(str)
-        .fillna("")
-        .apply(lambda text: clean_text_pipeline(text, keep_simple_html=False))
-    )
-
-
-def _extract_sentiment(cleaned_text: pd.Series) -> pd.DataFrame:
-    scores = cleaned_text.apply(analyze_sentiment_vader)
-    sentiment_df = pd.DataFrame(scores.tolist(), index=cleaned_text.index)
-    sentiment_df["sentiment_label"] = sentiment_df["compound"].apply(get_sentiment_label)
-    return sentiment_df.rename(
-        columns={
-            "compound": "sentiment_compound",
-            "pos": "sentiment_pos",
-            "neu": "sentiment_neu",
-            "neg": "sentiment_neg",
-        }
-    )
+def _raw_reviews(df: pd.DataFrame, text_column: str) -> List[str]:
+    return df[text_column].astype(str).fillna("").tolist()
 
 
 def predict_from_dataframe(
-    df: pd.DataFrame, text_column: str = "review_text"
+    df: pd.DataFrame,
+    text_column: str = "review_text",
+    n_jobs: int = 1,
+    chunksize: int = 1000,
+    cache: Optional[ResultCache] = None,
+    engine: str = "vader",
+    model_path: Optional[str] = None,
 ) -> pd.DataFrame:
-    """Return dataframe enriched with cleaned text + sentiment scores."""
+    """Return dataframe enriched with cleaned text + sentiment scores.
+
+    `n_jobs > 1` (or -1 for all cores) shards the text column across a process
+    pool in chunks of `chunksize`; the output is identical to the serial path.
+    Pass a `cache` (e.g. `get_result_cache()`) to reuse results for reviews
+    that were already scored.
+
+    `engine="model"` labels the reviews with the trained TF-IDF classifier
+    (`model_path`, default: latest under `artifacts/models/`) instead of
+    VADER, adding one `sentiment_proba_<label>` column per class.
+    """
     if df.empty:
         raise ValueError("Received an empty dataframe. Provide at least one row to score.")
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}")
 
     _ensure_text_column(df, text_column)
+    if engine == "model":
+        return _predict_with_model(df, text_column, model_path)
+    cleaned, sentiment = clean_and_score(
+        _raw_reviews(df, text_column), n_jobs=n_jobs, chunksize=chunksize, cache=cache
+    )
+    result = df.copy()
+    result["cleaned_text"] = cleaned
+    columns = sentiment.as_columns()
+    for column in SENTIMENT_COLUMNS:
+        result[column] = columns[column]
+    return result
+
+
+def _predict_with_model(df: pd.DataFrame, text_column: str, model_path: Optional[str]) -> pd.DataFrame:
+    model = get_sentiment_model(model_path)
+    cleaned = [clean_text_pipeline(text) for text in _raw_reviews(df, text_column)]
+    labels, proba = model.predict_batch(cleaned)
     result = df.copy()
-    result["cleaned_text"] = _clean_reviews(result, text_column)
-    sentiment = _extract_sentiment(result["cleaned_text"])
-    return pd.concat([result, sentiment], axis=1)
+    result["cleaned_text"] = cleaned
+    result["sentiment_label"] = labels
+    if proba is not None:
+        for i, label in enumerate(model.classes):
+            result[f"sentiment_proba_{label}"] = proba[:, i]
+    return result
+
+
+def score_texts(
+    texts: Sequence[str],
+    cache: Optional[ResultCache] = None,
+    engine: str = "vader",
+    model_path: Optional[str] = None,
+) -> List[dict]:
+    """Score raw review texts and return one plain dict per text (no DataFrame).
+
+    Each dict holds `cleaned_text`, `sentiment_label` and either the VADER
+    `sentiment_*` scores or, with `engine="model"`, one `sentiment_proba_<label>`
+    per class; the values match `predict_from_dataframe`, with the VADER
+    scores rounded back to VADER's precision (`SCORE_DECIMALS`).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine '{engine}'. Choose one of: {', '.join(ENGINES)}")
+    texts = ["" if text is None else str(text) for text in texts]
+    if not texts:
+        return []
+
+    if engine == "model":
+        model = get_sentiment_model(model_path)
+        cleaned = [clean_text_pipeline(text) for text in texts]
+        labels, proba = model.predict_batch(cleaned)
+        results = [{"cleaned_text": text, "sentiment_label": str(label)} for text, label in zip(cleaned, labels)]
+        if proba is not None:
+            for i, label in enumerate(model.classes):
+                for result, p in zip(results, proba[:, i].tolist()):
+                    result[f"sentiment_proba_{label}"] = p
+        return results
+
+    cleaned, sentiment = clean_and_score(texts, cache=cache)
+    columns = {
+        column: values.tolist() if column == "sentiment_label"
+        else np.round(values.astype(np.float64), SCORE_DECIMALS[column]).tolist()
+        for column, values in sentiment.as_columns().items()
+    }
+    return [
+        {"cleaned_text": text, **{column: columns[column][i] for column in SENTIMENT_COLUMNS}}
+        for i, text in enumerate(cleaned)
+    ]
 
 
 def predict_from_csv(
     csv_path: Path | str,
     text_column: str = "review_text",
+    n_jobs: int = 1,
+    chunksize: int = 1000,
+    cache: Optional[ResultCache] = None,
+    engine: str = "vader",
+    model_path: Optional[str] = None,
 ) -> pd.DataFrame:
     csv_path = Path(csv_path)
     if not csv_path.exists():
-        raise FileNotFoundError(f"Could not find CSV at {csv_path}")
+        raise FileNotFoundError(f"Could not find input file at {csv_path}")
 
-    df = pd.read_csv(csv_path)
-    return predict_from_dataframe(df, text_column=text_column)
+    with metrics.track_stage("predict", engine=engine) as stage:
+        df = read_table(csv_path)
+        stage.rows_in = len(df)
+        predictions = predict_from_dataframe(
+            df, text_column=text_column, n_jobs=n_jobs, chunksize=chunksize, cache=cache,
+            engine=engine, model_path=model_path,
+        )
+        stage.rows_out = len(predictions)
+    return predictions
+
+
+def predict_from_csv_streaming(
+    csv_path: Path | str,
+    output_path: Optional[Path | str] = None,
+    text_column: str = "review_text",
+    batch_rows: int = 50_000,
+    n_jobs: int = 1,
+    chunksize: int = 1000,
+    cache: Optional[ResultCache] = None,
+    engine: str = "vader",
+    model_path: Optional[str] = None,
+) -> PredictionSummary:
+    """Score a file `batch_rows` rows at a time, appending each scored batch to `output_path`.
+
+    Only one batch is held in memory, so the input can be far larger than RAM.
+    Returns the running `PredictionSummary` over all rows; the rows written are
+    the same as `predict_from_csv` would return.
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        raise FileNotFoundError(f"Could not find input file at {csv_path}")
+
+    summary = PredictionSummary(total=0, positive=0, neutral=0, negative=0)
+    writer = (
+        ArtifactWriter(str(output_path), fmt=_table_format(output_path)) if output_path is not None else None
+    )
+    with metrics.track_stage("predict", engine=engine, streaming=True) as stage:
+        try:
+            for batch in iter_artifact(str(csv_path), batch_rows=batch_rows, fmt=_table_format(csv_path)):
+                if batch.empty:
+                    continue
+                predictions = predict_from_dataframe(
+                    batch, text_column=text_column, n_jobs=n_jobs, chunksize=chunksize, cache=cache,
+                    engine=engine, model_path=model_path,
+                )
+                summary += summarize_predictions(predictions)
+                if writer is not None:
+                    writer.write(predictions)
+        finally:
+            if writer is not None:
+                writer.close()
+            stage.rows_in = stage.rows_out = summary.total
+
+    if summary.total == 0:
+        raise ValueError("Received an empty dataframe. Provide at least one row to score.")
+    return summary
+
+
+def _table_format(path: Path | str) -> str:
+    # Parquet/Feather by extension; anything else is treated as CSV
+    return artifact_format(str(path)) if Path(path).suffix.lower() in EXTENSIONS.values() else "csv"
+
+
+def read_table(path: Path | str) -> pd.DataFrame:
+    """Read a CSV, or a Parquet/Feather artifact when the extension says so."""
+    if _table_format(path) != "csv":
+        return read_artifact(str(path))
+    return pd.read_csv(path)
+
+
+def write_table(df: pd.DataFrame, path: Path | str) -> None:
+    """Write CSV, or Parquet/Feather when the extension says so."""
+    if _table_format(path) != "csv":
+        write_artifact(df, str(path))
+    else:
+        df.to_csv(path, index=False)
 
 
 def summarize_predictions(df: pd.DataFrame) -> PredictionSummary:
@@ -100,8 +271,8 @@ def summarize_predictions(df: pd.DataFrame) -> PredictionSummary:
 if __name__ == "__main__":
     import argparse
 
-    parser = argparse.ArgumentParser(description="Run sentiment predictions on a CSV file.")
-    parser.add_argument("csv_path", type=str, help="Path to CSV containing a review_text column.")
+    parser = argparse.ArgumentParser(description="Run sentiment predictions on a CSV (or Parquet/Feather) file.")
+    parser.add_argument("csv_path", type=str, help="Path to CSV/Parquet/Feather data containing a review_text column.")
     parser.add_argument(
         "--text-column",
         default="review_text",
@@ -111,15 +282,83 @@ if __name__ == "__main__":
         "--output",
         type=str,
         default=None,
-        help="Optional path to write predictions as CSV.",
+        help="Optional path to write predictions (.csv, .parquet or .feather).",
+    )
+
+    parser.add_argument(
+        "--n-jobs",
+        type=int,
+        default=1,
+        help="Worker processes for cleaning + scoring (-1 uses all cores).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=1000,
+        help="Reviews per worker task when --n-jobs > 1.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="vader",
+        help="vader (rule-based, default) or model (trained TF-IDF classifier).",
+    )
+    parser.add_argument(
+        "--model-path",
+        type=str,
+        default=None,
+        help="Model artifact or directory for --engine model (default: latest in artifacts/models).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read, score and write the input in batches of --batch-rows rows (bounded memory).",
+    )
+    parser.add_argument(
+        "--batch-rows",
+        type=int,
+        default=50_000,
+        help="Rows read and scored per batch with --stream.",
+    )
+    parser.add_argument(
+        "--cache-path",
+        type=str,
+        default=None,
+        help="Optional SQLite file for an on-disk result cache reused across runs.",
     )
+    metrics.add_cli_arguments(parser)
 
     args = parser.parse_args()
-    predictions = predict_from_csv(args.csv_path, text_column=args.text_column)
-    summary = summarize_predictions(predictions)
+    metrics.configure_from_args(args)
+    cache = get_result_cache(args.cache_path)
+    with metrics.profiled("predict", args.profile):
+        if args.stream:
+            summary = predict_from_csv_streaming(
+                args.csv_path,
+                output_path=args.output,
+                text_column=args.text_column,
+                batch_rows=args.batch_rows,
+                n_jobs=args.n_jobs,
+                chunksize=args.chunksize,
+                cache=cache,
+                engine=args.engine,
+                model_path=args.model_path,
+            )
+        else:
+            predictions = predict_from_csv(
+                args.csv_path,
+                text_column=args.text_column,
+                n_jobs=args.n_jobs,
+                chunksize=args.chunksize,
+                cache=cache,
+                engine=args.engine,
+                model_path=args.model_path,
+            )
+            summary = summarize_predictions(predictions)
+            if args.output:
+                write_table(predictions, args.output)
     print("Prediction summary:", summary.as_dict)
+    print("Result cache:", cache.stats.as_dict)
 
     if args.output:
-        output_path = Path(args.output)
-        predictions.to_csv(output_path, index=False)
-        print(f"Wrote predictions to {output_path.resolve()}")
+        print(f"Wrote predictions to {Path(args.output).resolve()}")
@@ -0,0 +1,424 @@
+"""
+Lightweight HTTP scoring service in front of `predict_pipeline.score_texts`.
+
+A plain WSGI app (standard library only) with:
+
+    POST /score         {"text": "..."}          -> {"cleaned_text": ..., "sentiment_label": ..., ...}
+    POST /score_batch   {"texts": ["...", ...]}  -> {"results": [...]}
+    GET  /metrics       request counts, latency percentiles and batching stats
+    GET  /metrics/prometheus   the same counters (and latency histograms) as Prometheus text
+    GET  /health        engine / model info once the scorer is warm
+
+The scorer (VADER lexicon or the trained model) is loaded when the service is
+created, not on the first request. Concurrent requests are micro-batched: a
+worker thread collects requests for up to `max_wait_ms` (or until
+`max_batch_size` texts are queued) and scores them in one `score_texts` call.
+
+    python -m src.pipeline.scoring_service --port 8000 [--engine model]
+
+`ScoringClient(service)` calls the app in-process, without a socket.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from socketserver import ThreadingMixIn
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+import numpy as np
+
+from src.components.data_transformation import get_result_cache
+from src.components.sentiment_model import get_sentiment_model
+from src.components.sentiment_scorer import warm_up_scorer
+from src.exception import CustomException
+from src.logger import logging
+from src.metrics import registry
+from src.pipeline.predict_pipeline import ENGINES, score_texts
+from src.utils import load_config
+
+
+@dataclass
+class ScoringServiceConfig:
+    host: str = "127.0.0.1"
+    port: int = 8000
+    engine: str = "vader"
+    model_path: Optional[str] = None
+    # Reuse cleaned text + scores for repeated reviews (in-memory LRU)
+    use_cache: bool = True
+    # Micro-batching: score once `max_batch_size` texts are queued or the
+    # oldest request has waited `max_wait_ms`, whichever comes first
+    max_batch_size: int = 64
+    max_wait_ms: float = 2.0
+    # Largest accepted /score_batch request and request body
+    max_texts_per_request: int = 1000
+    max_body_bytes: int = 16 * 1024 * 1024
+    # Latency samples kept per endpoint for the percentiles
+    latency_window: int = 10_000
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "ScoringServiceConfig":
+        """Build from the `scoring_service:` section of `config/config.yaml`."""
+        section = (load_config() if config is None else config).get("scoring_service") or {}
+        return cls(**{key: value for key, value in section.items() if key in cls.__dataclass_fields__})
+
+
+class ScoringError(Exception):
+    """A request the service rejected; `status` is the HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """Coalesces concurrent `submit` calls into batched calls to `score_fn`."""
+
+    def __init__(self, score_fn: Callable[[List[str]], List[dict]], max_batch_size: int, max_wait_ms: float):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.batched_texts = 0
+        self._queue: "queue.Queue[Optional[Tuple[List[str], Future]]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="scoring-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        future: Future = Future()
+        self._queue.put((list(texts), future))
+        return future
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            pending = [item]
+            size = len(item[0])
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while size < self.max_batch_size:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                pending.append(item)
+                size += len(item[0])
+            self._score(pending)
+            if stop:
+                return
+
+    def _score(self, pending: List[Tuple[List[str], Future]]) -> None:
+        texts = [text for request_texts, _ in pending for text in request_texts]
+        try:
+            results = self.score_fn(texts)
+        except Exception as e:
+            for _, future in pending:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.batched_texts += len(texts)
+        start = 0
+        for request_texts, future in pending:
+            future.set_result(results[start:start + len(request_texts)])
+            start += len(request_texts)
+
+
+class LatencyTracker:
+    """Per-endpoint request counts and a rolling window of latencies (ms)."""
+
+    def __init__(self, window: int):
+        self.window = window
+        self.samples: Dict[str, deque] = {}
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float, ok: bool) -> None:
+        with self._lock:
+            self.samples.setdefault(endpoint, deque(maxlen=self.window)).append(seconds * 1000.0)
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            samples = {endpoint: np.fromiter(values, dtype=np.float64) for endpoint, values in self.samples.items()}
+            counts, errors = dict(self.counts), dict(self.errors)
+        stats = {}
+        for endpoint, values in samples.items():
+            p50, p90, p99 = np.percentile(values, [50, 90, 99])
+            stats[endpoint] = {
+                "requests": counts[endpoint],
+                "errors": errors.get(endpoint, 0),
+                "latency_ms": {
+                    "p50": round(float(p50), 3),
+                    "p90": round(float(p90), 3),
+                    "p99": round(float(p99), 3),
+                    "max": round(float(values.max()), 3),
+                    "mean": round(float(values.mean()), 3),
+                },
+            }
+        return stats
+
+
+class ScoringService:
+    """WSGI app serving `/score`, `/score_batch`, `/metrics` and `/health`."""
+
+    def __init__(self, config: ScoringServiceConfig = None):
+        self.config = config or ScoringServiceConfig.from_config()
+        if self.config.engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{self.config.engine}'. Choose one of: {', '.join(ENGINES)}")
+
+        # Load everything up front so the first request is as fast as the rest
+        warm_up_scorer()
+        self.model = get_sentiment_model(self.config.model_path) if self.config.engine == "model" else None
+        self.cache = get_result_cache() if self.config.use_cache and self.config.engine == "vader" else None
+        self.latency = LatencyTracker(self.config.latency_window)
+        self.batcher = MicroBatcher(self._score, self.config.max_batch_size, self.config.max_wait_ms)
+        self.started_at = time.time()
+        self._routes = {
+            ("POST", "/score"): self._handle_score,
+            ("POST", "/score_batch"): self._handle_score_batch,
+            ("GET", "/metrics"): self._handle_metrics,
+            ("GET", "/metrics/prometheus"): self._handle_prometheus,
+            ("GET", "/health"): self._handle_health,
+        }
+        logging.info(f"Scoring service ready (engine={self.config.engine})")
+
+    def _score(self, texts: List[str]) -> List[dict]:
+        return score_texts(texts, cache=self.cache, engine=self.config.engine, model_path=self.config.model_path)
+
+    def score(self, text: str) -> dict:
+        return self.batcher.submit([text]).result()[0]
+
+    def score_batch(self, texts: Sequence[str]) -> List[dict]:
+        if len(texts) > self.config.max_texts_per_request:
+            raise ScoringError(413, f"At most {self.config.max_texts_per_request} texts per request")
+        return self.batcher.submit(texts).result() if texts else []
+
+    def metrics(self) -> dict:
+        batches = self.batcher.batches
+        return {
+            "engine": self.config.engine,
+            "uptime_s": round(time.time() - self.started_at, 3),
+            "endpoints": self.latency.snapshot(),
+            "batching": {
+                "batches": batches,
+                "texts": self.batcher.batched_texts,
+                "mean_batch_size": round(self.batcher.batched_texts / batches, 3) if batches else 0.0,
+                "max_batch_size": self.config.max_batch_size,
+                "max_wait_ms": self.config.max_wait_ms,
+            },
+            "cache": self.cache.stats.as_dict if self.cache is not None else None,
+        }
+
+    def prometheus(self) -> str:
+        """Service gauges plus the process-wide registry, in the Prometheus text format."""
+        batching = {"batches": self.batcher.batches, "batched_texts": self.batcher.batched_texts}
+        if self.cache is not None:
+            stats = self.cache.stats
+            batching.update(cache_hits=stats.hits, cache_misses=stats.misses)
+        lines = ["# TYPE sentiment_service_uptime_seconds gauge",
+                 f'sentiment_service_uptime_seconds{{engine="{self.config.engine}"}} '
+                 f"{round(time.time() - self.started_at, 3)}"]
+        for name, value in batching.items():
+            lines += [f"# TYPE sentiment_service_{name}_total counter", f"sentiment_service_{name}_total {value}"]
+        return "\n".join(lines) + "\n" + registry.render_prometheus()
+
+    def close(self) -> None:
+        self.batcher.close()
+
+    def __call__(self, environ, start_response):
+        method, path = environ.get("REQUEST_METHOD", "GET"), environ.get("PATH_INFO", "/")
+        start = time.perf_counter()
+        handler = self._routes.get((method, path))
+        try:
+            if handler is None:
+                allowed = [m for m, p in self._routes if p == path]
+                raise ScoringError(405 if allowed else 404, f"{method} {path} not supported")
+            status, body = 200, handler(environ)
+        except ScoringError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception as e:
+            logging.error(f"Scoring service error on {method} {path}: {e}")
+            status, body = 500, {"error": str(e)}
+        if handler is not None:
+            seconds = time.perf_counter() - start
+            self.latency.record(path, seconds, ok=status < 400)
+            registry.observe("service_request_seconds", seconds, endpoint=path)
+            registry.inc("service_requests_total", endpoint=path, status=status)
+
+        if isinstance(body, str):
+            payload, content_type = body.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            payload, content_type = json.dumps(body).encode("utf-8"), "application/json"
+        start_response(f"{status} {_REASONS.get(status, '')}".strip(), [
+            ("Content-Type", content_type),
+            ("Content-Length", str(len(payload))),
+        ])
+        return [payload]
+
+    def _read_json(self, environ) -> dict:
+        try:
+            length = int(environ.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            raise ScoringError(400, "Invalid Content-Length")
+        if length > self.config.max_body_bytes:
+            raise ScoringError(413, f"Request body larger than {self.config.max_body_bytes} bytes")
+        try:
+            body = json.loads(environ["wsgi.input"].read(length) or b"{}")
+        except (ValueError, UnicodeDecodeError):
+            raise ScoringError(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            raise ScoringError(400, "Request body must be a JSON object")
+        return body
+
+    def _handle_score(self, environ) -> dict:
+        text = self._read_json(environ).get("text")
+        if not isinstance(text, str):
+            raise ScoringError(400, 'Expected {"text": "<review>"}')
+        return self.score(text)
+
+    def _handle_score_batch(self, environ) -> dict:
+        texts = self._read_json(environ).get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise ScoringError(400, 'Expected {"texts": ["<review>", ...]}')
+        return {"results": self.score_batch(texts)}
+
+    def _handle_metrics(self, environ) -> dict:
+        return self.metrics()
+
+    def _handle_prometheus(self, environ) -> str:
+        return self.prometheus()
+
+    def _handle_health(self, environ) -> dict:
+        health = {"status": "ok", "engine": self.config.engine}
+        if self.model is not None:
+            health.update(model=self.model.model_name, model_version=self.model.version)
+        return health
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ScoringClient:
+    """Calls a `ScoringService` (or any WSGI app) in-process, without a socket."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def request(self, method: str, path: str, payload: Optional[dict] = None) -> Tuple[int, dict | str]:
+        data = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        environ = {
+            "REQUEST_METHOD": method,
+            "PATH_INFO": path,
+            "CONTENT_TYPE": "application/json",
+            "CONTENT_LENGTH": str(len(data)),
+            "wsgi.input": io.BytesIO(data),
+        }
+        setup_testing_defaults(environ)
+        captured = {}
+
+        def start_response(status, headers):
+            captured["status"] = int(status.split()[0])
+            captured["content_type"] = dict(headers).get("Content-Type", "")
+
+        body = b"".join(self.app(environ, start_response))
+        if captured["content_type"].startswith("application/json"):
+            return captured["status"], json.loads(body)
+        # Prometheus text, or an error page from something in front of the app
+        return captured["status"], body.decode("utf-8", errors="replace")
+
+    def _call(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        status, body = self.request(method, path, payload)
+        if status >= 400:
+            raise ScoringError(status, body.get("error", "") if isinstance(body, dict) else str(body))
+        return body
+
+    def score(self, text: str) -> dict:
+        return self._call("POST", "/score", {"text": text})
+
+    def score_batch(self, texts: Sequence[str]) -> List[dict]:
+        return self._call("POST", "/score_batch", {"texts": list(texts)})["results"]
+
+    def metrics(self) -> dict:
+        return self._call("GET", "/metrics")
+
+    def prometheus(self) -> str:
+        return self._call("GET", "/metrics/prometheus")
+
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    # One thread per connection, so concurrent requests can share a batch
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def make_scoring_server(service: ScoringService, host: str = None, port: int = None):
+    """Return a threaded `wsgiref` server for `service` (call `serve_forever()`)."""
+    return make_server(
+        host if host is not None else service.config.host,
+        port if port is not None else service.config.port,
+        service,
+        server_class=_ThreadingWSGIServer,
+        handler_class=_QuietHandler,
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve sentiment scoring over HTTP.")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--engine", choices=ENGINES, default=None)
+    parser.add_argument("--model-path", default=None, help="Model artifact or directory for --engine model.")
+    parser.add_argument("--max-batch-size", type=int, default=None, help="Texts scored per micro-batch.")
+    parser.add_argument("--max-wait-ms", type=float, default=None, help="Longest a request waits for a batch to fill.")
+    args = parser.parse_args()
+
+    config = ScoringServiceConfig.from_config()
+    for key in ("host", "port", "engine", "model_path", "max_batch_size", "max_wait_ms"):
+        if getattr(args, key) is not None:
+            setattr(config, key, getattr(args, key))
+
+    try:
+        service = ScoringService(config)
+        server = make_scoring_server(service)
+    except Exception as e:
+        raise CustomException(e, sys)
+    print(f"Scoring service ({config.engine}) listening on http://{config.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
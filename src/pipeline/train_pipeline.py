@@ -1,12 +1,366 @@
 """
-Placeholder for a future end-to-end training pipeline.
+End-to-end training pipeline: collection -> ingestion -> transformation -> training,
+with the per-movie sentiment aggregates built alongside training.
 
-The current project uses:
-- `src/components/data_ingestion.py` and `src/components/data_transformation.py`
-  to build transformed datasets.
-- `src/components/model_trainer.py` to train and evaluate traditional ML models.
+The stages form a DAG. Stages whose dependencies are done run concurrently on
+a thread pool (each stage does its own heavy lifting in processes or the
+database). Before running, a stage fingerprints its inputs: its config, the
+source of its component module, the recorded outputs of its upstream stages
+and, for ingestion, the row count and max id of the `reviews` table. If the
+fingerprint matches the last successful run and its outputs are untouched,
+the stage is skipped.
 
-If you want a single CLI entry point that orchestrates ingestion, transformation,
-and model training, you can implement it here.
+Fingerprints live in `artifacts/pipeline_state.json`; each run's per-stage
+status and timings are appended to `artifacts/pipeline_runs.jsonl`. Each
+stage also emits its rows, CPU time and peak memory through `src.metrics`
+(see `--metrics`), and `--profile` writes one profile per stage.
+
+    python -m src.pipeline.train_pipeline [--collect] [--incremental] [--force] [--profile]
 """
 
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src import metrics
+from src.exception import CustomException
+from src.logger import logging
+from src.utils import ARTIFACTS_DIR, load_config, load_json, save_json
+
+COMPONENTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'components'))
+
+
+@dataclass
+class TrainPipelineConfig:
+    state_path: str = os.path.join(ARTIFACTS_DIR, 'pipeline_state.json')
+    runs_path: str = os.path.join(ARTIFACTS_DIR, 'pipeline_runs.jsonl')
+    # Run ingestion/transformation on new rows only, and train out-of-core
+    incremental: bool = False
+    out_of_core: bool = False
+    # Stages allowed to run at the same time
+    max_workers: int = 2
+    # Profile each stage that runs ("cprofile" or "pyinstrument"); stages then run one at a time
+    profile: Optional[str] = None
+
+    @classmethod
+    def from_config(cls, config: Optional[dict] = None) -> "TrainPipelineConfig":
+        """Build from the `pipeline:` section of `config/config.yaml`."""
+        section = (load_config() if config is None else config).get("pipeline") or {}
+        return cls(**{key: value for key, value in section.items() if key in cls.__dataclass_fields__})
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], object]
+    deps: Tuple[str, ...] = ()
+    # Config and other input state that should re-trigger the stage when changed
+    inputs: Callable[[], object] = lambda: None
+    # Files/directories the stage produces
+    outputs: Callable[[], List[str]] = list
+    # Component sources whose edits should re-trigger the stage
+    code: Tuple[str, ...] = ()
+    # Source stages (e.g. scraping a website) cannot tell if anything changed
+    always_run: bool = False
+
+
+@dataclass
+class StageResult:
+    name: str
+    status: str  # ran | skipped | failed | blocked
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class PipelineRun:
+    run_id: str
+    started_at: str
+    results: Dict[str, StageResult] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return all(result.status in ("ran", "skipped") for result in self.results.values())
+
+    @property
+    def slowest(self) -> Optional[StageResult]:
+        ran = [result for result in self.results.values() if result.status == "ran"]
+        return max(ran, key=lambda result: result.seconds) if ran else None
+
+    def as_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds, 3),
+            "ok": self.ok,
+            "stages": {name: {k: v for k, v in asdict(result).items() if k != "name"}
+                       for name, result in self.results.items()},
+        }
+
+
+def path_signature(path: str):
+    """(size, mtime) of a file, or of every file under a directory; None if missing."""
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+    if os.path.isdir(path):
+        entries = []
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                full = os.path.join(root, name)
+                stat = os.stat(full)
+                entries.append([os.path.relpath(full, path), stat.st_size, stat.st_mtime_ns])
+        return sorted(entries)
+    return None
+
+
+def _digest(obj) -> str:
+    return hashlib.blake2b(json.dumps(obj, sort_keys=True, default=str).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TrainPipeline:
+    def __init__(self, config: TrainPipelineConfig = None, stages: Sequence[Stage] = None):
+        self.pipeline_config = config or TrainPipelineConfig.from_config()
+        self.stages: Dict[str, Stage] = {stage.name: stage for stage in (stages or self._default_stages())}
+        self._state_lock = threading.Lock()
+
+    def _default_stages(self) -> List[Stage]:
+        # Components are imported lazily so a pipeline that skips a stage does
+        # not pay for (or need the dependencies of) that stage's imports.
+        config = self.pipeline_config
+
+        def collect():
+            from src.components.data_collection import main as collect_main
+            collect_main([])
+
+        def ingestion():
+            from src.components.data_ingestion import DataIngestion
+            return DataIngestion()
+
+        def ingest():
+            result = ingestion().initiate_data_ingestion(incremental=config.incremental)
+            if result is None:
+                raise RuntimeError("Ingestion produced no data (the reviews table is empty)")
+
+        def ingest_inputs():
+            stage = ingestion()
+            return {"config": asdict(stage.ingestion_config), "source": stage.source_fingerprint()}
+
+        def ingest_outputs():
+            stage = ingestion()
+            c = stage.ingestion_config
+            return [stage.store.resolve(path) for path in (c.raw_data_path, c.train_data_path, c.test_data_path)]
+
+        def transformation():
+            from src.components.data_transformation import DataTransformation
+            return DataTransformation()
+
+        def transform():
+            transformation().initiate_data_transformation(incremental=config.incremental)
+
+        def transform_outputs():
+            stage = transformation()
+            c = stage.transformation_config
+            return [stage.store.resolve(path)
+                    for path in (c.transformed_data_path, c.transformed_train_path, c.transformed_test_path)]
+
+        def aggregation():
+            from src.components.sentiment_aggregation import SentimentAggregation
+            return SentimentAggregation()
+
+        def aggregate():
+            aggregation().initiate_sentiment_aggregation(incremental=config.incremental)
+
+        def aggregate_outputs():
+            stage = aggregation()
+            return [stage.store.resolve(stage.aggregation_config.aggregates_path)]
+
+        def trainer():
+            from src.components.model_trainer import ModelTrainer
+            return ModelTrainer()
+
+        def train():
+            if config.out_of_core:
+                stage = trainer()
+                # The first incremental run has no out-of-core model to continue yet
+                update = config.incremental and stage.has_out_of_core_model()
+                if config.incremental and not update:
+                    logging.info("No out-of-core model to update; training one from scratch")
+                stage.initiate_out_of_core_training(update=update)
+            else:
+                trainer().initiate_model_trainer()
+
+        def train_outputs():
+            c = trainer().trainer_config
+            return [os.path.join(c.model_dir, 'LATEST'), c.results_path]
+
+        return [
+            Stage("collect", collect, code=("data_collection.py", "async_collection.py"), always_run=True),
+            Stage("ingest", ingest, deps=("collect",), inputs=ingest_inputs, outputs=ingest_outputs,
+                  code=("data_ingestion.py",)),
+            Stage("transform", transform, deps=("ingest",), outputs=transform_outputs,
+                  inputs=lambda: {"config": asdict(transformation().transformation_config)},
+                  code=("data_transformation.py", "sentiment_scorer.py", "vader_index.py")),
+            Stage("aggregate", aggregate, deps=("transform",),
+                  outputs=aggregate_outputs,
+                  inputs=lambda: {"config": asdict(aggregation().aggregation_config)},
+                  code=("sentiment_aggregation.py",)),
+            Stage("train", train, deps=("transform",), outputs=train_outputs,
+                  inputs=lambda: {"config": asdict(trainer().trainer_config), "out_of_core": config.out_of_core},
+                  code=("model_trainer.py", "sentiment_model.py")),
+        ]
+
+    def run(self, stages: Optional[Sequence[str]] = None, force: bool = False) -> PipelineRun:
+        """Run `stages` (default: all but `collect`) in dependency order.
+
+        Dependencies outside the selection are treated as satisfied, using
+        whatever outputs they last recorded.
+        """
+        selected = list(stages) if stages else [name for name in self.stages if name != "collect"]
+        unknown = [name for name in selected if name not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s) {unknown}; choose from {list(self.stages)}")
+
+        run = PipelineRun(run_id=uuid.uuid4().hex[:12], started_at=datetime.now(timezone.utc).isoformat())
+        logging.info(f"Pipeline run {run.run_id}: stages {selected}")
+        state = load_json(self.pipeline_config.state_path, default={})
+        start = time.perf_counter()
+
+        pending = {name: [dep for dep in self.stages[name].deps if dep in selected] for name in selected}
+        # Only one profiler can be active per process
+        max_workers = 1 if self.pipeline_config.profile else self.pipeline_config.max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            running = {}
+            while pending or running:
+                for name in [name for name, deps in pending.items() if all(dep in run.results for dep in deps)]:
+                    deps = pending.pop(name)
+                    if any(run.results[dep].status in ("failed", "blocked") for dep in deps):
+                        run.results[name] = StageResult(name, "blocked")
+                        print(f"[{name}] blocked by a failed dependency")
+                        continue
+                    running[pool.submit(self._run_stage, self.stages[name], state, force)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    run.results[running.pop(future)] = result
+
+        run.seconds = time.perf_counter() - start
+        self._record(run)
+        return run
+
+    def _run_stage(self, stage: Stage, state: dict, force: bool) -> StageResult:
+        try:
+            fingerprint = self._fingerprint(stage, state)
+        except Exception as e:
+            # e.g. the database is unreachable: run the stage and let it report the problem
+            logging.warning(f"[{stage.name}] could not fingerprint inputs ({e}); running it")
+            fingerprint = None
+
+        previous = state.get(stage.name) or {}
+        start = time.perf_counter()
+        try:
+            # Resolving the outputs builds the stage's config, which can fail like the stage itself
+            if (
+                not force
+                and not stage.always_run
+                and fingerprint is not None
+                and previous.get("fingerprint") == fingerprint
+                and previous.get("outputs") == {path: path_signature(path) for path in stage.outputs()}
+            ):
+                print(f"[{stage.name}] unchanged, skipped")
+                logging.info(f"[{stage.name}] inputs unchanged, skipped")
+                return StageResult(stage.name, "skipped")
+
+            print(f"[{stage.name}] running...")
+            logging.info(f"[{stage.name}] running")
+            start = time.perf_counter()
+            # Profilers are per-thread, so start it in the worker that runs the stage
+            with metrics.profiled(stage.name, self.pipeline_config.profile):
+                stage.run()
+            # Outputs are recorded after the run, so downstream fingerprints see the new data
+            outputs = {path: path_signature(path) for path in stage.outputs()}
+        except Exception as e:
+            seconds = time.perf_counter() - start
+            logging.error(f"[{stage.name}] failed after {seconds:.2f}s: {e}")
+            print(f"[{stage.name}] FAILED after {seconds:.2f}s: {e}")
+            return StageResult(stage.name, "failed", seconds, error=str(e))
+        seconds = time.perf_counter() - start
+        print(f"[{stage.name}] done in {seconds:.2f}s")
+        logging.info(f"[{stage.name}] done in {seconds:.2f}s")
+
+        with self._state_lock:
+            state[stage.name] = {
+                "fingerprint": fingerprint,
+                "outputs": outputs,
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+                "seconds": round(seconds, 3),
+            }
+            save_json(self.pipeline_config.state_path, state)
+        return StageResult(stage.name, "ran", seconds)
+
+    def _fingerprint(self, stage: Stage, state: dict) -> str:
+        code = {}
+        for filename in stage.code:
+            with open(os.path.join(COMPONENTS_DIR, filename), "rb") as f:
+                code[filename] = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        with self._state_lock:
+            upstream = {dep: (state.get(dep) or {}).get("outputs") for dep in stage.deps}
+        return _digest({"stage": stage.name, "inputs": stage.inputs(), "code": code, "upstream": upstream})
+
+    def _record(self, run: PipelineRun) -> None:
+        os.makedirs(os.path.dirname(self.pipeline_config.runs_path), exist_ok=True)
+        with open(self.pipeline_config.runs_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run.as_dict()) + "\n")
+
+        print(f"\n{'stage':<12} {'status':<8} {'seconds':>9}")
+        for name, result in run.results.items():
+            print(f"{name:<12} {result.status:<8} {result.seconds:>9.2f}")
+        print(f"{'total':<12} {'':<8} {run.seconds:>9.2f}")
+        slowest = run.slowest
+        if slowest is not None:
+            print(f"slowest stage: {slowest.name} ({slowest.seconds:.2f}s)")
+        logging.info(f"Pipeline run {run.run_id} finished: {run.as_dict()}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the ingestion -> transformation -> training pipeline")
+    parser.add_argument("--stages", nargs="+", default=None,
+                        help="stages to run (default: ingest transform aggregate train)")
+    parser.add_argument("--collect", action="store_true", help="also scrape IMDB first (always runs)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="ingest/transform/aggregate only new rows and update an out-of-core model")
+    parser.add_argument("--out-of-core", action="store_true", help="train with HashingVectorizer + partial_fit")
+    parser.add_argument("--force", action="store_true", help="run every selected stage even if unchanged")
+    parser.add_argument("--max-workers", type=int, default=None, help="stages run at the same time")
+    metrics.add_cli_arguments(parser)
+    args = parser.parse_args()
+    metrics.configure_from_args(args)
+
+    pipeline_config = TrainPipelineConfig.from_config()
+    pipeline_config.incremental = args.incremental or pipeline_config.incremental
+    pipeline_config.out_of_core = args.out_of_core or pipeline_config.out_of_core
+    if args.max_workers:
+        pipeline_config.max_workers = args.max_workers
+    pipeline_config.profile = args.profile or pipeline_config.profile
+    stages = args.stages or (["collect"] if args.collect else []) + ["ingest", "transform", "aggregate", "train"]
+
+    try:
+        result = TrainPipeline(pipeline_config).run(stages, force=args.force)
+    except Exception as e:
+        raise CustomException(e, sys)
+    sys.exit(0 if result.ok else 1)
@@ -1,8 +1,63 @@
 """
 Shared utility functions for the web scraping + sentiment analysis project.
 
-Currently this module is a placeholder; helper functions that are reused
-across multiple components (e.g. configuration loading, common I/O helpers)
-can be added here in the future.
+Helpers that are reused across multiple components (e.g. configuration
+loading, common I/O helpers) live here.
 """
 
+import hashlib
+import json
+import os
+
+import numpy as np
+import yaml
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+CONFIG_PATH = os.path.join(BASE_DIR, 'config', 'config.yaml')
+# Every stage reads and writes its artifacts here, whatever the working directory
+ARTIFACTS_DIR = os.path.join(BASE_DIR, 'artifacts')
+
+
+def load_config(path: str = CONFIG_PATH) -> dict:
+    """Load the project YAML config; a missing or empty file gives `{}`."""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def hash_split_mask(ids, test_size: float = 0.2, salt: str = "") -> np.ndarray:
+    """Deterministic train/test assignment: True where a row belongs to the test set.
+
+    Each row is assigned from a hash of its id alone, so the split can be
+    computed chunk by chunk (no need to hold the whole table) and a row keeps
+    its assignment across runs and as new rows are added.
+    """
+    threshold = int(test_size * 2 ** 64)
+    salt_bytes = salt.encode("utf-8")
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(salt_bytes + str(row_id).encode("utf-8"), digest_size=8).digest(), "big")
+            < threshold
+            for row_id in ids
+        ),
+        dtype=bool,
+    )
+
+
+def load_json(path: str, default=None):
+    """Read a small JSON state file, returning `default` if it does not exist."""
+    if not os.path.exists(path):
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_json(path: str, obj) -> None:
+    """Atomically (write + rename) replace a small JSON state file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f, indent=2)
+    os.replace(tmp_path, path)
+
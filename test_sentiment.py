@@ -9,6 +9,7 @@ from src.components.data_transformation import (
     get_sentiment_label,
     clean_text_pipeline
 )
+from src.components.sentiment_aggregation import aggregate_reviews
 
 # Sample review data (simulating what would come from raw_data.csv)
 sample_reviews = [
@@ -85,11 +86,12 @@ print("=" * 80)
 print("SUMMARY STATISTICS")
 print("=" * 80)
 print()
-print(f"Total samples: {len(df)}")
-print(f"Positive sentiment: {(df['sentiment_label'] == 'positive').sum()} ({(df['sentiment_label'] == 'positive').sum()/len(df)*100:.1f}%)")
-print(f"Neutral sentiment:  {(df['sentiment_label'] == 'neutral').sum()} ({(df['sentiment_label'] == 'neutral').sum()/len(df)*100:.1f}%)")
-print(f"Negative sentiment: {(df['sentiment_label'] == 'negative').sum()} ({(df['sentiment_label'] == 'negative').sum()/len(df)*100:.1f}%)")
+summary = aggregate_reviews(df, by=None).iloc[0]
+print(f"Total samples: {int(summary['n_reviews'])}")
+print(f"Positive sentiment: {int(summary['n_positive'])} ({summary['share_positive']*100:.1f}%)")
+print(f"Neutral sentiment:  {int(summary['n_neutral'])} ({summary['share_neutral']*100:.1f}%)")
+print(f"Negative sentiment: {int(summary['n_negative'])} ({summary['share_negative']*100:.1f}%)")
 print()
-print(f"Average compound score: {df['sentiment_compound'].mean():.4f}")
-print(f"Std deviation:         {df['sentiment_compound'].std():.4f}")
+print(f"Average compound score: {summary['mean_compound']:.4f}")
+print(f"Std deviation:         {summary['std_compound']:.4f}")
 print()
@@ -0,0 +1,54 @@
+"""`AsyncReviewScraper` against the local mock GraphQL server."""
+
+from benchmarks.bench_scraper import CountingCrawl
+from benchmarks.mock_graphql_server import MockGraphQLServer
+from src.components.async_collection import AsyncCollectionConfig, AsyncReviewScraper
+
+
+class BrokenCrawl(CountingCrawl):
+    """Fails while handling its second page, like a lost database connection."""
+
+    def __init__(self, movie):
+        super().__init__(movie)
+        self.finished = None
+
+    def handle_page(self, edges, page_info):
+        if self.collected:
+            raise RuntimeError("connection lost")
+        return super().handle_page(edges, page_info)
+
+    def finish(self, completed):
+        self.finished = completed
+
+
+def _scraper(server, max_retries=8):
+    config = AsyncCollectionConfig(base_url=server.url, requests_per_second=1000.0, burst=8,
+                                   backoff_base=0.001, max_retries=max_retries)
+    return AsyncReviewScraper(config, headers={})
+
+
+def test_non_json_bodies_are_retried():
+    with MockGraphQLServer(n_movies=3, pages_per_movie=3, bad_body_rate=0.3) as server:
+        crawls = [CountingCrawl(movie) for movie in server.movies]
+        stats = _scraper(server).run(crawls)
+        assert server.failures > 0
+    assert stats.failed_movies == []
+    assert stats.retries >= server.failures
+    assert sum(crawl.collected for crawl in crawls) == server.total_reviews
+
+
+def test_non_json_body_fails_the_page_after_the_last_retry():
+    with MockGraphQLServer(n_movies=1, pages_per_movie=1, bad_body_rate=1.0) as server:
+        stats = _scraper(server, max_retries=1).run([CountingCrawl(server.movies[0])])
+    assert stats.failed_movies == [server.movies[0]["name"]]
+
+
+def test_one_failing_movie_does_not_stop_the_others():
+    with MockGraphQLServer(n_movies=4, pages_per_movie=3) as server:
+        broken = BrokenCrawl(server.movies[0])
+        crawls = [broken] + [CountingCrawl(movie) for movie in server.movies[1:]]
+        stats = _scraper(server).run(crawls)
+        per_movie = server.total_reviews // len(server.movies)
+    assert stats.failed_movies == [broken.movie_name]
+    assert broken.finished is False
+    assert [crawl.collected for crawl in crawls[1:]] == [per_movie] * 3
@@ -0,0 +1,21 @@
+"""`clean_and_score` argument checks and serial/parallel equivalence."""
+
+import pytest
+
+from src.components.data_transformation import clean_and_score
+
+TEXTS = ["Loved it!", "<p>Awful &amp; boring</p>", "", "meh"] * 5
+
+
+@pytest.mark.parametrize("chunksize", [0, -5])
+def test_rejects_non_positive_chunksize(chunksize):
+    with pytest.raises(ValueError, match="chunksize"):
+        clean_and_score(TEXTS, n_jobs=2, chunksize=chunksize)
+
+
+def test_parallel_matches_serial():
+    serial_text, serial = clean_and_score(TEXTS)
+    parallel_text, parallel = clean_and_score(TEXTS, n_jobs=2, chunksize=3)
+    assert parallel_text == serial_text
+    assert {k: v.tolist() for k, v in parallel.as_columns().items()} == \
+        {k: v.tolist() for k, v in serial.as_columns().items()}
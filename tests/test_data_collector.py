@@ -0,0 +1,76 @@
+"""`DataCollector.flush` against a fake psycopg2 connection."""
+
+import pytest
+
+from src.components import data_collection
+from src.components.data_collection import DataCollector, MovieCrawl
+
+
+class FakeConnection:
+    """Stages upserted rows and state per transaction; commit makes them visible."""
+
+    def __init__(self):
+        self.reviews, self.state = {}, {}
+        self._rows, self._state = [], []
+
+    def cursor(self):
+        return self
+
+    def executemany(self, sql, params):
+        self._state.extend(params)
+
+    def execute(self, sql, params=None):
+        self._found = [(rid,) for rid in (params[0] if params else []) if rid in self.reviews]
+
+    def fetchall(self):
+        return self._found
+
+    def commit(self):
+        self.reviews.update((row[0], row[3]) for row in self._rows)
+        self.state.update((item["movie_id"], item) for item in self._state)
+        self._rows, self._state = [], []
+
+    def rollback(self):
+        self._rows, self._state = [], []
+
+
+@pytest.fixture
+def collector(monkeypatch):
+    conn = FakeConnection()
+    failures = [RuntimeError("server closed the connection")]
+
+    def execute_values(cur, sql, rows, page_size, fetch):
+        if failures:
+            raise failures.pop()
+        conn._rows.extend(rows)
+        return [(True,)] * len(rows)
+
+    monkeypatch.setattr(data_collection, "execute_values", execute_values)
+    collector = DataCollector.__new__(DataCollector)
+    collector.conn = collector.cur = conn
+    collector.batch_size, collector.rows_upserted = 4, 0
+    collector._buffer, collector._pending_state = [], {}
+    return collector
+
+
+def _page(movie_id, page, size=2):
+    edges = [{"node": {"id": f"{movie_id}-{page}-{i}", "text": {"originalText": {"plaidHtml": "Good film"}}}}
+             for i in range(size)]
+    return edges, {"hasNextPage": True, "endCursor": f"{movie_id}-cursor-{page + 1}"}
+
+
+def test_failed_flush_keeps_other_movies_rows(collector):
+    first = MovieCrawl(collector, "tt1", "One")
+    second = MovieCrawl(collector, "tt2", "Two")
+
+    first.handle_page(*_page("tt1", 0))
+    with pytest.raises(RuntimeError):
+        second.handle_page(*_page("tt2", 0))  # fills the batch; the upsert fails
+    assert collector.cur.reviews == {} and collector.cur.state == {}
+
+    # The first movie keeps crawling; its next flush must carry the lost batch too
+    first.handle_page(*_page("tt1", 1))
+    committed = set(collector.cur.reviews)
+    assert {"tt1-0-0", "tt1-0-1", "tt2-0-0", "tt2-0-1", "tt1-1-0", "tt1-1-1"} <= committed
+    assert collector.cur.state["tt1"]["end_cursor"] == "tt1-cursor-2"
+    assert collector.cur.state["tt2"]["end_cursor"] == "tt2-cursor-1"
@@ -0,0 +1,87 @@
+"""Ingestion's view of the reviews table, on a scratch SQLite database."""
+
+import pytest
+
+from src.components import db
+from src.components.data_ingestion import DataIngestion, DataIngestionConfig
+from src.exception import CustomException
+from src.utils import load_json
+
+
+@pytest.fixture
+def reviews_db(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'reviews.sqlite'}")
+    yield
+    db.dispose_engines()
+
+
+def _execute(*statements):
+    with db.transaction() as conn:
+        for sql in statements:
+            conn.exec_driver_sql(sql)
+
+
+def test_fingerprint_changes_when_a_review_is_rewritten(reviews_db):
+    _execute(
+        "CREATE TABLE reviews (id INTEGER PRIMARY KEY, movie_id TEXT, movie_name TEXT, review_text TEXT,"
+        " review_id TEXT, updated_at TIMESTAMP)",
+        "INSERT INTO reviews VALUES (1, 'tt1', 'M', 'good', 'rw1', '2026-01-01 00:00:00')",
+        "INSERT INTO reviews VALUES (2, 'tt1', 'M', 'bad', 'rw2', '2026-01-01 00:00:00')",
+    )
+    ingestion = DataIngestion()
+    before = ingestion.source_fingerprint()
+    assert ingestion.source_fingerprint() == before
+
+    _execute("UPDATE reviews SET review_text = 'edited', updated_at = '2026-01-02 00:00:00' WHERE id = 1")
+    assert ingestion.source_fingerprint() != before
+
+
+def test_fingerprint_without_updated_at_column(reviews_db):
+    _execute(
+        "CREATE TABLE reviews (id INTEGER PRIMARY KEY, movie_id TEXT, movie_name TEXT, review_text TEXT)",
+        "INSERT INTO reviews VALUES (7, 'tt1', 'M', 'good')",
+    )
+    assert DataIngestion().source_fingerprint() == "1:7"
+
+
+def _ingestion(tmp_path):
+    ingestion = DataIngestion()
+    ingestion.ingestion_config = DataIngestionConfig(
+        raw_data_path=str(tmp_path / "raw_data.csv"),
+        train_data_path=str(tmp_path / "train_data.csv"),
+        test_data_path=str(tmp_path / "test_data.csv"),
+        state_path=str(tmp_path / "ingestion_state.json"),
+    )
+    return ingestion
+
+
+def test_incremental_export_picks_up_edited_reviews(reviews_db, tmp_path):
+    _execute(
+        "CREATE TABLE reviews (id INTEGER PRIMARY KEY, movie_id TEXT, movie_name TEXT, review_text TEXT,"
+        " review_id TEXT, updated_at TIMESTAMP)",
+        "INSERT INTO reviews VALUES (1, 'tt1', 'M', 'good', 'rw1', '2026-01-01 00:00:00')",
+        "INSERT INTO reviews VALUES (2, 'tt1', 'M', 'bad', 'rw2', '2026-01-01 00:00:00')",
+    )
+    ingestion = _ingestion(tmp_path)
+    config = ingestion.ingestion_config
+    ingestion.initiate_data_ingestion(incremental=True)
+    generation = load_json(config.state_path)["generation"]
+
+    # A new review is appended to the same export
+    _execute("INSERT INTO reviews VALUES (3, 'tt1', 'M', 'fine', 'rw3', '2026-01-02 00:00:00')")
+    ingestion.initiate_data_ingestion(incremental=True)
+    assert load_json(config.state_path)["generation"] == generation
+    assert sorted(ingestion.store.read(config.raw_data_path)["id"]) == [1, 2, 3]
+
+    # An edit below the id watermark forces a full export with the new text
+    _execute("UPDATE reviews SET review_text = 'edited', updated_at = '2026-01-03 00:00:00' WHERE id = 1")
+    ingestion.initiate_data_ingestion(incremental=True)
+    assert load_json(config.state_path)["generation"] != generation
+    raw = ingestion.store.read(config.raw_data_path).sort_values("id")
+    assert raw["review_text"].tolist() == ["edited", "bad", "fine"]
+
+
+def test_database_errors_propagate(reviews_db, tmp_path):
+    # No reviews table: the stage must fail with the real cause, not return None
+    with pytest.raises(CustomException, match="reviews"):
+        _ingestion(tmp_path).initiate_data_ingestion()
@@ -0,0 +1,37 @@
+"""The fast tiers of `html_to_simple_text` must give the same text as BeautifulSoup."""
+
+import warnings
+
+import pytest
+
+from benchmarks.bench_html_cleaner import EDGE_CASES, fuzz_corpus
+from src.components.data_transformation import _html_to_text_full, clean_text_pipeline, html_to_simple_text
+
+# Closing tags of void elements: html.parser merges `<br>...</br>` differently from a lone `</br>`
+VOID_END_TAGS = [
+    "<br>a</br>b", "x<br>y</br>z", "a</br>b", "a</img>b", "<hr>a</hr>", "a<wbr></wbr>b",
+    "<BR>a</BR>b", "aaaa<br>ﬁ</br>&#65;",
+]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_bs4():
+    # BeautifulSoup warns about inputs that look like URLs or file names
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        yield
+
+
+@pytest.mark.parametrize("text", EDGE_CASES + VOID_END_TAGS)
+def test_edge_case_parity(text):
+    assert html_to_simple_text(text) == _html_to_text_full(text)
+
+
+def test_fuzz_parity():
+    mismatches = [text for text in fuzz_corpus(5000, seed=1) if html_to_simple_text(text) != _html_to_text_full(text)]
+    assert mismatches == []
+
+
+@pytest.mark.parametrize("text", VOID_END_TAGS)
+def test_clean_text_pipeline_void_end_tags(text):
+    assert clean_text_pipeline(text) == clean_text_pipeline(_html_to_text_full(text))
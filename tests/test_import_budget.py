@@ -0,0 +1,27 @@
+"""Import-time budgets of `benchmarks/import_budget.py` as a test.
+
+Each module is imported once in a fresh interpreter. Set `IMPORT_BUDGET_SCALE`
+(like the script's `--scale`) to loosen the budgets on a slow CI machine.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.import_budget import BUDGETS, CLI_BUDGET_MS, _run, measure_import
+
+SCALE = float(os.getenv("IMPORT_BUDGET_SCALE", "1.0"))
+
+
+@pytest.mark.parametrize("module", sorted(BUDGETS))
+def test_import_budget(module, tmp_path):
+    budget, forbidden = BUDGETS[module]
+    ms, loaded = measure_import(module, str(tmp_path))
+    assert sorted(set(forbidden) & loaded) == []
+    assert ms <= budget * SCALE, f"{module} took {ms:.0f} ms to import (budget {budget * SCALE:.0f} ms)"
+    assert not os.path.exists(tmp_path / "logs"), "importing created a logs/ directory"
+
+
+def test_predict_cli_help_budget(tmp_path):
+    _, seconds = _run(["-m", "src.pipeline.predict_pipeline", "--help"], str(tmp_path))
+    assert seconds * 1000 <= CLI_BUDGET_MS * SCALE
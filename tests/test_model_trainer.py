@@ -0,0 +1,42 @@
+"""Out-of-core training: which saved models `--update` can continue."""
+
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+from src.components.data_transformation import CLEANER_VERSION
+from src.components.model_trainer import ModelTrainer, ModelTrainerConfig
+from src.components.sentiment_model import SentimentModel
+from src.pipeline.train_pipeline import TrainPipeline, TrainPipelineConfig
+
+TEXTS = ["great film", "awful film", "it was fine"]
+LABELS = ["positive", "negative", "neutral"]
+
+
+def _save(model_dir, vectorizer, classifier):
+    features = vectorizer.fit_transform(TEXTS)
+    classifier.fit(features, LABELS)
+    SentimentModel(vectorizer, classifier, "m", "1", CLEANER_VERSION).save(str(model_dir))
+
+
+def test_has_out_of_core_model(tmp_path):
+    trainer = ModelTrainer(ModelTrainerConfig(model_dir=str(tmp_path)))
+    assert not trainer.has_out_of_core_model()
+
+    _save(tmp_path, TfidfVectorizer(), LogisticRegression())
+    assert not trainer.has_out_of_core_model()
+
+    _save(tmp_path, HashingVectorizer(n_features=2 ** 10), SGDClassifier(loss="log_loss"))
+    assert trainer.has_out_of_core_model()
+
+
+def test_first_incremental_run_trains_from_scratch(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(ModelTrainer, "has_out_of_core_model", lambda self: bool(calls))
+    monkeypatch.setattr(ModelTrainer, "initiate_out_of_core_training", lambda self, update=False: calls.append(update))
+
+    config = TrainPipelineConfig(state_path=str(tmp_path / "state.json"), runs_path=str(tmp_path / "runs.jsonl"),
+                                 incremental=True, out_of_core=True)
+    pipeline = TrainPipeline(config)
+    for _ in range(2):
+        assert pipeline.run(["train"], force=True).results["train"].status == "ran"
+    assert calls == [False, True]
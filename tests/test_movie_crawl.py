@@ -0,0 +1,80 @@
+"""`MovieCrawl` paging decisions, driven by an in-memory collector."""
+
+from src.components.data_collection import MovieCrawl
+
+
+class FakeCollector:
+    """Stores rows and crawl state in dicts; checkpoints apply on flush like `DataCollector`."""
+
+    def __init__(self, stored_ids=(), state=None):
+        self.reviews = {review_id: None for review_id in stored_ids}
+        self.state = state
+        self._buffer = []
+        self._pending_state = None
+
+    def known_review_ids(self, review_ids):
+        return {rid for rid in review_ids if rid in self.reviews or any(row[0] == rid for row in self._buffer)}
+
+    def checkpoint(self, movie_id, end_cursor, crawl_in_progress, newest_review_id, full_crawl_done=False):
+        self._pending_state = {
+            "end_cursor": end_cursor,
+            "crawl_in_progress": crawl_in_progress,
+            "newest_review_id": newest_review_id or (self.state or {}).get("newest_review_id"),
+        }
+
+    def buffer_rows(self, rows):
+        self._buffer.extend(rows)
+        return len(rows)
+
+    def flush(self):
+        self.reviews.update((row[0], row[3]) for row in self._buffer)
+        if self._pending_state is not None:
+            self.state = self._pending_state
+        self._buffer, self._pending_state = [], None
+
+
+def _pages(review_ids, size):
+    """IMDB-style pages of `review_ids` (newest first)."""
+    pages = []
+    for start in range(0, len(review_ids), size):
+        edges = [{"node": {"id": rid, "text": {"originalText": {"plaidHtml": f"text {rid}"}}}}
+                 for rid in review_ids[start:start + size]]
+        pages.append((edges, {"hasNextPage": start + size < len(review_ids), "endCursor": str(start + size)}))
+    return pages
+
+
+def _crawl(collector, pages, max_pages=None):
+    crawl = MovieCrawl(collector, "tt1", "Movie", collector.state)
+    for fetched, (edges, page_info) in enumerate(pages, 1):
+        more = crawl.handle_page(edges, page_info)
+        if max_pages is not None and fetched == max_pages:
+            collector.flush()  # the batch was written, then the run died
+            return crawl
+        if not more:
+            break
+    crawl.finish(True)
+    return crawl
+
+
+def test_refresh_stops_at_previous_newest_review():
+    old = [f"r{i}" for i in range(10, 0, -1)]
+    collector = FakeCollector(old, {"end_cursor": None, "crawl_in_progress": False, "newest_review_id": "r10"})
+    new = [f"r{i}" for i in range(14, 10, -1)]
+    crawl = _crawl(collector, _pages(new + old, 3))
+    assert crawl.mode == "refresh"
+    assert crawl.collected == 4
+    assert collector.state["newest_review_id"] == "r14"
+
+
+def test_interrupted_refresh_does_not_lose_reviews():
+    old = [f"r{i}" for i in range(10, 0, -1)]
+    collector = FakeCollector(old, {"end_cursor": None, "crawl_in_progress": False, "newest_review_id": "r10"})
+    new = [f"r{i}" for i in range(20, 10, -1)]
+    pages = _pages(new + old, 3)
+
+    _crawl(collector, pages, max_pages=1)
+    assert collector.state["newest_review_id"] == "r10"
+
+    _crawl(collector, pages)
+    assert set(new) <= set(collector.reviews)
+    assert collector.state["newest_review_id"] == "r20"
@@ -0,0 +1,75 @@
+"""`ScoringService` round-trips through the in-process `ScoringClient`."""
+
+import pytest
+
+from src.pipeline.predict_pipeline import score_texts
+from src.pipeline.scoring_service import ScoringClient, ScoringError, ScoringService, ScoringServiceConfig
+
+TEXTS = ["Absolutely loved it!", "<p>Terrible&nbsp;plot</p>", "It was ok.", ""]
+
+
+@pytest.fixture(scope="module")
+def client():
+    service = ScoringService(ScoringServiceConfig(use_cache=False, max_wait_ms=0.5))
+    yield ScoringClient(service)
+    service.close()
+
+
+def test_score_matches_score_texts(client):
+    expected = score_texts(TEXTS)
+    assert [client.score(text) for text in TEXTS] == expected
+    assert client.score_batch(TEXTS) == expected
+    assert client.score_batch([]) == []
+
+
+@pytest.mark.parametrize("method, path, payload, status", [
+    ("POST", "/score", {"text": 1}, 400),
+    ("POST", "/score_batch", {"texts": "not a list"}, 400),
+    ("GET", "/score", None, 405),
+    ("GET", "/nope", None, 404),
+])
+def test_rejected_requests(client, method, path, payload, status):
+    code, body = client.request(method, path, payload)
+    assert code == status and "error" in body
+
+
+def test_client_raises_scoring_error(client):
+    with pytest.raises(ScoringError) as excinfo:
+        client._call("POST", "/score", {})
+    assert excinfo.value.status == 400
+
+
+def test_metrics_and_health(client):
+    client.score("fine")
+    metrics = client.metrics()
+    assert metrics["engine"] == "vader" and metrics["batching"]["texts"] >= 1
+    assert client.request("GET", "/health") == (200, {"status": "ok", "engine": "vader"})
+    text = client.prometheus()
+    assert "# TYPE sentiment_service_uptime_seconds gauge" in text
+    assert 'service_requests_total{endpoint="/score",status="200"}' in text
+
+
+def test_scores_keep_vader_precision():
+    from nltk.sentiment import SentimentIntensityAnalyzer
+
+    from src.components.data_transformation import clean_text_pipeline
+    from src.components.sentiment_scorer import resolve_lexicon
+
+    analyzer = SentimentIntensityAnalyzer(lexicon_file=resolve_lexicon())
+    for text, result in zip(TEXTS, score_texts(TEXTS)):
+        expected = analyzer.polarity_scores(clean_text_pipeline(text))
+        assert {key: result[f"sentiment_{key}"] for key in expected} == expected
+
+
+@pytest.mark.parametrize("content_type, body, message", [
+    ("text/html", b"<h1>Bad gateway</h1>", "<h1>Bad gateway</h1>"),
+    ("application/json", b'["not", "a", "dict"]', "['not', 'a', 'dict']"),
+])
+def test_client_raises_scoring_error_for_other_error_bodies(content_type, body, message):
+    def app(environ, start_response):
+        start_response("502 Bad Gateway", [("Content-Type", content_type)])
+        return [body]
+
+    with pytest.raises(ScoringError) as excinfo:
+        ScoringClient(app).metrics()
+    assert excinfo.value.status == 502 and str(excinfo.value) == message
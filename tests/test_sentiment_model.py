@@ -0,0 +1,34 @@
+"""Saving and loading `SentimentModel` artifacts."""
+
+import logging
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from src.components.data_transformation import CLEANER_VERSION
+from src.components.sentiment_model import SentimentModel
+
+TEXTS = ["great film", "awful film", "loved it", "hated it"]
+LABELS = ["positive", "negative", "positive", "negative"]
+
+
+def _model(cleaner_version):
+    vectorizer = TfidfVectorizer().fit(TEXTS)
+    classifier = LogisticRegression().fit(vectorizer.transform(TEXTS), LABELS)
+    return SentimentModel(vectorizer, classifier, "logreg", "1", cleaner_version)
+
+
+def test_round_trip(tmp_path, caplog):
+    _model(CLEANER_VERSION).save(str(tmp_path))
+    with caplog.at_level(logging.WARNING):
+        loaded = SentimentModel.load(str(tmp_path))
+    assert "cleaner version" not in caplog.text
+    labels, proba = loaded.predict_batch(["great film"])
+    assert labels.tolist() == ["positive"] and proba.shape == (1, 2)
+
+
+def test_warns_on_cleaner_version_mismatch(tmp_path, caplog):
+    path = _model("0").save(str(tmp_path))
+    with caplog.at_level(logging.WARNING):
+        SentimentModel.load(path)
+    assert "cleaner version 0" in caplog.text
@@ -0,0 +1,23 @@
+"""The fused `normalize_text` must match the original step-by-step cleaning."""
+
+import pytest
+
+from benchmarks.bench_text_normalizer import normalize_sequential
+from benchmarks.common import TRAIN_CSV, load_reviews
+from src.components.data_transformation import html_to_simple_text, normalize_text
+
+EDGE_CASES = [
+    "", "   ", "plain text", "a\r\nb\tc", "\x00a\x07b", "soooo goooood!!!!!!", "aaa", "aaaa",
+    "see http://example.com/x now", "www.example.org and https://a.b/c?d=1", "\ufb01ne \uff26\uff35\uff2c\uff2c width",
+    "e\u0301", "tab\u00a0nbsp\u2003em", "\ufeffbom", "  leading and trailing  ", "\U0001f600" * 4,
+]
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_case_parity(text):
+    assert normalize_text(text) == normalize_sequential(text)
+
+
+def test_review_parity():
+    texts = [html_to_simple_text(text) for text in load_reviews(TRAIN_CSV, limit=2000)]
+    assert [normalize_text(text) for text in texts] == [normalize_sequential(text) for text in texts]
@@ -0,0 +1,35 @@
+"""`TrainPipeline` scheduling with stub stages."""
+
+from src.pipeline.train_pipeline import Stage, TrainPipeline, TrainPipelineConfig
+
+
+def _pipeline(tmp_path, stages):
+    config = TrainPipelineConfig(state_path=str(tmp_path / "state.json"), runs_path=str(tmp_path / "runs.jsonl"))
+    return TrainPipeline(config, stages)
+
+
+def _write(path):
+    def run():
+        path.write_text("data")
+    return run
+
+
+def test_unchanged_stage_is_skipped(tmp_path):
+    out = tmp_path / "a.txt"
+    stages = [Stage("a", _write(out), outputs=lambda: [str(out)])]
+    assert _pipeline(tmp_path, stages).run().results["a"].status == "ran"
+    assert _pipeline(tmp_path, stages).run().results["a"].status == "skipped"
+
+
+def test_failing_outputs_fail_the_stage(tmp_path):
+    def broken_outputs():
+        raise KeyError("model_dir")
+
+    stages = [
+        Stage("a", lambda: None, outputs=broken_outputs),
+        Stage("b", lambda: None, deps=("a",)),
+    ]
+    run = _pipeline(tmp_path, stages).run()
+    assert run.results["a"].status == "failed"
+    assert "model_dir" in run.results["a"].error
+    assert run.results["b"].status == "blocked"
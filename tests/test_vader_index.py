@@ -0,0 +1,44 @@
+"""A freshly built `VaderIndex` scores exactly like NLTK's analyzer."""
+
+import pytest
+from nltk.sentiment import SentimentIntensityAnalyzer
+
+from benchmarks.bench_vader_index import EDGE_CASES, fuzz_corpus
+from src.components.sentiment_scorer import resolve_lexicon
+from src.components.vader_index import VaderIndex, build_index
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return SentimentIntensityAnalyzer(lexicon_file=resolve_lexicon())
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    return VaderIndex.open(build_index(str(tmp_path_factory.mktemp("vader") / "vader.idx")))
+
+
+def test_index_contents(analyzer, index):
+    assert len(index) == len(analyzer.lexicon)
+    assert index.BOOSTER_DICT == analyzer.constants.BOOSTER_DICT
+    assert index.NEGATE == frozenset(analyzer.constants.NEGATE)
+
+
+@pytest.mark.parametrize("text", EDGE_CASES)
+def test_edge_case_parity(analyzer, index, text):
+    assert index.polarity_scores(text) == analyzer.polarity_scores(text)
+
+
+def test_fuzz_parity(analyzer, index):
+    mismatches = [text for text in fuzz_corpus(analyzer, 3000, seed=1)
+                  if index.polarity_scores(text) != analyzer.polarity_scores(text)]
+    assert mismatches == []
+
+
+def test_result_cache_key_includes_the_implementation():
+    from src.components.data_transformation import get_result_cache
+    from src.components.sentiment_scorer import get_scorer
+
+    scorer = get_scorer()
+    assert scorer.analyzer_version.startswith(("index-", "nltk-"))
+    assert get_result_cache().version.endswith(f":{scorer.lexicon_version}:{scorer.analyzer_version}")